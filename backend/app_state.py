@@ -0,0 +1,182 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from asset_store import DEFAULT_DB_PATH
+
+# Training status fields shown by /train/status/
+TRAINING_FIELDS = {
+    "is_training": False,
+    "progress": 0,
+    "message": "No training in progress",
+    "estimators_done": 0,
+    "n_estimators": None,
+    "metrics": {},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _stale_seconds() -> float:
+    return float(os.getenv("TRAINING_STALE_SECONDS", 600))
+
+
+class AppState(ABC):
+    """
+    State every API worker must agree on: the training job and the model version
+
+    Training status is claimed, updated and finished here by whichever
+    worker runs the job and read by all of them. publish_model() bumps the
+    model version after a new model file is in place, so workers that did
+    not train it can reload it (see ModelRegistry.watch). The fleet itself
+    is shared through AssetStore.
+
+    A claimed job that has not been updated for TRAINING_STALE_SECONDS is
+    taken to belong to a worker that died and can be claimed again.
+    """
+
+    @abstractmethod
+    def training_status(self) -> Dict:
+        ...
+
+    @abstractmethod
+    def claim_training(self, owner: str, **fields) -> bool:
+        """Mark training as started by owner unless a live job holds it; True on success"""
+
+    @abstractmethod
+    def update_training(self, **fields):
+        ...
+
+    @abstractmethod
+    def model_version(self) -> int:
+        ...
+
+    @abstractmethod
+    def publish_model(self, model_path: str) -> int:
+        """Announce a new model file at model_path and return the new version"""
+
+    @staticmethod
+    def _claimable(status: Dict, now: float) -> bool:
+        return not status.get("is_training") or now - status.get("updated_at", 0) > _stale_seconds()
+
+    @staticmethod
+    def _public(status: Dict) -> Dict:
+        return {name: status.get(name, default) for name, default in TRAINING_FIELDS.items()}
+
+
+class MemoryAppState(AppState):
+    """AppState for a single process (tests, scripts, one uvicorn worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._training = {**TRAINING_FIELDS, "updated_at": 0.0}
+        self._model_version = 0
+
+    def training_status(self) -> Dict:
+        with self._lock:
+            return self._public(self._training)
+
+    def claim_training(self, owner: str, **fields) -> bool:
+        with self._lock:
+            now = time.time()
+            if not self._claimable(self._training, now):
+                return False
+            self._training = {**TRAINING_FIELDS, **fields, "is_training": True, "owner": owner, "updated_at": now}
+            return True
+
+    def update_training(self, **fields):
+        with self._lock:
+            self._training.update(fields, updated_at=time.time())
+
+    def model_version(self) -> int:
+        with self._lock:
+            return self._model_version
+
+    def publish_model(self, model_path: str) -> int:
+        with self._lock:
+            self._model_version += 1
+            return self._model_version
+
+
+class SqliteAppState(AppState):
+    """
+    AppState in the asset database, shared by every worker on the host
+
+    Values are JSON rows in an app_state table; claims and version bumps
+    run in BEGIN IMMEDIATE transactions, so two workers cannot both start
+    training or publish the same version.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv("ASSET_DB_PATH", DEFAULT_DB_PATH)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _read(conn: sqlite3.Connection, key: str, default):
+        row = conn.execute("SELECT value FROM app_state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, key: str, value, now: float):
+        conn.execute(
+            "INSERT INTO app_state (key, value, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (key, json.dumps(value), now),
+        )
+
+    def training_status(self) -> Dict:
+        with self._connection() as conn:
+            return self._public(self._read(conn, "training", TRAINING_FIELDS))
+
+    def claim_training(self, owner: str, **fields) -> bool:
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            if not self._claimable(self._read(conn, "training", {}), now):
+                return False
+            status = {**TRAINING_FIELDS, **fields, "is_training": True, "owner": owner, "updated_at": now}
+            self._write(conn, "training", status, now)
+            return True
+
+    def update_training(self, **fields):
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            status = {**self._read(conn, "training", TRAINING_FIELDS), **fields, "updated_at": now}
+            self._write(conn, "training", status, now)
+
+    def model_version(self) -> int:
+        with self._connection() as conn:
+            return self._read(conn, "model", {}).get("version", 0)
+
+    def publish_model(self, model_path: str) -> int:
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            version = self._read(conn, "model", {}).get("version", 0) + 1
+            self._write(conn, "model", {"version": version, "path": model_path, "published_at": now}, now)
+            return version
@@ -0,0 +1,405 @@
+import json
+import sqlite3
+import os
+import pandas as pd
+import numpy as np
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from running_stats import RunningStatistics
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "maintenance.db")
+
+BATCH_SIZE = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    id INTEGER PRIMARY KEY,
+    filename TEXT,
+    created_at TEXT NOT NULL,
+    asset_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY,
+    upload_id INTEGER NOT NULL REFERENCES uploads(id),
+    name TEXT NOT NULL,
+    risk_level TEXT NOT NULL,
+    risk_score REAL NOT NULL,
+    temperature REAL,
+    vibration REAL,
+    pressure REAL,
+    runtime INTEGER,
+    last_maintenance TEXT,
+    predicted_failure INTEGER,
+    readings INTEGER,
+    fingerprint TEXT,
+    active INTEGER NOT NULL DEFAULT 1,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assets_name ON assets(name);
+CREATE INDEX IF NOT EXISTS idx_assets_risk ON assets(active, risk_level, risk_score);
+CREATE INDEX IF NOT EXISTS idx_assets_upload ON assets(upload_id, name);
+CREATE INDEX IF NOT EXISTS idx_assets_created ON assets(created_at);
+
+CREATE TABLE IF NOT EXISTS fleet_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL,
+    aggregates TEXT,
+    statistics TEXT,
+    model_version INTEGER,
+    updated_at TEXT
+);
+INSERT OR IGNORE INTO fleet_state (id, version) VALUES (1, 0);
+
+CREATE TABLE IF NOT EXISTS readings (
+    upload_id INTEGER NOT NULL REFERENCES uploads(id),
+    asset_name TEXT,
+    timestamp TEXT,
+    temperature REAL,
+    vibration REAL,
+    pressure REAL,
+    runtime REAL
+);
+CREATE INDEX IF NOT EXISTS idx_readings_asset ON readings(upload_id, asset_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_readings_timestamp ON readings(timestamp);
+"""
+
+# API field name -> column name
+ASSET_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "riskLevel": "risk_level",
+    "riskScore": "risk_score",
+    "temperature": "temperature",
+    "vibration": "vibration",
+    "pressure": "pressure",
+    "runtime": "runtime",
+    "lastMaintenance": "last_maintenance",
+    "predictedFailure": "predicted_failure",
+    "readings": "readings",
+}
+
+READING_COLUMNS = ['asset_name', 'timestamp', 'temperature', 'vibration', 'pressure', 'runtime']
+
+# Column order of the row batches from iter_fleet_readings()
+READING_EXPORT_COLUMNS = ['asset_id'] + READING_COLUMNS
+
+# Columns added after the first release: (table, column, type)
+MIGRATIONS = [
+    ("assets", "fingerprint", "TEXT"),
+    ("fleet_state", "aggregates", "TEXT"),
+    ("fleet_state", "statistics", "TEXT"),
+    ("fleet_state", "model_version", "INTEGER"),
+    ("fleet_state", "updated_at", "TEXT"),
+]
+
+
+class AssetStore:
+    """
+    SQLite-backed store for scored assets and their raw readings
+
+    Every upload is kept; the assets of the most recent upload form the
+    active fleet served by the API. WAL mode lets several uvicorn workers
+    read while one of them writes.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv("ASSET_DB_PATH", DEFAULT_DB_PATH)
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        for table, column, column_type in MIGRATIONS:
+            columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_asset(row: sqlite3.Row) -> Dict:
+        asset = {field: row[column] for field, column in ASSET_FIELDS.items()}
+        if asset["readings"] is None:
+            del asset["readings"]
+        return asset
+
+    def begin_upload(self, filename: str) -> int:
+        """Register a new upload and return its id"""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO uploads (filename, created_at) VALUES (?, ?)",
+                (filename, datetime.now().isoformat()),
+            )
+            return cursor.lastrowid
+
+    def append_readings(self, upload_id: int, data: pd.DataFrame):
+        """Append a processed chunk of sensor readings in batched transactions"""
+        columns = {}
+        for col in READING_COLUMNS:
+            if col not in data.columns:
+                columns[col] = np.full(len(data), None, dtype=object)
+            elif col in ('asset_name', 'timestamp'):
+                values = data[col].astype(str).to_numpy(dtype=object)
+                values[data[col].isna().to_numpy()] = None
+                columns[col] = values
+            else:
+                columns[col] = data[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        rows = zip(
+            (upload_id for _ in range(len(data))),
+            *(columns[col].tolist() for col in READING_COLUMNS),
+        )
+        insert = (
+            "INSERT INTO readings (upload_id, asset_name, timestamp, temperature, vibration, pressure, runtime) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)"
+        )
+        with self._connection() as conn:
+            while True:
+                batch = [row for _, row in zip(range(BATCH_SIZE), rows)]
+                if not batch:
+                    break
+                conn.executemany(insert, batch)
+
+    @staticmethod
+    def _insert_assets(
+        conn: sqlite3.Connection,
+        upload_id: int,
+        assets: List[Dict],
+        fingerprints: Optional[Dict[str, str]],
+    ) -> List[Dict]:
+        """Insert assets as active with fresh ids; returns them with their ids"""
+        created_at = datetime.now().isoformat()
+        fingerprints = fingerprints or {}
+        next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM assets").fetchone()[0]
+
+        stored = []
+        for offset in range(0, len(assets), BATCH_SIZE):
+            batch = []
+            for asset in assets[offset:offset + BATCH_SIZE]:
+                asset = dict(asset, id=next_id + len(stored))
+                stored.append(asset)
+                batch.append((
+                    asset["id"], upload_id, asset["name"], asset["riskLevel"], asset["riskScore"],
+                    asset["temperature"], asset["vibration"], asset["pressure"], asset["runtime"],
+                    asset["lastMaintenance"], asset["predictedFailure"], asset.get("readings"),
+                    fingerprints.get(asset["name"]), created_at,
+                ))
+            conn.executemany(
+                "INSERT INTO assets (id, upload_id, name, risk_level, risk_score, temperature, vibration, "
+                "pressure, runtime, last_maintenance, predicted_failure, readings, fingerprint, active, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?)",
+                batch,
+            )
+        return stored
+
+    def replace_fleet(
+        self,
+        upload_id: int,
+        assets: List[Dict],
+        fingerprints: Optional[Dict[str, str]] = None,
+        aggregates: Optional[Dict[str, float]] = None,
+        model_version: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Make the given assets the active fleet
+
+        Previous assets stay in the store as history. Ids are assigned in
+        the same transaction, so the returned assets carry their store ids.
+        Fingerprints (by asset name), the fleet aggregates and the published
+        model version the assets were scored with are kept for later delta
+        uploads.
+        """
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE assets SET active = 0 WHERE active = 1")
+            stored = self._insert_assets(conn, upload_id, assets, fingerprints)
+
+            conn.execute("UPDATE uploads SET asset_count = ? WHERE id = ?", (len(stored), upload_id))
+            conn.execute(
+                "UPDATE fleet_state SET version = version + 1, aggregates = ?, model_version = ?, updated_at = ? "
+                "WHERE id = 1",
+                (json.dumps(aggregates) if aggregates else None, model_version, datetime.now().isoformat()),
+            )
+        return stored
+
+    def merge_fleet(self, upload_id: int, assets: List[Dict], fingerprints: Dict[str, str]) -> List[Dict]:
+        """
+        Replace only the named assets in the active fleet (delta uploads)
+
+        Active assets with the same names are retired to history; all other
+        active assets, their ids and their readings stay as they are.
+        """
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            names = [(asset["name"],) for asset in assets]
+            for offset in range(0, len(names), BATCH_SIZE):
+                conn.executemany(
+                    "UPDATE assets SET active = 0 WHERE active = 1 AND name = ?",
+                    names[offset:offset + BATCH_SIZE],
+                )
+            stored = self._insert_assets(conn, upload_id, assets, fingerprints)
+
+            conn.execute("UPDATE uploads SET asset_count = ? WHERE id = ?", (len(stored), upload_id))
+            if stored:
+                conn.execute(
+                    "UPDATE fleet_state SET version = version + 1, updated_at = ? WHERE id = 1",
+                    (datetime.now().isoformat(),),
+                )
+        return stored
+
+    def fleet_snapshot(self) -> Tuple[Dict[str, str], Optional[Dict[str, float]], Optional[int]]:
+        """
+        Fingerprints of the active fleet and the aggregates and model version it was scored with
+
+        Returns:
+            Tuple of (asset name -> fingerprint, aggregates or None when the
+            fleet was not stored with them, model version or None when it
+            was scored by an unpublished model)
+        """
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT name, fingerprint FROM assets WHERE active = 1 AND fingerprint IS NOT NULL"
+            ).fetchall()
+            aggregates, model_version = conn.execute(
+                "SELECT aggregates, model_version FROM fleet_state WHERE id = 1"
+            ).fetchone()
+        fingerprints = {row["name"]: row["fingerprint"] for row in rows}
+        return fingerprints, json.loads(aggregates) if aggregates else None, model_version
+
+    def running_statistics(self) -> RunningStatistics:
+        """Statistics of every reading scored so far (the seed for the next trained model)"""
+        with self._connection() as conn:
+            state = conn.execute("SELECT statistics FROM fleet_state WHERE id = 1").fetchone()[0]
+        return RunningStatistics.from_dict(json.loads(state) if state else None)
+
+    def merge_statistics(self, statistics: RunningStatistics):
+        """Fold an upload's statistics into the running statistics, atomically across workers"""
+        if not statistics.to_dict():
+            return
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            state = conn.execute("SELECT statistics FROM fleet_state WHERE id = 1").fetchone()[0]
+            merged = RunningStatistics.from_dict(json.loads(state) if state else None).merge(statistics)
+            conn.execute("UPDATE fleet_state SET statistics = ? WHERE id = 1", (json.dumps(merged.to_dict()),))
+
+    def discard_upload(self, upload_id: int):
+        """Remove an upload that failed before its fleet was stored"""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM readings WHERE upload_id = ?", (upload_id,))
+            conn.execute("DELETE FROM assets WHERE upload_id = ?", (upload_id,))
+            conn.execute("DELETE FROM uploads WHERE id = ?", (upload_id,))
+
+    def active_assets(self) -> List[Dict]:
+        """Return the active fleet ordered by id"""
+        with self._connection() as conn:
+            rows = conn.execute("SELECT * FROM assets WHERE active = 1 ORDER BY id").fetchall()
+        return [self._row_to_asset(row) for row in rows]
+
+    def _iter_snapshot(self, query: str, chunk_rows: int) -> Iterator[List[tuple]]:
+        """
+        Yield the rows of a read query in batches of up to chunk_rows tuples
+
+        All batches come from one read transaction, so a fleet replaced
+        while the caller is still consuming them does not mix in. The
+        connection may be used from several threads (a streaming response
+        iterates in the threadpool) and is closed when the generator is.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        try:
+            conn.execute("BEGIN")
+            cursor = conn.execute(query)
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    def iter_fleet(self, chunk_rows: int = BATCH_SIZE) -> Iterator[List[tuple]]:
+        """Active fleet as row tuples in ASSET_FIELDS order, ordered by id"""
+        columns = ", ".join(ASSET_FIELDS.values())
+        return self._iter_snapshot(f"SELECT {columns} FROM assets WHERE active = 1 ORDER BY id", chunk_rows)
+
+    def iter_fleet_readings(self, chunk_rows: int = BATCH_SIZE) -> Iterator[List[tuple]]:
+        """Raw readings of the active fleet as row tuples in READING_EXPORT_COLUMNS order"""
+        columns = ", ".join(f"r.{col}" for col in READING_COLUMNS)
+        return self._iter_snapshot(
+            f"SELECT a.id, {columns} FROM assets a "
+            "JOIN readings r ON r.upload_id = a.upload_id AND r.asset_name = a.name "
+            "WHERE a.active = 1 ORDER BY a.id, r.timestamp",
+            chunk_rows,
+        )
+
+    def count_active(self) -> int:
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM assets WHERE active = 1").fetchone()[0]
+
+    def get_asset(self, asset_id: int) -> Optional[Dict]:
+        """Look up any stored asset (active or historical) by id"""
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM assets WHERE id = ?", (asset_id,)).fetchone()
+        return self._row_to_asset(row) if row else None
+
+    def asset_readings(self, asset_id: int) -> Dict[str, np.ndarray]:
+        """
+        Load an asset's time-stamped readings as sorted column arrays
+
+        Returns:
+            Dict with "time" (datetime64[ns]) and one float array per sensor
+        """
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT r.timestamp, r.temperature, r.vibration, r.pressure FROM readings r "
+                "JOIN assets a ON r.upload_id = a.upload_id AND r.asset_name = a.name "
+                "WHERE a.id = ? AND r.timestamp IS NOT NULL ORDER BY r.timestamp",
+                (asset_id,),
+            ).fetchall()
+
+        times, temperature, vibration, pressure = zip(*rows) if rows else ((), (), (), ())
+        return {
+            "time": pd.to_datetime(pd.Series(times, dtype=object)).to_numpy(dtype="datetime64[ns]"),
+            "temperature": np.array(temperature, dtype=np.float64),
+            "vibration": np.array(vibration, dtype=np.float64),
+            "pressure": np.array(pressure, dtype=np.float64),
+        }
+
+    def clear_fleet(self) -> int:
+        """Deactivate the current fleet, keeping it as history"""
+        with self._connection() as conn:
+            count = conn.execute("UPDATE assets SET active = 0 WHERE active = 1").rowcount
+            conn.execute(
+                "UPDATE fleet_state SET version = version + 1, aggregates = NULL, model_version = NULL, "
+                "updated_at = ? WHERE id = 1",
+                (datetime.now().isoformat(),),
+            )
+            return count
+
+    def fleet_version(self) -> int:
+        """Counter bumped whenever the active fleet changes"""
+        with self._connection() as conn:
+            return conn.execute("SELECT version FROM fleet_state WHERE id = 1").fetchone()[0]
+
+    def fleet_updated_at(self, version: int) -> Optional[datetime]:
+        """When fleet version `version` was stored, or None if unknown or already replaced"""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT updated_at FROM fleet_state WHERE id = 1 AND version = ?", (version,)
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
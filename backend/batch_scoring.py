@@ -0,0 +1,149 @@
+import json
+from typing import AsyncIterator, Dict, List, Tuple, Union
+
+from starlette.responses import StreamingResponse
+
+from ml_model import MaintenancePredictor
+from feature_engine import build_feature_rows
+from ingestion import get_risk_level
+
+DEFAULT_BATCH_CHUNK = 10000
+
+# Identifier fields echoed back so callers can join results to inputs
+PASSTHROUGH_FIELDS = ('id', 'asset_name', 'timestamp')
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Union[Dict, Exception]]]:
+    """
+    Parse an NDJSON byte stream line by line
+
+    Yields (index, record) per non-empty line, or (index, error) for
+    lines that are not JSON objects.
+    """
+    buffer = b""
+    index = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, _parse_line(line)
+                index += 1
+    if buffer.strip():
+        yield index, _parse_line(buffer)
+
+
+def _parse_line(line: bytes) -> Union[Dict, Exception]:
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON: {e}")
+    if not isinstance(record, dict):
+        return ValueError("Each line must be a JSON object")
+    return record
+
+
+def parse_json_array(body: bytes) -> List[Tuple[int, Union[Dict, Exception]]]:
+    """Parse a JSON array body into indexed records; raises ValueError if it is not an array"""
+    records = json.loads(body)
+    if not isinstance(records, list):
+        raise ValueError("JSON body must be an array of readings")
+    return [
+        (index, record if isinstance(record, dict) else ValueError("Each item must be a JSON object"))
+        for index, record in enumerate(records)
+    ]
+
+
+async def iter_items(items: List[Tuple[int, Union[Dict, Exception]]]) -> AsyncIterator[Tuple[int, Union[Dict, Exception]]]:
+    for item in items:
+        yield item
+
+
+async def stream_scores(
+    model: MaintenancePredictor,
+    items: AsyncIterator[Tuple[int, Union[Dict, Exception]]],
+    score_chunk,
+    chunk_size: int = DEFAULT_BATCH_CHUNK,
+) -> AsyncIterator[bytes]:
+    """
+    Score parsed readings in chunks and yield NDJSON result lines
+
+    score_chunk(model, chunk) is awaited per chunk so callers decide
+    where the CPU work runs.
+    """
+    chunk = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield to_ndjson(await score_chunk(model, chunk))
+            chunk = []
+    if chunk:
+        yield to_ndjson(await score_chunk(model, chunk))
+
+
+def score_records(model: MaintenancePredictor, items: List[Tuple[int, Union[Dict, Exception]]]) -> List[Dict]:
+    """
+    Score one chunk of parsed readings with a single vectorized predict call
+
+    Items that failed to parse come back as error results in place, so
+    the output keeps the input order.
+    """
+    valid = [(index, record) for index, record in items if not isinstance(record, Exception)]
+    scored = {}
+    if valid:
+        try:
+            features = build_feature_rows([record for _, record in valid], model.fleet_aggregates())
+            predictions = model.predict(features)
+            scored = {index: _result(index, record, p) for (index, record), p in zip(valid, predictions)}
+        except (TypeError, ValueError):
+            # A bad value somewhere in the chunk; score row by row to isolate it
+            scored = {index: _score_one(model, index, record) for index, record in valid}
+
+    return [
+        error_result(index, record) if isinstance(record, Exception) else scored[index]
+        for index, record in items
+    ]
+
+
+def _score_one(model: MaintenancePredictor, index: int, record: Dict) -> Dict:
+    try:
+        prediction = model.predict(build_feature_rows([record], model.fleet_aggregates()))[0]
+    except (TypeError, ValueError) as e:
+        return error_result(index, e)
+    return _result(index, record, prediction)
+
+
+def _result(index: int, record: Dict, prediction: float) -> Dict:
+    result = {"index": index}
+    for field in PASSTHROUGH_FIELDS:
+        if field in record:
+            result[field] = record[field]
+    result.update({
+        "riskScore": round(float(prediction * 100), 2),
+        "riskLevel": get_risk_level(prediction),
+        "predictedFailure": int(30 * (1 - prediction)),
+    })
+    return result
+
+
+def error_result(index: int, error: Exception) -> Dict:
+    return {"index": index, "error": str(error)}
+
+
+def to_ndjson(results: List[Dict]) -> bytes:
+    return b"".join(json.dumps(result).encode() + b"\n" for result in results)
+
+
+class RequestStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body iterator keeps reading the request body
+
+    Starlette's default disconnect listener consumes receive() messages,
+    which would swallow the rest of an NDJSON upload; results are streamed
+    directly instead and a disconnect surfaces as a send error.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
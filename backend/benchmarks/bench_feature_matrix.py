@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized feature engine against the legacy iterrows loop
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from feature_engine import build_feature_matrix
+
+
+def make_frame(n_rows):
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'temperature': rng.normal(75, 10, n_rows),
+        'vibration': rng.normal(1.0, 0.3, n_rows),
+        'pressure': rng.normal(95, 5, n_rows),
+        'runtime': rng.integers(100, 6000, n_rows),
+    })
+
+
+def legacy_feature_matrix(processed_data):
+    """The per-row loop /upload/ used before the feature engine"""
+    feature_list = []
+    for _, row in processed_data.iterrows():
+        features = [
+            row.get('temperature', 0),
+            row.get('temperature', 0) ** 2,
+            processed_data['temperature'].std() if 'temperature' in processed_data.columns else 10,
+            processed_data['temperature'].max() if 'temperature' in processed_data.columns else 85,
+            row.get('vibration', 0),
+            row.get('vibration', 0) ** 2,
+            processed_data['vibration'].max() if 'vibration' in processed_data.columns else 2.5,
+            row.get('pressure', 0),
+            processed_data['pressure'].std() if 'pressure' in processed_data.columns else 5,
+            row.get('runtime', 0),
+            abs(row.get('temperature', 0) - 75) / 10,
+            abs(row.get('vibration', 0) - 1.0) / 0.3,
+            abs(row.get('pressure', 0) - 95) / 5,
+            row.get('temperature', 0) * row.get('vibration', 0),
+            row.get('runtime', 0) / 6000,
+            int(row.get('runtime', 0) > 4000)
+        ]
+        feature_list.append(features)
+    return np.array(feature_list)
+
+
+def time_call(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 200_000])
+    parser.add_argument('--legacy-max', type=int, default=10_000,
+                        help='Skip the legacy path above this many rows (it is quadratic)')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'legacy rows/s':>15} {'vectorized rows/s':>18} {'speedup':>9}")
+    for n_rows in args.sizes:
+        df = make_frame(n_rows)
+        vectorized = time_call(build_feature_matrix, df)
+
+        if n_rows <= args.legacy_max:
+            legacy = time_call(legacy_feature_matrix, df, repeat=1)
+            assert np.allclose(legacy_feature_matrix(df.head(100)), build_feature_matrix(df.head(100)))
+            legacy_rate = f"{n_rows / legacy:15,.0f}"
+            speedup = f"{legacy / vectorized:8.0f}x"
+        else:
+            legacy_rate = f"{'skipped':>15}"
+            speedup = f"{'-':>9}"
+
+        print(f"{n_rows:>10,} {legacy_rate} {n_rows / vectorized:18,.0f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
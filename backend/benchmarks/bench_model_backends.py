@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Compare model backends: training time, predict throughput and accuracy
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ml_model import MaintenancePredictor, MODEL_BACKENDS
+from train_real_model import generate_realistic_training_data
+
+
+def time_call(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5_000, 50_000, 500_000],
+                        help='Training set sizes (e.g. up to 5000000)')
+    parser.add_argument('--backends', nargs='+', default=list(MODEL_BACKENDS), choices=MODEL_BACKENDS)
+    parser.add_argument('--gbm-max', type=int, default=500_000,
+                        help='Skip the single-threaded gbm backend above this many rows')
+    parser.add_argument('--batch', type=int, default=64, help='Rows per small-batch latency call')
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'backend':>9} {'train s':>9} {'accuracy':>9} "
+          f"{'sklearn rows/s':>15} {'flat rows/s':>13} {'sklearn ms/batch':>17} {'flat ms/batch':>14}")
+    for n_rows in args.sizes:
+        X, y, _ = generate_realistic_training_data(n_samples=n_rows)
+        split = int(n_rows * 0.8)
+        X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
+
+        for backend in args.backends:
+            if backend == "gbm" and n_rows > args.gbm_max:
+                print(f"{n_rows:>10,} {backend:>9} {'skipped':>9}")
+                continue
+
+            model = MaintenancePredictor(autoload=False, backend=backend)
+            start = time.perf_counter()
+            model.train(X_train, y_train)
+            train_time = time.perf_counter() - start
+
+            X_scaled = model.scaler.transform(X_test)
+            sklearn_scores = model.model.predict_proba(X_scaled)[:, 1]
+            flat = model.flat_model()
+            if flat is None:
+                raise SystemExit(f"{backend}: flat inference is unavailable with this scikit-learn version")
+            assert np.allclose(flat.predict_proba(X_scaled), sklearn_scores)
+            accuracy = ((sklearn_scores > 0.5) == y_test).mean()
+
+            sklearn_time = time_call(lambda: model.model.predict_proba(X_scaled))
+            flat_time = time_call(flat.predict_proba, X_scaled)
+            batch = X_scaled[:args.batch]
+            sklearn_batch = time_call(lambda: model.model.predict_proba(batch), repeat=50)
+            flat_batch = time_call(flat.predict_proba, batch, repeat=50)
+
+            print(f"{n_rows:>10,} {backend:>9} {train_time:9.2f} {accuracy:9.2%} "
+                  f"{len(X_test) / sklearn_time:15,.0f} {len(X_test) / flat_time:13,.0f} "
+                  f"{sklearn_batch * 1000:17.3f} {flat_batch * 1000:14.3f}")
+
+
+if __name__ == "__main__":
+    main()
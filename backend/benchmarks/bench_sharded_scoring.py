@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Scaling of sharded multi-process scoring from 1 to N worker processes
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ml_model import MaintenancePredictor, MODEL_BACKENDS
+from sharded_scoring import ShardedScorer
+from train_real_model import generate_realistic_training_data
+
+
+def time_call(fn, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2_000_000, help='Feature rows to score (e.g. 10000000)')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--backend', default='gbm', choices=MODEL_BACKENDS)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    X_train, y_train, _ = generate_realistic_training_data(n_samples=5000)
+    model = MaintenancePredictor(autoload=False, backend=args.backend)
+    model.train(X_train, y_train)
+
+    rng = np.random.default_rng(0)
+    X = X_train[rng.integers(0, len(X_train), args.rows)]
+    print(f"Scoring {args.rows:,} rows ({X.nbytes / 1e6:.0f} MB of features), "
+          f"{args.backend} backend, {os.cpu_count()} CPUs")
+
+    expected = model.predict(X)
+    baseline = time_call(model.predict, X, repeat=args.repeat)
+    print(f"\n{'workers':>8} {'seconds':>9} {'rows/s':>13} {'speedup':>8}")
+    print(f"{'in-proc':>8} {baseline:9.2f} {args.rows / baseline:13,.0f} {1.0:8.2f}")
+
+    for workers in range(1, args.max_workers + 1):
+        scorer = ShardedScorer(workers=workers, min_rows=0)
+        scorer.load(model)
+        try:
+            # First call starts the pool and ships the model to the workers
+            assert np.array_equal(scorer.predict(X), expected)
+            seconds = time_call(scorer.predict, X, repeat=args.repeat)
+        finally:
+            scorer.shutdown()
+        print(f"{workers:>8} {seconds:9.2f} {args.rows / seconds:13,.0f} {baseline / seconds:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import BinaryIO, Callable, Dict, Optional
+
+
+class PoolBusyError(Exception):
+    """Raised when too many heavy jobs are already waiting for the pool"""
+
+
+class ComputePool:
+    """
+    Runs CPU-heavy work (CSV parsing, scoring, PDF rendering) off the event loop
+
+    At most max_concurrent jobs run at once; up to max_queued more may
+    wait for a slot, and anything beyond that is rejected with
+    PoolBusyError so the API can answer 503 instead of piling up work.
+
+    Configured with COMPUTE_POOL (thread|process), COMPUTE_WORKERS,
+    MAX_HEAVY_JOBS and MAX_QUEUED_JOBS. With a process pool, functions
+    and arguments must be picklable.
+    """
+
+    def __init__(
+        self,
+        kind: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        max_concurrent: Optional[int] = None,
+        max_queued: Optional[int] = None,
+    ):
+        self.kind = (kind or os.getenv("COMPUTE_POOL", "thread")).lower()
+        if self.kind not in ("thread", "process"):
+            raise ValueError("COMPUTE_POOL must be 'thread' or 'process'")
+        self.max_workers = max_workers or int(os.getenv("COMPUTE_WORKERS", min(4, os.cpu_count() or 1)))
+        self.max_concurrent = max_concurrent or int(os.getenv("MAX_HEAVY_JOBS", self.max_workers))
+        self.max_queued = max_queued if max_queued is not None else int(os.getenv("MAX_QUEUED_JOBS", 8))
+
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def is_process(self) -> bool:
+        return self.kind == "process"
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.is_process:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="compute")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._loop = loop
+        return self._semaphore
+
+    def check_capacity(self):
+        """Raise PoolBusyError if a new job would be rejected right now"""
+        if self._get_semaphore().locked() and self.waiting >= self.max_queued:
+            self.rejected += 1
+            raise PoolBusyError("Server is busy with other heavy jobs, retry shortly")
+
+    async def run(self, fn: Callable, *args, queue: bool = False, **kwargs):
+        """
+        Run fn(*args, **kwargs) in the pool, waiting for a free slot
+
+        With queue=True the job always waits instead of being rejected
+        (for follow-up chunks of a request that was already admitted).
+        """
+        semaphore = self._get_semaphore()
+        if not queue:
+            self.check_capacity()
+
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), partial(fn, *args, **kwargs))
+        finally:
+            self.running -= 1
+            self.completed += 1
+            semaphore.release()
+
+    def status(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def spill_to_disk(source: BinaryIO, suffix: str = ".csv") -> str:
+    """Copy an upload to a named temporary file so another process can read it"""
+    source.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as target:
+        shutil.copyfileobj(source, target, length=1024 * 1024)
+        return target.name
@@ -0,0 +1,136 @@
+import os
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from data_processor import DataProcessor
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # the pyarrow engine is optional
+    pa = None
+    pa_csv = None
+
+CSV_ENGINES = ("c", "pyarrow")
+
+# Bytes per pyarrow CSV block; sized so a block holds roughly chunk_rows rows
+ARROW_BYTES_PER_ROW = 64
+
+
+class CsvSchema:
+    """
+    Columns and dtypes to read from an uploaded sensor CSV
+
+    Built from DataProcessor.expected_columns and column_dtypes and matched
+    against the file's header the same way process_sensor_data normalizes
+    names (stripped, lower case). Other columns, e.g. free-text notes, are
+    never parsed. A file with none of the expected columns is read whole.
+    """
+
+    def __init__(self, dtypes: Dict[str, object]):
+        self.dtypes = dtypes
+
+    @classmethod
+    def from_processor(cls, processor: DataProcessor) -> "CsvSchema":
+        return cls({col: processor.column_dtypes.get(col, str) for col in processor.expected_columns})
+
+    def resolve(self, header: List[str]) -> Dict:
+        """read_csv keyword arguments (usecols, dtype) for a file with this header"""
+        usecols = [name for name in header if str(name).strip().lower() in self.dtypes]
+        if not usecols:
+            return {}
+        return {
+            "usecols": usecols,
+            "dtype": {name: self.dtypes[str(name).strip().lower()] for name in usecols},
+        }
+
+
+def _read_header(source: BinaryIO) -> List[str]:
+    source.seek(0)
+    header = list(pd.read_csv(source, nrows=0, encoding='utf-8').columns)
+    source.seek(0)
+    return header
+
+
+def _arrow_type(dtype) -> "pa.DataType":
+    return pa.string() if dtype is str else pa.from_numpy_dtype(dtype)
+
+
+def _arrow_chunks(source: BinaryIO, chunk_rows: int, typed: Dict) -> Iterator[pd.DataFrame]:
+    """Stream record batches through pyarrow's multithreaded CSV reader"""
+    convert = pa_csv.ConvertOptions(
+        include_columns=typed.get("usecols"),
+        column_types={name: _arrow_type(dtype) for name, dtype in typed.get("dtype", {}).items()},
+        strings_can_be_null=True,
+    )
+    read = pa_csv.ReadOptions(use_threads=True, block_size=max(chunk_rows * ARROW_BYTES_PER_ROW, 1 << 20))
+    reader = pa_csv.open_csv(source, read_options=read, convert_options=convert)
+    for batch in reader:
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def _pandas_chunks(source: BinaryIO, chunk_rows: int, typed: Dict) -> Iterator[pd.DataFrame]:
+    return pd.read_csv(source, chunksize=chunk_rows, encoding='utf-8', **typed)
+
+
+def read_csv_chunks(
+    source: BinaryIO,
+    chunk_rows: int,
+    schema: Optional[CsvSchema] = None,
+    engine: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV file object in chunks of about chunk_rows rows
+
+    With a schema only its columns are read, with declared dtypes, so
+    pandas neither infers types nor materializes unused columns. If a value
+    does not fit its declared dtype (e.g. "n/a" spelled differently in a
+    numeric column), reading restarts with type inference and skips the
+    rows already yielded; DataProcessor then coerces them as before.
+
+    Args:
+        source: Seekable binary file object
+        chunk_rows: Rows per chunk (approximate with the pyarrow engine)
+        schema: CsvSchema to apply, or None to infer every column
+        engine: "c" or "pyarrow" (CSV_ENGINE, default "c"); pyarrow decodes
+            blocks on several threads and falls back to "c" if missing
+
+    Returns:
+        Iterator of DataFrame chunks
+    """
+    engine = (engine or os.getenv("CSV_ENGINE", "c")).lower()
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"CSV_ENGINE must be one of {', '.join(CSV_ENGINES)}")
+    if engine == "pyarrow" and pa_csv is None:
+        print("⚠ CSV_ENGINE=pyarrow but pyarrow is not installed, using the C parser")
+        engine = "c"
+
+    header = _read_header(source)
+    typed = schema.resolve(header) if schema is not None else {}
+    read = _arrow_chunks if engine == "pyarrow" else _pandas_chunks
+
+    rows_done = 0
+    try:
+        for chunk in read(source, chunk_rows, typed):
+            rows_done += len(chunk)
+            yield chunk
+        return
+    except pd.errors.ParserError:
+        raise
+    except ValueError as e:
+        if not typed.get("dtype"):
+            raise
+        print(f"Typed CSV parse failed after {rows_done} rows ({e}), retrying with type inference")
+
+    source.seek(0)
+    untyped = {"usecols": typed["usecols"]}
+    for chunk in _pandas_chunks(source, chunk_rows, untyped):
+        if rows_done >= len(chunk):
+            rows_done -= len(chunk)
+            continue
+        if rows_done:
+            chunk = chunk.iloc[rows_done:]
+            rows_done = 0
+        yield chunk
@@ -1,61 +1,218 @@
+import os
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
+
+from running_stats import RunningStatistics
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+DATE_FORMAT = '%Y-%m-%d'
+
+SENSOR_COLUMNS = ['temperature', 'vibration', 'pressure', 'runtime']
+
+# Fill for missing sensor readings when no statistics have seen the column
+# (typical healthy readings, as in the training data)
+DEFAULT_FILL_VALUES = {'temperature': 75.0, 'vibration': 1.0, 'pressure': 95.0, 'runtime': 3000.0}
+
+# Consumer of processed frames -> derived columns it reads. Lean mode only
+# builds the columns some active consumer needs.
+#   features: feature_engine computes anomalies from fleet aggregates itself
+#   asset_windows: AssetWindowState passes the parsed date on to the assets
+#   readings: AssetStore.append_readings stores the raw sensor columns
+CONSUMERS = {
+    'features': [],
+    'asset_windows': ['last_maintenance'],
+    'readings': [],
+}
+
+DERIVED_COLUMNS = ['temp_anomaly', 'vibration_severity', 'last_maintenance', 'days_since_maintenance']
+PROCESSOR_MODES = ('lean', 'full')
+
+
+class StageMemory:
+    """
+    Peak frame size after each processing stage, over all chunks of an upload
+
+    Uses shallow memory_usage (text columns count their pointers only), so
+    recording stays cheap enough to run on every chunk.
+    """
 
-class DataProcessor:
     def __init__(self):
+        self.peak_bytes: Dict[str, int] = {}
+
+    def record(self, stage: str, df: pd.DataFrame):
+        size = int(df.memory_usage(index=False, deep=False).sum())
+        if size > self.peak_bytes.get(stage, 0):
+            self.peak_bytes[stage] = size
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.peak_bytes)
+
+    def report(self) -> str:
+        return ", ".join(f"{stage} {size / 1e6:.1f} MB" for stage, size in self.peak_bytes.items())
+
+
+def parse_datetimes(values: pd.Series, fmt: str) -> pd.Series:
+    """
+    to_datetime with a known format, falling back to inference per value
+
+    The fixed format takes pandas' fast strptime path; only values in some
+    other layout pay for format inference. Unparseable values become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+    unparsed = parsed.isna() & values.notna()
+    if unparsed.any():
+        parsed[unparsed] = pd.to_datetime(values[unparsed], format='mixed', errors='coerce')
+    return parsed
+
+
+class DataProcessor:
+    """
+    Cleans and types uploaded sensor readings
+
+    mode "lean" (DATA_PROCESSOR_MODE, the default) only builds the derived
+    columns that the given consumers read (see CONSUMERS); "full" builds
+    all of them. float32 (DATA_PROCESSOR_FLOAT32=1) parses sensor columns
+    as float32, halving their memory at the cost of float32 precision in
+    stored readings.
+    """
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        float32: Optional[bool] = None,
+        consumers: Optional[Iterable[str]] = None,
+    ):
         self.expected_columns = [
             'asset_name', 'timestamp', 'temperature', 'vibration', 
             'pressure', 'runtime', 'last_maintenance'
         ]
+        self.mode = (mode or os.getenv("DATA_PROCESSOR_MODE", "lean")).lower()
+        if self.mode not in PROCESSOR_MODES:
+            raise ValueError(f"DATA_PROCESSOR_MODE must be one of {', '.join(PROCESSOR_MODES)}")
+        if float32 is None:
+            float32 = os.getenv("DATA_PROCESSOR_FLOAT32", "0") == "1"
+        self.float32 = float32
+
+        consumers = list(CONSUMERS) if consumers is None else list(consumers)
+        unknown = [c for c in consumers if c not in CONSUMERS]
+        if unknown:
+            raise ValueError(f"Unknown consumers: {', '.join(unknown)}")
+        if self.mode == 'full':
+            self.derived_columns = set(DERIVED_COLUMNS)
+        else:
+            self.derived_columns = {col for consumer in consumers for col in CONSUMERS[consumer]}
+
+        # Parse types of the expected columns; dates stay text until
+        # convert_data_types parses them with a fixed format
+        float_dtype = 'float32' if self.float32 else 'float64'
+        self.column_dtypes = {
+            'asset_name': str,
+            'timestamp': str,
+            'temperature': float_dtype,
+            'vibration': float_dtype,
+            'pressure': float_dtype,
+            'runtime': float_dtype,
+            'last_maintenance': str,
+        }
+        self.timestamp_format = TIMESTAMP_FORMAT
+        self.date_format = DATE_FORMAT
     
-    def process_sensor_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Process uploaded sensor CSV data"""
-        df.columns = df.columns.str.strip().str.lower()
-        df = self.handle_missing_values(df)
+    def process_sensor_data(
+        self,
+        df: pd.DataFrame,
+        memory: Optional[StageMemory] = None,
+        statistics: Optional[RunningStatistics] = None,
+    ) -> pd.DataFrame:
+        """
+        Process uploaded sensor CSV data
+
+        Works on df in place (it is normally a freshly parsed chunk) and
+        replaces whole columns rather than writing through column views.
+        With memory, the frame size after each stage is recorded; with
+        statistics (the model's), missing readings are filled with their
+        means and temp_anomaly is scored against them.
+        """
+        columns = df.columns.str.strip().str.lower()
+        if not columns.equals(df.columns):
+            df.columns = columns
+        if memory is not None:
+            memory.record('parse', df)
+        # Coerce first, so unparseable values are filled like empty cells
         df = self.convert_data_types(df)
-        df = self.add_derived_features(df)
+        df = self.handle_missing_values(df, statistics)
+        if memory is not None:
+            memory.record('clean', df)
+        df = self.add_derived_features(df, statistics)
+        if memory is not None:
+            memory.record('derive', df)
         return df
     
-    def handle_missing_values(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Handle missing values in the dataset"""
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_columns:
-            df[col].fillna(df[col].median(), inplace=True)
+    def handle_missing_values(self, df: pd.DataFrame, statistics: Optional[RunningStatistics] = None) -> pd.DataFrame:
+        """
+        Fill missing sensor readings
+
+        Uses the mean from statistics when they have seen the column, else
+        DEFAULT_FILL_VALUES, never a value computed from df itself, so the
+        fill does not depend on how an upload was chunked.
+        """
+        for col in SENSOR_COLUMNS:
+            if col in df.columns and pd.api.types.is_numeric_dtype(df[col]) and df[col].hasnans:
+                if statistics is not None and statistics.count(col):
+                    fill = statistics.mean(col)
+                else:
+                    fill = DEFAULT_FILL_VALUES[col]
+                df[col] = df[col].fillna(fill)
         return df
     
     def convert_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
         """Convert columns to appropriate data types"""
         if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+            df['timestamp'] = parse_datetimes(df['timestamp'], self.timestamp_format)
         
-        numeric_cols = ['temperature', 'vibration', 'pressure', 'runtime']
-        for col in numeric_cols:
-            if col in df.columns:
+        for col in SENSOR_COLUMNS:
+            # Already numeric when the CSV was read with column_dtypes
+            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
                 df[col] = pd.to_numeric(df[col], errors='coerce')
+            if self.float32 and col in df.columns and df[col].dtype == np.float64:
+                df[col] = df[col].astype(np.float32)
         
         return df
     
-    def add_derived_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Add derived features for better predictions"""
-        if 'temperature' in df.columns:
-            temp_mean = df['temperature'].mean()
-            temp_std = df['temperature'].std()
+    def add_derived_features(self, df: pd.DataFrame, statistics: Optional[RunningStatistics] = None) -> pd.DataFrame:
+        """
+        Add the derived columns in self.derived_columns
+
+        temp_anomaly is a z-score against statistics when they have seen
+        temperatures, so it does not depend on the chunk; otherwise against
+        the frame's own mean and std.
+        """
+        derived = self.derived_columns
+        if 'temperature' in df.columns and 'temp_anomaly' in derived:
+            if statistics is not None and statistics.count('temperature') > 1:
+                temp_mean = statistics.mean('temperature')
+                temp_std = statistics.std('temperature')
+            else:
+                temp_mean = df['temperature'].mean()
+                temp_std = df['temperature'].std()
             if temp_std > 0:
                 df['temp_anomaly'] = (df['temperature'] - temp_mean).abs() / temp_std
             else:
                 df['temp_anomaly'] = 0
         
-        if 'vibration' in df.columns:
+        if 'vibration' in df.columns and 'vibration_severity' in derived:
             df['vibration_severity'] = pd.cut(
                 df['vibration'], 
                 bins=[0, 1, 2, 10], 
                 labels=['low', 'medium', 'high']
             )
         
-        if 'last_maintenance' in df.columns:
-            df['last_maintenance'] = pd.to_datetime(df['last_maintenance'], errors='coerce')
-            df['days_since_maintenance'] = (pd.Timestamp.now() - df['last_maintenance']).dt.days
+        if 'last_maintenance' in df.columns and derived & {'last_maintenance', 'days_since_maintenance'}:
+            df['last_maintenance'] = parse_datetimes(df['last_maintenance'], self.date_format)
+            if 'days_since_maintenance' in derived:
+                df['days_since_maintenance'] = (pd.Timestamp.now() - df['last_maintenance']).dt.days
         
         return df
     
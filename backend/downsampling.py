@@ -0,0 +1,93 @@
+import numpy as np
+from typing import Dict
+
+
+def bucket_downsample(times: np.ndarray, series: Dict[str, np.ndarray], n_points: int) -> Dict[str, np.ndarray]:
+    """
+    Downsample time-sorted series into equal-width time buckets
+
+    Args:
+        times: Sorted timestamps as int64 (e.g. epoch nanoseconds)
+        series: Column name -> values aligned with times
+        n_points: Maximum number of buckets
+
+    Returns:
+        Dict with bucket start times under "time", and for every series
+        its mean under the series name plus "<name>_min" / "<name>_max".
+        Empty buckets are dropped. Non-finite values (missing readings)
+        are skipped; a bucket with no finite value gets NaN.
+    """
+    if len(times) <= n_points:
+        result = {"time": times}
+        for name, values in series.items():
+            result[name] = values
+            result[f"{name}_min"] = values
+            result[f"{name}_max"] = values
+        return result
+
+    start, end = int(times[0]), int(times[-1])
+    width = max((end - start) // n_points + 1, 1)
+    bucket = (times - start) // width
+    # First index of every non-empty bucket (times are sorted)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+
+    result = {"time": start + bucket[starts] * width}
+    for name, values in series.items():
+        values = np.asarray(values, dtype=np.float64)
+        finite = np.isfinite(values)
+        n_finite = np.add.reduceat(finite.astype(np.int64), starts)
+        with np.errstate(invalid='ignore'):
+            result[name] = np.add.reduceat(np.where(finite, values, 0.0), starts) / n_finite
+        # fmin/fmax skip NaN unless the whole bucket is NaN
+        values = np.where(finite, values, np.nan)
+        result[f"{name}_min"] = np.fmin.reduceat(values, starts)
+        result[f"{name}_max"] = np.fmax.reduceat(values, starts)
+    return result
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets point selection
+
+    Keeps the first and last point and, for every bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the mean of the next bucket.
+
+    Returns:
+        Sorted indices into x/y of the selected points
+    """
+    n = len(x)
+    if n_points >= n or n_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_points - 1).astype(np.int64)
+
+    selected = np.empty(n_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for i in range(n_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+        )
+        previous = lo + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def lttb_downsample(times: np.ndarray, series: Dict[str, np.ndarray], n_points: int, by: str) -> Dict[str, np.ndarray]:
+    """Downsample all series at the points LTTB selects for the `by` series (skipping its missing values)"""
+    keep = np.flatnonzero(np.isfinite(np.asarray(series[by], dtype=np.float64)))
+    indices = keep[lttb_indices(times[keep], np.asarray(series[by])[keep], n_points)]
+    result = {"time": times[indices]}
+    for name, values in series.items():
+        result[name] = np.asarray(values)[indices]
+    return result
@@ -0,0 +1,291 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+FEATURE_COLUMNS = [
+    'temperature',
+    'temperature_sq',
+    'temperature_std',
+    'temperature_max',
+    'vibration',
+    'vibration_sq',
+    'vibration_max',
+    'pressure',
+    'pressure_std',
+    'runtime',
+    'temp_anomaly',
+    'vib_anomaly',
+    'pressure_anomaly',
+    'temp_vib_interaction',
+    'runtime_normalized',
+    'high_runtime',
+]
+
+FEATURE_DTYPE = np.float64
+
+# Fleet-wide reference values used for columns the model's statistics have
+# not seen (see RunningStatistics.aggregates). These match the training layout.
+DEFAULT_FLEET_AGGREGATES = {
+    'temperature_std': 10.0,
+    'temperature_max': 85.0,
+    'vibration_max': 2.5,
+    'pressure_std': 5.0,
+}
+
+
+def compute_fleet_aggregates(data: pd.DataFrame) -> Dict[str, float]:
+    """Compute the fleet-wide aggregates once for a whole batch"""
+    aggregates = dict(DEFAULT_FLEET_AGGREGATES)
+    if 'temperature' in data.columns:
+        aggregates['temperature_std'] = float(data['temperature'].std())
+        aggregates['temperature_max'] = float(data['temperature'].max())
+    if 'vibration' in data.columns:
+        aggregates['vibration_max'] = float(data['vibration'].max())
+    if 'pressure' in data.columns:
+        aggregates['pressure_std'] = float(data['pressure'].std())
+    return aggregates
+
+
+def build_features(
+    temperature,
+    vibration,
+    pressure,
+    runtime,
+    aggregates: Optional[Dict[str, float]] = None,
+) -> np.ndarray:
+    """Build the (n, 16) feature matrix from raw sensor columns"""
+    aggregates = aggregates or DEFAULT_FLEET_AGGREGATES
+    temperature = np.asarray(temperature, dtype=FEATURE_DTYPE)
+    vibration = np.asarray(vibration, dtype=FEATURE_DTYPE)
+    pressure = np.asarray(pressure, dtype=FEATURE_DTYPE)
+    runtime = np.asarray(runtime, dtype=FEATURE_DTYPE)
+
+    X = np.empty((len(temperature), len(FEATURE_COLUMNS)), dtype=FEATURE_DTYPE)
+    X[:, 0] = temperature
+    np.square(temperature, out=X[:, 1])
+    X[:, 2] = aggregates['temperature_std']
+    X[:, 3] = aggregates['temperature_max']
+    X[:, 4] = vibration
+    np.square(vibration, out=X[:, 5])
+    X[:, 6] = aggregates['vibration_max']
+    X[:, 7] = pressure
+    X[:, 8] = aggregates['pressure_std']
+    X[:, 9] = runtime
+    X[:, 10] = np.abs(temperature - 75) / 10
+    X[:, 11] = np.abs(vibration - 1.0) / 0.3
+    X[:, 12] = np.abs(pressure - 95) / 5
+    np.multiply(temperature, vibration, out=X[:, 13])
+    X[:, 14] = runtime / 6000
+    X[:, 15] = runtime > 4000
+    return X
+
+
+def build_feature_matrix(
+    data: pd.DataFrame,
+    aggregates: Optional[Dict[str, float]] = None,
+) -> np.ndarray:
+    """Build the feature matrix for every row of a processed sensor frame"""
+    if aggregates is None:
+        aggregates = compute_fleet_aggregates(data)
+
+    n = len(data)
+
+    def column(name):
+        if name in data.columns:
+            return data[name].to_numpy(dtype=FEATURE_DTYPE, na_value=np.nan)
+        return np.zeros(n, dtype=FEATURE_DTYPE)
+
+    return build_features(
+        column('temperature'),
+        column('vibration'),
+        column('pressure'),
+        column('runtime'),
+        aggregates,
+    )
+
+
+def build_feature_row(data: Dict, aggregates: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Build a (1, 16) feature matrix for a single reading"""
+    return build_features(
+        [data.get('temperature', 0)],
+        [data.get('vibration', 0)],
+        [data.get('pressure', 0)],
+        [data.get('runtime', 0)],
+        aggregates,
+    )
+
+
+# Per-asset window features, in MaintenancePredictor.extract_features order
+ASSET_WINDOW_COLUMNS = [
+    'temperature_mean',
+    'temperature_std',
+    'temperature_max',
+    'temperature_min',
+    'vibration_mean',
+    'vibration_std',
+    'vibration_max',
+    'pressure_mean',
+    'pressure_std',
+    'runtime_max',
+    'temperature_diff',
+    'vibration_diff',
+    'pressure_diff',
+    'temperature_rolling',
+    'vibration_rolling',
+    'pressure_rolling',
+]
+
+SENSOR_COLUMNS = ['temperature', 'vibration', 'pressure']
+DEFAULT_WINDOW = 10
+
+
+class AssetWindowState:
+    """
+    Mergeable per-asset time-series state
+
+    Holds count/mean/M2/min/max per sensor, the first reading and the
+    last `window` readings of every asset, so partial states built from
+    separate chunks can be merged and finalized into the same window
+    features a single pass over all readings would give.
+    """
+
+    def __init__(self, stats: pd.DataFrame, first: pd.DataFrame, tail: pd.DataFrame, window: int):
+        self.stats = stats
+        self.first = first
+        self.tail = tail
+        self.window = window
+
+    @staticmethod
+    def _sorted(df: pd.DataFrame) -> pd.DataFrame:
+        keys = ['asset_name', 'timestamp', '_row'] if 'timestamp' in df.columns else ['asset_name', '_row']
+        return df.sort_values(keys, kind='stable', na_position='last')
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, window: int = DEFAULT_WINDOW, row_offset: int = 0) -> 'AssetWindowState':
+        """Build the state for one processed frame with an asset_name column"""
+        df = data.copy(deep=False)
+        df['_row'] = np.arange(row_offset, row_offset + len(df))
+        df['asset_name'] = df['asset_name'].fillna('Unknown')
+        for col in SENSOR_COLUMNS:
+            if col not in df.columns:
+                df[col] = np.nan
+        if 'runtime' not in df.columns:
+            df['runtime'] = 0
+        df = cls._sorted(df)
+
+        groups = df.groupby('asset_name', sort=False)
+        stats = {}
+        for col in SENSOR_COLUMNS:
+            grouped = groups[col]
+            count = grouped.count()
+            stats[f'{col}_count'] = count
+            stats[f'{col}_mean'] = grouped.mean()
+            stats[f'{col}_m2'] = grouped.var(ddof=0) * count
+            stats[f'{col}_max'] = grouped.max()
+            stats[f'{col}_min'] = grouped.min()
+        stats['runtime_max'] = groups['runtime'].max()
+        stats['readings'] = groups.size()
+
+        return cls(pd.DataFrame(stats), groups.head(1), groups.tail(window), window)
+
+    def merge(self, other: 'AssetWindowState') -> 'AssetWindowState':
+        """Combine two partial states (Chan et al. parallel mean/variance)"""
+        a = self.stats
+        b = other.stats.reindex(a.index.union(other.stats.index, sort=False))
+        a = a.reindex(b.index)
+        merged = {}
+        for col in SENSOR_COLUMNS:
+            n_a = a[f'{col}_count'].fillna(0)
+            n_b = b[f'{col}_count'].fillna(0)
+            n = n_a + n_b
+            mean_a = a[f'{col}_mean'].fillna(0)
+            mean_b = b[f'{col}_mean'].fillna(0)
+            delta = mean_b - mean_a
+            safe_n = n.where(n > 0)
+            merged[f'{col}_count'] = n
+            merged[f'{col}_mean'] = mean_a + delta * n_b / safe_n
+            merged[f'{col}_m2'] = (
+                a[f'{col}_m2'].fillna(0) + b[f'{col}_m2'].fillna(0)
+                + delta ** 2 * n_a * n_b / safe_n
+            )
+            merged[f'{col}_max'] = np.fmax(a[f'{col}_max'], b[f'{col}_max'])
+            merged[f'{col}_min'] = np.fmin(a[f'{col}_min'], b[f'{col}_min'])
+        merged['runtime_max'] = np.fmax(a['runtime_max'], b['runtime_max'])
+        merged['readings'] = a['readings'].fillna(0) + b['readings'].fillna(0)
+
+        first = self._sorted(pd.concat([self.first, other.first])).groupby('asset_name', sort=False).head(1)
+        tail = self._sorted(pd.concat([self.tail, other.tail])).groupby('asset_name', sort=False).tail(self.window)
+        return AssetWindowState(pd.DataFrame(merged), first, tail, self.window)
+
+    def finalize(self) -> pd.DataFrame:
+        """
+        Compute the window features per asset
+
+        Returns:
+            DataFrame indexed by asset_name (in order of first appearance)
+            with ASSET_WINDOW_COLUMNS, the reading count and the latest
+            reading's timestamp/last_maintenance
+        """
+        stats = self.stats
+        first = self.first.set_index('asset_name')
+        last_rows = self.tail.groupby('asset_name', sort=False)
+        last = last_rows.tail(1).set_index('asset_name')
+        rolling = last_rows[SENSOR_COLUMNS].mean()
+
+        result = pd.DataFrame(index=stats.index)
+        for col in SENSOR_COLUMNS:
+            n = stats[f'{col}_count']
+            result[f'{col}_mean'] = stats[f'{col}_mean'].where(n > 0)
+            result[f'{col}_std'] = np.sqrt(stats[f'{col}_m2'] / (n - 1).where(n > 1))
+            result[f'{col}_max'] = stats[f'{col}_max']
+            result[f'{col}_min'] = stats[f'{col}_min']
+        result['runtime_max'] = stats['runtime_max']
+
+        steps = (stats['readings'] - 1).where(stats['readings'] > 1)
+        for col in SENSOR_COLUMNS:
+            diff = (last[col].reindex(result.index) - first[col].reindex(result.index)) / steps
+            result[f'{col}_diff'] = diff.fillna(0)
+            result[f'{col}_rolling'] = rolling[col].reindex(result.index)
+
+        result['readings'] = stats['readings'].astype(int)
+        for col in ['timestamp', 'last_maintenance']:
+            if col in last.columns:
+                result[col] = last[col].reindex(result.index)
+
+        order = first['_row'].reindex(result.index).sort_values(kind='stable').index
+        return result.loc[order, ASSET_WINDOW_COLUMNS + [c for c in result.columns if c not in ASSET_WINDOW_COLUMNS]]
+
+
+def aggregate_asset_windows(data: pd.DataFrame, window: int = DEFAULT_WINDOW) -> pd.DataFrame:
+    """Compute window features for every asset of a processed frame in one pass"""
+    return AssetWindowState.from_frame(data, window).finalize()
+
+
+def build_asset_feature_matrix(windows: pd.DataFrame, aggregates: Dict[str, float]) -> np.ndarray:
+    """
+    Build the model feature matrix with one row per asset
+
+    Each asset is scored on the mean of its most recent readings
+    (the rolling window) and its highest runtime.
+    """
+    return build_features(
+        windows['temperature_rolling'].to_numpy(),
+        windows['vibration_rolling'].to_numpy(),
+        windows['pressure_rolling'].to_numpy(),
+        windows['runtime_max'].to_numpy(),
+        aggregates,
+    )
+
+
+def build_feature_rows(records: List[Dict], aggregates: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Build the feature matrix for a list of reading dicts (missing values count as 0)"""
+    def column(name):
+        return np.fromiter((r.get(name) or 0 for r in records), dtype=FEATURE_DTYPE, count=len(records))
+
+    return build_features(
+        column('temperature'),
+        column('vibration'),
+        column('pressure'),
+        column('runtime'),
+        aggregates,
+    )
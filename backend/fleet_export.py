@@ -0,0 +1,167 @@
+import csv
+import io
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Arrow and Parquet exports are optional
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Arrow type name per exported column, in the column order of the store's
+# row batches (ASSET_FIELDS and READING_EXPORT_COLUMNS)
+ASSET_EXPORT_TYPES = {
+    "id": "int64",
+    "name": "string",
+    "riskLevel": "string",
+    "riskScore": "float64",
+    "temperature": "float64",
+    "vibration": "float64",
+    "pressure": "float64",
+    "runtime": "int64",
+    "lastMaintenance": "string",
+    "predictedFailure": "int64",
+    "readings": "int64",
+}
+READING_EXPORT_TYPES = {
+    "asset_id": "int64",
+    "asset_name": "string",
+    "timestamp": "string",
+    "temperature": "float64",
+    "vibration": "float64",
+    "pressure": "float64",
+    "runtime": "float64",
+}
+
+
+class ExportFormatUnavailable(Exception):
+    """Raised when an export format needs an optional package that is not installed"""
+
+
+def check_format(fmt: str):
+    """Raise ValueError for unknown formats, ExportFormatUnavailable if pyarrow is missing"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    if fmt != "csv" and pa is None:
+        raise ExportFormatUnavailable(f"{fmt} export requires pyarrow (pip install pyarrow)")
+
+
+class _ChunkSink:
+    """
+    Write-only file object that hands back what was written since the last drain
+
+    Keeps its own position count, since Parquet writers record byte
+    offsets for the footer and the buffer itself is emptied on each drain.
+    """
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _csv_chunks(batches: Iterable[List[tuple]], columns: Sequence[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _schema(types: dict):
+    return pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in types.items()])
+
+
+def _record_batch(rows: List[tuple], schema) -> "pa.RecordBatch":
+    """Transpose a batch of row tuples into typed Arrow columns"""
+    columns = zip(*rows)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+def _arrow_chunks(batches: Iterable[List[tuple]], schema, fmt: str) -> Iterator[bytes]:
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    try:
+        for rows in batches:
+            batch = _record_batch(rows, schema)
+            if fmt == "parquet":
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def stream_export(batches: Iterable[List[tuple]], kind: str, fmt: str) -> Iterator[bytes]:
+    """
+    Encode row batches from the store as a byte stream
+
+    Each batch is encoded and released before the next is read, so memory
+    stays bounded by the batch size whatever the fleet size. Parquet gets
+    one row group per batch; Arrow uses the IPC streaming format.
+
+    Args:
+        batches: Row tuples from AssetStore.iter_fleet() or iter_fleet_readings()
+        kind: "assets" or "readings"
+        fmt: "csv", "arrow" or "parquet" (see check_format)
+
+    Returns:
+        Iterator of encoded chunks
+    """
+    types = ASSET_EXPORT_TYPES if kind == "assets" else READING_EXPORT_TYPES
+    if fmt == "csv":
+        return _csv_chunks(batches, list(types))
+    return _arrow_chunks(batches, _schema(types), fmt)
+
+
+def export_headers(kind: str, fmt: str, stamp: str) -> Tuple[str, dict]:
+    """Media type and Content-Disposition header for an export download"""
+    media_type, extension = EXPORT_FORMATS[fmt]
+    return media_type, {"Content-Disposition": f"attachment; filename=fleet_{kind}_{stamp}.{extension}"}
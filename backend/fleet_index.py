@@ -0,0 +1,171 @@
+import base64
+import bisect
+import heapq
+import json
+import threading
+from functools import cached_property
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from fleet_stats import RISK_LEVELS, FleetStats
+
+
+class FleetIndex:
+    """
+    Immutable snapshot of the active fleet with lookup indexes
+
+    Built once per fleet version and swapped in by reference, so readers
+    never see a half-built index.
+    """
+
+    def __init__(self, assets: Iterable[Dict], version: int = 0):
+        self.version = version
+        self.assets = sorted(assets, key=lambda a: a['id'])
+        self.by_id = {asset['id']: asset for asset in self.assets}
+
+        self.by_name: Dict[str, List[Dict]] = {}
+        self.by_risk: Dict[str, List[Dict]] = {level: [] for level in RISK_LEVELS}
+        for asset in self.assets:
+            self.by_name.setdefault(asset['name'], []).append(asset)
+            self.by_risk.setdefault(asset['riskLevel'], []).append(asset)
+
+        self.by_score = sorted(self.assets, key=lambda a: (-a['riskScore'], a['id']))
+        self.by_risk_score = {
+            level: sorted(group, key=lambda a: (-a['riskScore'], a['id']))
+            for level, group in self.by_risk.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+    @cached_property
+    def stats(self) -> FleetStats:
+        """Fleet statistics, computed on first use and kept with this version"""
+        return FleetStats(self.assets)
+
+    def get(self, asset_id: int) -> Optional[Dict]:
+        return self.by_id.get(asset_id)
+
+    def query(
+        self,
+        risk_levels: Optional[List[str]] = None,
+        name: Optional[str] = None,
+        sort: Optional[str] = None,
+        descending: bool = True,
+    ) -> List[Dict]:
+        """
+        Filter and sort the fleet using the prebuilt indexes
+
+        Args:
+            risk_levels: Only include these risk levels
+            name: Only include assets with this exact name
+            sort: "riskScore" or None for id order
+            descending: Sort direction for riskScore
+
+        Returns:
+            Matching assets (shared with the index, do not mutate)
+        """
+        by_score = sort == "riskScore"
+
+        if name is not None:
+            result = self.by_name.get(name, [])
+            if risk_levels:
+                result = [a for a in result if a['riskLevel'] in risk_levels]
+            if by_score:
+                result = sorted(result, key=lambda a: (-a['riskScore'], a['id']))
+        elif risk_levels:
+            source = self.by_risk_score if by_score else self.by_risk
+            groups = [source.get(level, []) for level in dict.fromkeys(risk_levels)]
+            if len(groups) == 1:
+                result = groups[0]
+            elif by_score:
+                result = list(heapq.merge(*groups, key=lambda a: (-a['riskScore'], a['id'])))
+            else:
+                result = list(heapq.merge(*groups, key=lambda a: a['id']))
+        else:
+            result = self.by_score if by_score else self.assets
+
+        if by_score and not descending:
+            return result[::-1]
+        return result
+
+
+def sort_key(sort: Optional[str], descending: bool = True) -> Callable[[Dict], tuple]:
+    """Key that query() results are ascending in, used for keyset pagination"""
+    if sort == "riskScore":
+        if descending:
+            return lambda a: (-a['riskScore'], a['id'])
+        return lambda a: (a['riskScore'], -a['id'])
+    return lambda a: (a['id'],)
+
+
+def encode_cursor(key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor from encode_cursor; raises ValueError if malformed"""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(key, list) or not all(isinstance(k, (int, float)) for k in key):
+        raise ValueError("Invalid cursor")
+    return tuple(key)
+
+
+def paginate(
+    assets: List[Dict],
+    key: Callable[[Dict], tuple],
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Return one page of a sorted query result
+
+    The cursor is the sort key of the last asset returned, so pages stay
+    consistent when the fleet changes between requests.
+    """
+    start = 0
+    if cursor:
+        start = bisect.bisect_right(assets, decode_cursor(cursor), key=key)
+    page = assets[start:start + limit]
+    next_cursor = None
+    if start + limit < len(assets) and page:
+        next_cursor = encode_cursor(key(page[-1]))
+    return page, next_cursor
+
+
+def project(assets: List[Dict], fields: Optional[List[str]]) -> List[Dict]:
+    """Keep only the requested fields (id is always included)"""
+    if not fields:
+        return assets
+    keep = ['id'] + [f for f in fields if f != 'id']
+    return [{f: asset[f] for f in keep if f in asset} for asset in assets]
+
+
+class FleetIndexCache:
+    """
+    Keeps the FleetIndex in step with the store's fleet version
+
+    Every worker checks the (cheap) version counter and rebuilds its own
+    index when another worker changed the fleet.
+    """
+
+    def __init__(self, load_assets: Callable[[], List[Dict]], load_version: Callable[[], int]):
+        self._load_assets = load_assets
+        self._load_version = load_version
+        self._lock = threading.Lock()
+        self._index = FleetIndex([], version=-1)
+
+    def rebuild(self) -> FleetIndex:
+        with self._lock:
+            version = self._load_version()
+            index = FleetIndex(self._load_assets(), version)
+            self._index = index
+            return index
+
+    def current(self) -> FleetIndex:
+        index = self._index
+        if index.version != self._load_version():
+            return self.rebuild()
+        return index
@@ -0,0 +1,72 @@
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, List
+
+import numpy as np
+
+RISK_LEVELS = ("healthy", "warning", "critical")
+
+# Column -> reading above which an asset is flagged in the recommendations
+ALERT_THRESHOLDS = {
+    "temperature": 85.0,
+    "vibration": 2.0,
+    "runtime": 4500,
+}
+
+NUMERIC_COLUMNS = ("riskScore", "temperature", "vibration", "pressure", "runtime", "predictedFailure")
+RISK_PERCENTILES = (50, 90, 99)
+
+
+class FleetStats:
+    """
+    Counts, means, percentiles and threshold tallies for a list of assets
+
+    The asset dicts are read once into a (n_assets, n_columns) float
+    matrix; everything else is computed column-wise with numpy. Build it
+    once per fleet version (FleetIndex.stats does) and share the result
+    between the API summary, the PDF report and /fleet/stats/.
+    """
+
+    def __init__(self, assets: List[Dict]):
+        self.total_assets = len(assets)
+        self.level_counts = {level: 0 for level in RISK_LEVELS}
+        self.level_counts.update(Counter(map(itemgetter('riskLevel'), assets)))
+
+        if assets:
+            values = np.array(list(map(itemgetter(*NUMERIC_COLUMNS), assets)), dtype=np.float64)
+        else:
+            values = np.empty((0, len(NUMERIC_COLUMNS)))
+        self.columns = dict(zip(NUMERIC_COLUMNS, values.T))
+
+        if self.total_assets:
+            self.means = dict(zip(NUMERIC_COLUMNS, values.mean(axis=0).tolist()))
+            self.maxima = dict(zip(NUMERIC_COLUMNS, values.max(axis=0).tolist()))
+            percentiles = np.percentile(self.columns['riskScore'], RISK_PERCENTILES).tolist()
+        else:
+            self.means = dict.fromkeys(NUMERIC_COLUMNS, 0.0)
+            self.maxima = dict.fromkeys(NUMERIC_COLUMNS, 0.0)
+            percentiles = [0.0] * len(RISK_PERCENTILES)
+        self.risk_percentiles = {f"p{p}": round(v, 2) for p, v in zip(RISK_PERCENTILES, percentiles)}
+        self.alerts = {
+            column: int((self.columns[column] > threshold).sum())
+            for column, threshold in ALERT_THRESHOLDS.items()
+        }
+
+    def summary(self) -> Dict:
+        """The fleet summary returned by /upload/ and printed in the report"""
+        return {
+            "total_assets": self.total_assets,
+            **self.level_counts,
+            "avg_risk_score": round(self.means['riskScore'], 2),
+        }
+
+    def as_dict(self) -> Dict:
+        """Summary plus sensor means/maxima, risk percentiles and alert tallies"""
+        return {
+            **self.summary(),
+            "risk_score_percentiles": self.risk_percentiles,
+            "means": {column: round(value, 2) for column, value in self.means.items()},
+            "maxima": {column: round(value, 2) for column, value in self.maxima.items()},
+            "alerts": dict(self.alerts),
+            "alert_thresholds": dict(ALERT_THRESHOLDS),
+        }
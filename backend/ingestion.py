@@ -0,0 +1,435 @@
+import numpy as np
+import pandas as pd
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+from contextlib import contextmanager
+from datetime import datetime
+
+from asset_store import AssetStore
+from csv_reader import CsvSchema, read_csv_chunks
+from data_processor import DataProcessor, StageMemory
+from ml_model import MaintenancePredictor
+from running_stats import RunningStatistics
+from feature_engine import (
+    AssetWindowState,
+    build_feature_matrix,
+    build_asset_feature_matrix,
+)
+
+DEFAULT_CHUNK_ROWS = 50000
+
+
+def get_risk_level(score: float) -> str:
+    """Convert risk score to level"""
+    if score > 0.7:
+        return "critical"
+    elif score > 0.4:
+        return "warning"
+    return "healthy"
+
+
+def _reading(row: pd.Series, col: str) -> float:
+    """Sensor value of an asset row; 0 when the column is absent or has no readings"""
+    value = row.get(col, 0)
+    return float(value) if pd.notna(value) else 0.0
+
+
+def generate_asset_predictions(data: pd.DataFrame, predictions: np.ndarray, id_offset: int = 0) -> List[Dict]:
+    """Generate asset list with predictions"""
+    assets = []
+
+    for idx, (_, row) in enumerate(data.iterrows()):
+        if idx >= len(predictions):
+            break
+
+        risk_score = predictions[idx] * 100
+        risk_level = get_risk_level(predictions[idx])
+        asset_id = id_offset + idx + 1
+
+        try:
+            asset = {
+                "id": asset_id,
+                "name": str(row.get('asset_name', f'Asset-{asset_id}')),
+                "riskLevel": risk_level,
+                "riskScore": round(float(risk_score), 2),
+                "temperature": _reading(row, 'temperature'),
+                "vibration": _reading(row, 'vibration'),
+                "pressure": _reading(row, 'pressure'),
+                "runtime": int(_reading(row, 'runtime')),
+                "lastMaintenance": str(row.get('last_maintenance', datetime.now().strftime('%Y-%m-%d'))),
+                "predictedFailure": int(30 * (1 - predictions[idx]))
+            }
+            if 'readings' in row:
+                asset["readings"] = int(row['readings'])
+            assets.append(asset)
+        except Exception as e:
+            print(f"Error processing row {asset_id}: {e}")
+            continue
+
+    return assets
+
+
+class RunningSummary:
+    """Fleet summary accumulated chunk by chunk"""
+
+    def __init__(self):
+        self.counts = {"healthy": 0, "warning": 0, "critical": 0}
+        self.total_assets = 0
+        self.risk_score_sum = 0.0
+
+    def update(self, assets: List[Dict]):
+        for asset in assets:
+            self.counts[asset['riskLevel']] += 1
+            self.risk_score_sum += asset['riskScore']
+        self.total_assets += len(assets)
+
+    def as_dict(self) -> Dict:
+        avg = self.risk_score_sum / self.total_assets if self.total_assets else 0.0
+        return {
+            "total_assets": self.total_assets,
+            **self.counts,
+            "avg_risk_score": round(avg, 2),
+        }
+
+
+def _no_progress(stage: str, fraction: float = 0.0):
+    pass
+
+
+def _stream_size(source: BinaryIO) -> int:
+    source.seek(0, 2)
+    size = source.tell()
+    source.seek(0)
+    return size
+
+
+def _stream_fraction(source: BinaryIO, total_bytes: int) -> float:
+    """Share of the file the CSV parser has read so far (approximate, it reads ahead)"""
+    if not total_bytes:
+        return 1.0
+    return min(source.tell() / total_bytes, 1.0)
+
+
+def _read_chunks(source: BinaryIO, chunk_rows: int, processor: DataProcessor):
+    """Chunks of the columns processor uses, parsed with their declared dtypes"""
+    source.seek(0)
+    return read_csv_chunks(source, chunk_rows, CsvSchema.from_processor(processor))
+
+
+def _asset_names(chunk: pd.DataFrame) -> pd.Series:
+    """asset_name as the strings assets are stored under"""
+    return chunk['asset_name'].fillna('Unknown').astype(str)
+
+
+class FleetSnapshot:
+    """
+    Per-asset fingerprints of the raw CSV rows plus the fleet aggregates used to score them
+
+    A fingerprint is the wrapping sum of the asset's row hashes (asset_name,
+    timestamp and every value) plus its row count, so it does not depend on
+    row order or on how the file was chunked. Delta uploads compare them with
+    the stored fleet to find the assets that need re-scoring. statistics
+    collects the upload's own readings for the store's running statistics.
+    """
+
+    def __init__(self, aggregates: Optional[Dict[str, float]] = None):
+        self.aggregates = aggregates
+        self.statistics = RunningStatistics()
+        self._parts: List[pd.DataFrame] = []
+
+    def update(self, chunk: pd.DataFrame):
+        if 'asset_name' not in chunk.columns or len(chunk) == 0:
+            return
+        # Hash numbers as float64 and everything else as text, so dtype
+        # inference differences between chunks do not change the hash
+        normalized = pd.DataFrame({
+            col: chunk[col].astype(np.float64) if pd.api.types.is_numeric_dtype(chunk[col])
+            else chunk[col].astype(str).where(chunk[col].notna(), '')
+            for col in sorted(chunk.columns)
+        })
+        hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+        part = pd.DataFrame({'name': _asset_names(chunk).to_numpy(), 'hash': hashes})
+        self._parts.append(part.groupby('name', sort=False)['hash'].agg(['sum', 'count']))
+
+    def fingerprints(self) -> Dict[str, str]:
+        if not self._parts:
+            return {}
+        totals = pd.concat(self._parts).groupby(level=0, sort=False).sum()
+        return {
+            name: f"{int(total):016x}:{int(count)}"
+            for name, total, count in zip(totals.index, totals['sum'], totals['count'])
+        }
+
+
+def asset_window_frame(windows: pd.DataFrame) -> pd.DataFrame:
+    """Flatten per-asset window features into the reading layout assets are built from"""
+    frame = pd.DataFrame({
+        'asset_name': windows.index,
+        'temperature': windows['temperature_rolling'].to_numpy(),
+        'vibration': windows['vibration_rolling'].to_numpy(),
+        'pressure': windows['pressure_rolling'].to_numpy(),
+        'runtime': windows['runtime_max'].to_numpy(),
+        'readings': windows['readings'].to_numpy(),
+    })
+    if 'last_maintenance' in windows.columns:
+        frame['last_maintenance'] = windows['last_maintenance'].to_numpy()
+    return frame
+
+
+def ingest_csv_stream(
+    source: BinaryIO,
+    processor: DataProcessor,
+    model: MaintenancePredictor,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    per_asset: bool = True,
+    on_chunk: Optional[Callable[[pd.DataFrame], None]] = None,
+    on_progress: Optional[Callable[[str, float], None]] = None,
+    snapshot: Optional[FleetSnapshot] = None,
+    memory: Optional[StageMemory] = None,
+) -> Tuple[List[Dict], Dict]:
+    """
+    Score a CSV file object chunk by chunk with bounded memory
+
+    The fleet-wide features come from the model's frozen statistics, not
+    from the file, so scores never depend on the chunk size or on how a
+    fleet is split across uploads. With per_asset (and an asset_name
+    column) readings are folded into a mergeable per-asset window state
+    while streaming, and one prediction is made per asset at the end.
+    Otherwise every row is an asset and each chunk is scored as it is read.
+
+    Args:
+        source: Seekable binary file object (e.g. UploadFile.file)
+        processor: DataProcessor applied to every chunk
+        model: MaintenancePredictor used for scoring
+        chunk_rows: Number of CSV rows parsed per chunk
+        per_asset: Group readings by asset_name
+        on_chunk: Called with every processed chunk (e.g. to persist readings)
+        on_progress: Called with (stage, fraction) as the stages parse,
+            process, feature and predict advance
+        snapshot: Filled with per-asset fingerprints, the fleet aggregates
+            and the upload's statistics, for later delta uploads
+        memory: Records the peak frame size of each processing stage
+
+    Returns:
+        Tuple of (assets, summary)
+    """
+    if on_progress is None:
+        on_progress = _no_progress
+    total_bytes = _stream_size(source)
+
+    aggregates = model.fleet_aggregates()
+    windows = None
+    assets = []
+    summary = RunningSummary()
+    rows_seen = 0
+    on_progress("parse", 0.0)
+    for chunk in _read_chunks(source, chunk_rows, processor):
+        on_progress("parse", _stream_fraction(source, total_bytes))
+        if snapshot is not None:
+            snapshot.update(chunk)
+        processed = processor.process_sensor_data(chunk, memory, model.statistics)
+        if snapshot is not None:
+            snapshot.statistics.update(processed)
+        if on_chunk is not None and len(processed):
+            on_chunk(processed)
+        per_asset = per_asset and 'asset_name' in processed.columns
+        if per_asset and len(processed):
+            state = AssetWindowState.from_frame(processed, row_offset=rows_seen)
+            windows = state if windows is None else windows.merge(state)
+        elif len(processed):
+            # Row-wise: every row is an asset, scored as soon as it is read
+            predictions = model.predict(build_feature_matrix(processed, aggregates))
+            chunk_assets = generate_asset_predictions(processed, predictions, id_offset=rows_seen)
+            summary.update(chunk_assets)
+            assets.extend(chunk_assets)
+        rows_seen += len(processed)
+
+    if rows_seen == 0:
+        raise pd.errors.EmptyDataError("CSV file is empty")
+
+    on_progress("process", 1.0)
+    if snapshot is not None:
+        snapshot.aggregates = aggregates
+
+    if per_asset:
+        assets = _score_windows(windows, aggregates, model, on_progress)
+        summary.update(assets)
+        return assets, summary.as_dict()
+
+    on_progress("feature", 1.0)
+    on_progress("predict", 1.0)
+    return assets, summary.as_dict()
+
+
+def _score_windows(
+    windows: AssetWindowState,
+    aggregates: Dict[str, float],
+    model: MaintenancePredictor,
+    on_progress: Callable[[str, float], None],
+) -> List[Dict]:
+    """One prediction per asset from its finalized window"""
+    asset_windows = windows.finalize()
+    on_progress("feature", 0.0)
+    features = build_asset_feature_matrix(asset_windows, aggregates)
+    on_progress("predict", 0.0)
+    predictions = model.predict(features)
+    assets = generate_asset_predictions(asset_window_frame(asset_windows), predictions)
+    on_progress("predict", 1.0)
+    return assets
+
+
+def ingest_csv_delta(
+    source: BinaryIO,
+    processor: DataProcessor,
+    model: MaintenancePredictor,
+    known: Dict[str, str],
+    aggregates: Dict[str, float],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    on_chunk: Optional[Callable[[pd.DataFrame], None]] = None,
+    on_progress: Optional[Callable[[str, float], None]] = None,
+    memory: Optional[StageMemory] = None,
+    statistics: Optional[RunningStatistics] = None,
+) -> Tuple[List[Dict], Dict[str, str], Dict]:
+    """
+    Score only the assets whose rows changed since the stored fleet
+
+    The first pass only parses and fingerprints the file. The second pass
+    runs the DataProcessor, window features and model on the rows of new
+    or changed assets, using the aggregates the stored fleet was scored
+    with so unchanged and re-scored assets stay comparable.
+
+    Args:
+        source: Seekable binary file object with an asset_name column
+        known: Asset name -> fingerprint of the stored fleet
+        aggregates: Fleet aggregates the stored fleet was scored with
+        statistics: Updated with the readings of the re-scored assets
+
+    Returns:
+        Tuple of (re-scored assets, their fingerprints, counts)
+    """
+    if on_progress is None:
+        on_progress = _no_progress
+    total_bytes = _stream_size(source)
+
+    scanned = FleetSnapshot()
+    on_progress("parse", 0.0)
+    for chunk in _read_chunks(source, chunk_rows, processor):
+        if 'asset_name' not in chunk.columns:
+            raise ValueError("Delta uploads need an asset_name column")
+        scanned.update(chunk)
+        on_progress("parse", _stream_fraction(source, total_bytes))
+
+    fingerprints = scanned.fingerprints()
+    if not fingerprints:
+        raise pd.errors.EmptyDataError("CSV file is empty")
+
+    changed = {name for name, fingerprint in fingerprints.items() if known.get(name) != fingerprint}
+    new = sum(1 for name in changed if name not in known)
+    counts = {
+        "new_assets": new,
+        "changed_assets": len(changed) - new,
+        "unchanged_assets": len(fingerprints) - len(changed),
+    }
+
+    changed_fingerprints = {name: fingerprints[name] for name in changed}
+    if not changed:
+        return [], changed_fingerprints, counts
+
+    on_progress("process", 0.0)
+    windows = None
+    rows_seen = 0
+    for chunk in _read_chunks(source, chunk_rows, processor):
+        chunk = chunk[_asset_names(chunk).isin(changed).to_numpy()]
+        if len(chunk) == 0:
+            continue
+        processed = processor.process_sensor_data(chunk, memory, model.statistics)
+        if statistics is not None:
+            statistics.update(processed)
+        if on_chunk is not None:
+            on_chunk(processed)
+        state = AssetWindowState.from_frame(processed, row_offset=rows_seen)
+        windows = state if windows is None else windows.merge(state)
+        rows_seen += len(processed)
+        on_progress("process", _stream_fraction(source, total_bytes))
+
+    return _score_windows(windows, aggregates, model, on_progress), changed_fingerprints, counts
+
+
+@contextmanager
+def _open_source(source: Union[str, BinaryIO]):
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            yield f
+    else:
+        yield source
+
+
+def ingest_upload(
+    source: Union[str, BinaryIO],
+    db_path: str,
+    upload_id: int,
+    processor: DataProcessor,
+    model: MaintenancePredictor,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    per_asset: bool = True,
+    on_progress: Optional[Callable[[str, float], None]] = None,
+) -> Tuple[List[Dict], Dict, FleetSnapshot]:
+    """
+    Parse, score and persist the readings of one upload
+
+    Self-contained so it can run in a worker thread or process: source
+    is a file object or a path, and readings are written through a store
+    opened on db_path. Once scored, the upload's readings are merged into
+    the store's running statistics.
+
+    Returns:
+        Tuple of (assets, summary with the peak bytes per processing stage
+        under "processing_memory", snapshot for later delta uploads)
+    """
+    store = AssetStore(db_path)
+    snapshot = FleetSnapshot()
+    memory = StageMemory()
+
+    def persist(chunk: pd.DataFrame):
+        store.append_readings(upload_id, chunk)
+
+    with _open_source(source) as f:
+        assets, summary = ingest_csv_stream(
+            f, processor, model, chunk_rows, per_asset, persist, on_progress, snapshot, memory
+        )
+    store.merge_statistics(snapshot.statistics)
+    print(f"Processing peak memory ({processor.mode}): {memory.report()}")
+    return assets, {**summary, "processing_memory": memory.as_dict()}, snapshot
+
+
+def ingest_upload_delta(
+    source: Union[str, BinaryIO],
+    db_path: str,
+    upload_id: int,
+    processor: DataProcessor,
+    model: MaintenancePredictor,
+    known: Dict[str, str],
+    aggregates: Dict[str, float],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    on_progress: Optional[Callable[[str, float], None]] = None,
+) -> Tuple[List[Dict], Dict[str, str], Dict]:
+    """
+    ingest_csv_delta counterpart of ingest_upload (readings of changed assets only)
+
+    The counts also carry the peak bytes per processing stage under
+    "processing_memory".
+    """
+    store = AssetStore(db_path)
+    memory = StageMemory()
+    statistics = RunningStatistics()
+
+    def persist(chunk: pd.DataFrame):
+        store.append_readings(upload_id, chunk)
+
+    with _open_source(source) as f:
+        assets, fingerprints, counts = ingest_csv_delta(
+            f, processor, model, known, aggregates, chunk_rows, persist, on_progress, memory, statistics
+        )
+    store.merge_statistics(statistics)
+    if memory.peak_bytes:
+        print(f"Processing peak memory ({processor.mode}): {memory.report()}")
+    return assets, fingerprints, {**counts, "processing_memory": memory.as_dict()}
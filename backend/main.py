@@ -1,23 +1,65 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import StreamingResponse, FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Optional
-import io
-from datetime import datetime, timedelta
+import json
+import asyncio
+from datetime import datetime
 import traceback
 import os
-import time
+from contextlib import asynccontextmanager
 
 
-from ml_model import MaintenancePredictor
+from ml_model import MODEL_BACKENDS
+from model_registry import ModelRegistry
+from model_versions import ModelVersionError
+from app_state import SqliteAppState
+from micro_batcher import MicroBatcher
+from batch_scoring import RequestStreamingResponse, iter_ndjson, iter_items, parse_json_array, score_records, stream_scores
 from data_processor import DataProcessor
-from pdf_generator import MaintenanceReportGenerator
-
-app = FastAPI(title="AI Maintenance Predictor API")
+from pdf_generator import ReportCache, write_pdf_report
+from fleet_export import ExportFormatUnavailable, check_format, export_headers, stream_export
+from feature_engine import build_feature_row
+from downsampling import bucket_downsample, lttb_downsample
+from fleet_index import FleetIndexCache, RISK_LEVELS, sort_key, paginate, project
+from asset_store import AssetStore, ASSET_FIELDS
+from ingestion import ingest_upload, ingest_upload_delta, get_risk_level
+from compute_pool import ComputePool, PoolBusyError, spill_to_disk
+from training_worker import TrainingSupervisor
+from upload_jobs import UploadJobs, JobProgress, TERMINAL_STATUSES
+
+store = AssetStore()
+# Training job and model version shared by every uvicorn worker on the host
+app_state = SqliteAppState(store.db_path)
+registry = ModelRegistry(state=app_state)
+compute_pool = ComputePool()
+
+MODEL_POLL_SECONDS = float(os.getenv("MODEL_POLL_SECONDS", 2))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the model up once per worker before serving, unless MODEL_WARMUP=lazy
+    if os.getenv("MODEL_WARMUP", "startup").lower() != "lazy":
+        registry.get()
+    registry.watch(MODEL_POLL_SECONDS)
+    yield
+    await predict_batcher.shutdown()
+    registry.stop_watching()
+    compute_pool.shutdown()
+    registry.scorer.shutdown()
+
+
+app = FastAPI(title="AI Maintenance Predictor API", lifespan=lifespan)
+
+@app.exception_handler(PoolBusyError)
+async def pool_busy_handler(request: Request, exc: PoolBusyError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "5"})
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,10 +75,25 @@ if os.path.exists(static_path):
     app.mount("/assets", StaticFiles(directory=os.path.join(static_path, "assets")), name="assets")
     print(f"✓ Serving static files from: {static_path}")
 
-model = MaintenancePredictor()
 processor = DataProcessor()
 
-uploaded_assets = []
+UPLOAD_CHUNK_ROWS = int(os.getenv("UPLOAD_CHUNK_ROWS", 50000))
+BATCH_PREDICT_CHUNK = int(os.getenv("BATCH_PREDICT_CHUNK", 10000))
+DEFAULT_HISTORY_POINTS = 24
+MAX_HISTORY_POINTS = 2000
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+UPLOAD_JOB_POLL_SECONDS = float(os.getenv("UPLOAD_JOB_POLL_MS", 500)) / 1000
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 10000))
+
+upload_jobs = UploadJobs(store.db_path)
+report_cache = ReportCache(os.getenv("REPORT_CACHE_DIR", os.path.join(os.path.dirname(store.db_path), "reports")))
+predict_batcher = MicroBatcher(
+    lambda X: registry.get().predict(X),
+    max_batch_size=int(os.getenv("PREDICT_BATCH_MAX_SIZE", 64)),
+    max_wait_ms=float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", 2))
+)
+fleet = FleetIndexCache(store.active_assets, store.fleet_version)
 
 class Asset(BaseModel):
     id: int
@@ -57,6 +114,7 @@ class PredictionResponse(BaseModel):
 class TrainRequest(BaseModel):
     retrain: bool = False
     n_samples: Optional[int] = 5000
+    backend: Optional[str] = None
 
 class TrainResponse(BaseModel):
     status: str
@@ -64,149 +122,303 @@ class TrainResponse(BaseModel):
     metrics: dict
     training_time: float
 
-training_status = {
-    "is_training": False,
-    "progress": 0,
-    "message": "No training in progress"
-}
 
 @app.get("/")
-def read_root():
+async def read_root():
+    index = await run_in_threadpool(fleet.current)
+    model = await run_in_threadpool(registry.get)
     return {
         "message": "AI Maintenance Predictor API", 
         "status": "running", 
         "version": "1.0",
-        "assets_count": len(uploaded_assets),
+        "assets_count": len(index),
         "model_trained": model.is_trained
     }
 
+def rebuild_fleet():
+    """Reload the fleet index after an upload and compute its statistics"""
+    index = fleet.rebuild()
+    index.stats  # computed here, off the event loop, then cached with the index
+    return index
+
+async def ingest_and_store(
+    source, upload_id: int, model, per_asset: bool, on_progress=None, queue: bool = False, delta: bool = False
+):
+    """
+    Score an upload in the compute pool and store it as the active fleet
+
+    With delta, only assets whose rows changed since the stored fleet are
+    re-scored and merged into it; without a stored fleet to compare
+    against, or when the stored fleet was scored by another model version
+    (after a retrain, activation or rollback), this falls back to a full
+    upload so the fleet is never scored by two models.
+    """
+    known, aggregates, scored_by = await run_in_threadpool(store.fleet_snapshot) if delta else ({}, None, None)
+    if delta and known and scored_by != model.published_version:
+        print(f"Stored fleet was scored by model version {scored_by}, "
+              f"re-scoring all assets with version {model.published_version}")
+        known = {}
+    if delta and known and aggregates is not None:
+        changed, fingerprints, counts = await compute_pool.run(
+            ingest_upload_delta, source, store.db_path, upload_id, processor, model, known, aggregates,
+            chunk_rows=UPLOAD_CHUNK_ROWS, on_progress=on_progress, queue=queue
+        )
+        if on_progress is not None:
+            on_progress("persist", 0.0, f"Merging {len(changed)} changed assets")
+        await run_in_threadpool(store.merge_fleet, upload_id, changed, fingerprints)
+        index = await run_in_threadpool(rebuild_fleet)
+        assets = index.assets
+        memory = counts.pop("processing_memory")
+        summary = {**index.stats.summary(), "delta": counts, "processing_memory": memory}
+    else:
+        assets, ingest_summary, snapshot = await compute_pool.run(
+            ingest_upload, source, store.db_path, upload_id, processor, model,
+            chunk_rows=UPLOAD_CHUNK_ROWS, per_asset=per_asset, on_progress=on_progress, queue=queue
+        )
+        if on_progress is not None:
+            on_progress("persist", 0.0, f"Storing {len(assets)} assets")
+        assets = await run_in_threadpool(
+            lambda: store.replace_fleet(
+                upload_id, assets, snapshot.fingerprints(), snapshot.aggregates, model.published_version
+            )
+        )
+        summary = (await run_in_threadpool(rebuild_fleet)).stats.summary()
+        summary["processing_memory"] = ingest_summary["processing_memory"]
+    summary["model_used"] = "trained" if model.is_trained else "random"
+    return assets, summary
+
+async def run_upload_job(job_id: str, path: str, filename: str, upload_id: int, per_asset: bool, delta: bool):
+    """Background part of an async upload; progress and outcome go to upload_jobs"""
+    try:
+        model = await run_in_threadpool(registry.get)
+        progress = JobProgress(store.db_path, job_id)
+        assets, summary = await ingest_and_store(path, upload_id, model, per_asset, progress, queue=True, delta=delta)
+        print(f"Generated {len(assets)} assets from {filename} (job {job_id})")
+        await run_in_threadpool(
+            upload_jobs.update, job_id, status="completed", stage="persist", progress=100,
+            message=f"Processed {len(assets)} assets", summary=summary
+        )
+    except Exception as e:
+        await run_in_threadpool(store.discard_upload, upload_id)
+        if isinstance(e, pd.errors.EmptyDataError):
+            error = "CSV file is empty"
+        elif isinstance(e, pd.errors.ParserError):
+            error = f"CSV parsing error: {str(e)}"
+        elif isinstance(e, ValueError):
+            error = str(e)
+        else:
+            print(f"Error in upload job {job_id}: {str(e)}")
+            traceback.print_exc()
+            error = f"Error: {str(e)}"
+        await run_in_threadpool(upload_jobs.update, job_id, status="failed", message="Upload failed", error=error)
+    finally:
+        os.remove(path)
+
 @app.post("/upload/")
-async def upload_csv(file: UploadFile = File(...)):
-    """Upload sensor CSV data and get predictions"""
-    global uploaded_assets
-    
+async def upload_csv(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    per_asset: bool = True,
+    summary_only: bool = False,
+    async_job: bool = False,
+    delta: bool = False
+):
+    """
+    Upload sensor CSV data and get predictions
+
+    By default readings are grouped by asset_name and each asset gets one
+    prediction from its recent window; per_asset=false scores every row.
+    summary_only=true leaves the assets out of the response (fetch them
+    page by page from /assets/).
+
+    async_job=true returns a job id right away and processes the file in
+    the background; follow it at /upload/jobs/{job_id} or its /events stream.
+
+    delta=true only re-scores assets whose rows changed since the current
+    fleet and merges them into it (assets missing from the file are kept).
+    """
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
+    if delta and not per_asset:
+        raise HTTPException(status_code=400, detail="delta uploads require per_asset=true")
     
-    try:
-        contents = await file.read()
-        df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
-        
-        print(f"Received CSV with {len(df)} rows and columns: {df.columns.tolist()}")
-        
-        if len(df) == 0:
-            raise HTTPException(status_code=400, detail="CSV file is empty")
+    model = await run_in_threadpool(registry.get)
+    compute_pool.check_capacity()
+    upload_id = await run_in_threadpool(store.begin_upload, file.filename)
+
+    if async_job:
+        # The request's file is closed once the response is sent
+        path = await run_in_threadpool(spill_to_disk, file.file)
+        job_id = await run_in_threadpool(upload_jobs.create, file.filename, upload_id)
+        background_tasks.add_task(run_upload_job, job_id, path, file.filename, upload_id, per_asset, delta)
+        return {
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/upload/jobs/{job_id}",
+            "events_url": f"/upload/jobs/{job_id}/events"
+        }
 
-        processed_data = processor.process_sensor_data(df)
-        print(f"Processed data: {len(processed_data)} rows")
-        
-        if model.is_trained:
-            print("Using trained ML model for predictions...")
-            feature_list = []
-            
-            for _, row in processed_data.iterrows():
-                features = [
-                    row.get('temperature', 0),
-                    row.get('temperature', 0) ** 2,
-                    processed_data['temperature'].std() if 'temperature' in processed_data.columns else 10,
-                    processed_data['temperature'].max() if 'temperature' in processed_data.columns else 85,
-                    row.get('vibration', 0),
-                    row.get('vibration', 0) ** 2,
-                    processed_data['vibration'].max() if 'vibration' in processed_data.columns else 2.5,
-                    row.get('pressure', 0),
-                    processed_data['pressure'].std() if 'pressure' in processed_data.columns else 5,
-                    row.get('runtime', 0),
-                    abs(row.get('temperature', 0) - 75) / 10, 
-                    abs(row.get('vibration', 0) - 1.0) / 0.3, 
-                    abs(row.get('pressure', 0) - 95) / 5,
-                    row.get('temperature', 0) * row.get('vibration', 0),
-                    row.get('runtime', 0) / 6000,        
-                    int(row.get('runtime', 0) > 4000)        
-                ]
-                feature_list.append(features)
-
-            X_features = np.array(feature_list)
-            predictions = model.predict(X_features)
-            print(f"Generated {len(predictions)} predictions using trained model")
-        else:
-            print("Warning: Model not trained, using random predictions for demo")
-            predictions = np.random.random(len(processed_data))
-            print(f"Generated {len(predictions)} random predictions")
+    spilled = None
+    try:
+        source = file.file
+        if compute_pool.is_process:
+            source = spilled = await run_in_threadpool(spill_to_disk, file.file)
 
-        assets = generate_asset_predictions(processed_data, predictions)
-        print(f"Generated {len(assets)} assets")
-        
-        uploaded_assets = assets
-
-        summary = {
-            "total_assets": len(assets),
-            "healthy": sum(1 for a in assets if a['riskLevel'] == 'healthy'),
-            "warning": sum(1 for a in assets if a['riskLevel'] == 'warning'),
-            "critical": sum(1 for a in assets if a['riskLevel'] == 'critical'),
-            "avg_risk_score": round(np.mean([a['riskScore'] for a in assets]), 2),
-            "model_used": "trained" if model.is_trained else "random"
-        }
+        assets, summary = await ingest_and_store(source, upload_id, model, per_asset, delta=delta)
+        print(f"Generated {len(assets)} assets from {file.filename}")
         
+        if summary_only:
+            return {"summary": summary}
         return {"assets": assets, "summary": summary}
     
+    except PoolBusyError:
+        await run_in_threadpool(store.discard_upload, upload_id)
+        raise
     except pd.errors.EmptyDataError:
+        await run_in_threadpool(store.discard_upload, upload_id)
         raise HTTPException(status_code=400, detail="CSV file is empty")
     except pd.errors.ParserError as e:
+        await run_in_threadpool(store.discard_upload, upload_id)
         raise HTTPException(status_code=400, detail=f"CSV parsing error: {str(e)}")
+    except ValueError as e:
+        await run_in_threadpool(store.discard_upload, upload_id)
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        await run_in_threadpool(store.discard_upload, upload_id)
         print(f"Error: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+    finally:
+        if spilled:
+            os.remove(spilled)
+
+@app.get("/upload/jobs/{job_id}")
+def get_upload_job(job_id: str):
+    """Poll the progress of an async upload"""
+    job = upload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job
+
+@app.get("/upload/jobs/{job_id}/events")
+async def stream_upload_job(job_id: str):
+    """Server-sent events with the job state on every change, until it finishes or goes stale"""
+    job = await run_in_threadpool(upload_jobs.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+
+    async def events(job):
+        last = None
+        while job is not None:
+            if job["updated_at"] != last:
+                last = job["updated_at"]
+                yield f"data: {json.dumps(job)}\n\n"
+            if job["status"] in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(UPLOAD_JOB_POLL_SECONDS)
+            job = await run_in_threadpool(upload_jobs.get, job_id)
+
+    return StreamingResponse(
+        events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/assets/")
-def get_all_assets():
-    """Get all uploaded assets"""
-    return uploaded_assets
+def get_all_assets(
+    risk_level: Optional[List[str]] = Query(None),
+    name: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = "desc",
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    Get all uploaded assets
+
+    Without limit/cursor the whole (filtered) fleet is returned as a list.
+    With them, one page is returned as {"items", "next_cursor", "total"};
+    pass next_cursor back with the same filters to get the next page.
+
+    Args:
+        risk_level: Only return these risk levels (repeatable)
+        name: Only return assets with this name
+        sort: "riskScore" to sort by risk score, otherwise id order
+        order: "desc" or "asc" when sorting by riskScore
+        limit: Page size
+        cursor: next_cursor from the previous page
+        fields: Comma-separated asset fields to return (id is always included)
+    """
+    if risk_level and any(level not in RISK_LEVELS for level in risk_level):
+        raise HTTPException(status_code=400, detail=f"risk_level must be one of {', '.join(RISK_LEVELS)}")
+    if sort not in (None, "riskScore"):
+        raise HTTPException(status_code=400, detail="sort must be 'riskScore'")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    if field_list and any(f not in ASSET_FIELDS for f in field_list):
+        raise HTTPException(status_code=400, detail=f"fields must be among {', '.join(ASSET_FIELDS)}")
+
+    assets = fleet.current().query(risk_level, name, sort, descending=order == "desc")
+    if limit is None and cursor is None:
+        return project(assets, field_list)
+
+    try:
+        page, next_cursor = paginate(assets, sort_key(sort, order == "desc"), limit or DEFAULT_PAGE_SIZE, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"items": project(page, field_list), "next_cursor": next_cursor, "total": len(assets)}
 
 @app.get("/assets/{asset_id}")
-def get_asset_detail(asset_id: int):
-    """Get detailed information for a specific asset"""
-    asset = next((a for a in uploaded_assets if a['id'] == asset_id), None)
+def get_asset_detail(
+    asset_id: int,
+    points: int = Query(DEFAULT_HISTORY_POINTS, ge=3, le=MAX_HISTORY_POINTS),
+    method: str = "bucket"
+):
+    """
+    Get detailed information for a specific asset
+
+    historicalData holds the asset's real readings, downsampled to at most
+    `points` points: "bucket" gives per-time-bucket mean/min/max, "lttb"
+    keeps the visually significant raw points.
+    """
+    if method not in ("bucket", "lttb"):
+        raise HTTPException(status_code=400, detail="method must be 'bucket' or 'lttb'")
+
+    asset = fleet.current().get(asset_id) or store.get_asset(asset_id)
     
     if not asset:
         raise HTTPException(status_code=404, detail=f"Asset with ID {asset_id} not found")
     
-    asset_with_history = asset.copy()
-    asset_with_history['historicalData'] = generate_historical_data()
+    asset = dict(asset)
+    asset['historicalData'] = get_historical_data(asset_id, points, method)
     
-    return asset_with_history
+    return asset
 
 @app.delete("/assets/")
 def clear_all_assets():
     """Clear all uploaded assets"""
-    global uploaded_assets
-    count = len(uploaded_assets)
-    uploaded_assets = []
+    count = store.clear_fleet()
+    fleet.rebuild()
     return {"message": f"Cleared {count} assets", "status": "success"}
 
 @app.post("/predict/")
-def predict_single(data: Dict):
-    """Make prediction for a single asset"""
+async def predict_single(data: Dict):
+    """
+    Make prediction for a single asset
+
+    Concurrent requests are micro-batched into one model call
+    (see /predict/metrics/).
+    """
     try:
-        features = np.array([[
-            data.get('temperature', 0),
-            data.get('temperature', 0) ** 2,
-            10, 85,
-            data.get('vibration', 0),
-            data.get('vibration', 0) ** 2,
-            2.5,
-            data.get('pressure', 0),
-            5,
-            data.get('runtime', 0),
-            abs(data.get('temperature', 0) - 75) / 10,
-            abs(data.get('vibration', 0) - 1.0) / 0.3,
-            abs(data.get('pressure', 0) - 95) / 5,
-            data.get('temperature', 0) * data.get('vibration', 0),
-            data.get('runtime', 0) / 6000,
-            int(data.get('runtime', 0) > 4000)
-        ]])
+        model = await run_in_threadpool(registry.get)
+        features = build_feature_row(data, model.fleet_aggregates())
         
-        prediction = model.predict(features)[0]
+        # Scored by the model whose aggregates built the row, even if it is swapped meanwhile
+        prediction = await predict_batcher.submit(features, model.predict)
         
         return {
             "riskScore": float(prediction * 100),
@@ -217,99 +429,152 @@ def predict_single(data: Dict):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
-def get_risk_level(score: float) -> str:
-    """Convert risk score to level"""
-    if score > 0.7:
-        return "critical"
-    elif score > 0.4:
-        return "warning"
-    return "healthy"
-
-def generate_asset_predictions(data: pd.DataFrame, predictions: np.ndarray) -> List[Dict]:
-    """Generate asset list with predictions"""
-    assets = []
-    
-    for idx, (_, row) in enumerate(data.iterrows()):
-        if idx >= len(predictions):
-            break
-            
-        risk_score = predictions[idx] * 100
-        risk_level = get_risk_level(predictions[idx])
-        
+@app.post("/predict/batch/")
+@app.post("/predict/batch", include_in_schema=False)
+async def predict_batch(request: Request):
+    """
+    Score many readings without touching the dashboard fleet
+
+    Send a JSON array (application/json) or stream one reading per line
+    (application/x-ndjson). Readings are scored in vectorized chunks and
+    results are streamed back as NDJSON, one line per input in input
+    order: {"index", ["id", "asset_name", "timestamp"], "riskScore",
+    "riskLevel", "predictedFailure"} or {"index", "error"}.
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items = iter_ndjson(request.stream())
+    else:
         try:
-            asset = {
-                "id": idx + 1,
-                "name": str(row.get('asset_name', f'Asset-{idx+1}')),
-                "riskLevel": risk_level,
-                "riskScore": round(float(risk_score), 2),
-                "temperature": float(row.get('temperature', 0)),
-                "vibration": float(row.get('vibration', 0)),
-                "pressure": float(row.get('pressure', 0)),
-                "runtime": int(row.get('runtime', 0)),
-                "lastMaintenance": str(row.get('last_maintenance', datetime.now().strftime('%Y-%m-%d'))),
-                "predictedFailure": int(30 * (1 - predictions[idx]))
-            }
-            assets.append(asset)
-        except Exception as e:
-            print(f"Error processing row {idx}: {e}")
-            continue
-    
-    return assets
+            items = iter_items(parse_json_array(await request.body()))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    compute_pool.check_capacity()
+
+    async def score_chunk(model, chunk):
+        return await compute_pool.run(score_records, model, chunk, queue=True)
+
+    model = await run_in_threadpool(registry.get)
+    return RequestStreamingResponse(
+        stream_scores(model, items, score_chunk, chunk_size=BATCH_PREDICT_CHUNK),
+        media_type="application/x-ndjson"
+    )
+
+@app.get("/pool/status/")
+def get_pool_status():
+    """Heavy-job pool load (running, waiting and rejected jobs)"""
+    return compute_pool.status()
+
+@app.get("/predict/cache/")
+def get_prediction_cache_stats():
+    """Prediction cache hit/miss/eviction counters for the serving model"""
+    return registry.cache.stats()
+
+@app.get("/predict/metrics/")
+def get_predict_metrics():
+    """Micro-batching statistics for /predict/"""
+    return predict_batcher.metrics()
+
+@app.get("/fleet/stats/")
+async def get_fleet_stats():
+    """Risk counts, sensor means, risk percentiles and alert tallies for the active fleet"""
+    index = await run_in_threadpool(fleet.current)
+    stats = await run_in_threadpool(lambda: index.stats)
+    return {"fleet_version": index.version, **stats.as_dict()}
+
+@app.get("/export/{kind}/")
+def export_fleet(kind: str, format: str = "csv"):
+    """
+    Stream the active fleet ("assets") or its raw readings ("readings")
+
+    format is csv, arrow (IPC stream) or parquet; the last two need
+    pyarrow and answer 501 without it. Rows are read from the store and
+    encoded EXPORT_CHUNK_ROWS at a time, so memory stays flat for any
+    fleet size.
+    """
+    if kind not in ("assets", "readings"):
+        raise HTTPException(status_code=404, detail="Export must be assets or readings")
+    try:
+        check_format(format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExportFormatUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    batches = store.iter_fleet(EXPORT_CHUNK_ROWS) if kind == "assets" else store.iter_fleet_readings(EXPORT_CHUNK_ROWS)
+    media_type, headers = export_headers(kind, format, datetime.now().strftime('%Y%m%d_%H%M%S'))
+    return StreamingResponse(stream_export(batches, kind, format), media_type=media_type, headers=headers)
 
 @app.get("/export-report/")
-def export_report():
-    """Export current assets as PDF report"""
-    if not uploaded_assets:
+async def export_report():
+    """
+    Export current assets as PDF report
+
+    Reports are cached per fleet version and streamed from disk, so
+    repeated exports of an unchanged fleet skip rendering entirely. The
+    "Generated:" time is when that fleet version was stored.
+    """
+    index = await run_in_threadpool(fleet.current)
+    assets = index.by_score
+    if not assets:
         raise HTTPException(status_code=400, detail="No assets available. Upload CSV first.")
     
     try:
-        summary = {
-            "total_assets": len(uploaded_assets),
-            "healthy": sum(1 for a in uploaded_assets if a['riskLevel'] == 'healthy'),
-            "warning": sum(1 for a in uploaded_assets if a['riskLevel'] == 'warning'),
-            "critical": sum(1 for a in uploaded_assets if a['riskLevel'] == 'critical'),
-            "avg_risk_score": round(np.mean([a['riskScore'] for a in uploaded_assets]), 2)
-        }
-
-        generator = MaintenanceReportGenerator()
-        pdf_bytes = generator.generate_report(uploaded_assets, summary)
-
-        return StreamingResponse(
-            io.BytesIO(pdf_bytes),
+        path = report_cache.get(index.version)
+        if path is None:
+            stats = await run_in_threadpool(lambda: index.stats)
+            generated_at = await run_in_threadpool(store.fleet_updated_at, index.version)
+            path = await compute_pool.run(
+                write_pdf_report, report_cache.path(index.version), assets, stats.as_dict(),
+                generated_at or datetime.now()
+            )
+            await run_in_threadpool(report_cache.prune, index.version)
+
+        return FileResponse(
+            path,
             media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=maintenance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            }
+            filename=f"maintenance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         )
+    except PoolBusyError:
+        raise
     except Exception as e:
         print(f"Error generating report: {str(e)}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
 
-def generate_historical_data() -> List[Dict]:
-    """Generate 24-hour historical sensor data"""
-    data = []
-    for i in range(24):
-        data.append({
-            "time": f"{i}:00",
-            "temperature": 65 + np.random.random() * 20 + np.sin(i / 3) * 10,
-            "vibration": 1 + np.random.random() * 1 + np.sin(i / 4) * 0.5,
-            "pressure": 95 + np.random.random() * 15 + np.cos(i / 5) * 8
-        })
-    return data
+def get_historical_data(asset_id: int, points: int, method: str) -> List[Dict]:
+    """Downsample an asset's stored readings for the detail chart"""
+    readings = store.asset_readings(asset_id)
+    times = readings.pop("time")
+    if len(times) == 0:
+        return []
+
+    epoch_ns = times.astype(np.int64)
+    if method == "lttb":
+        sampled = lttb_downsample(epoch_ns, readings, points, by="temperature")
+    else:
+        sampled = bucket_downsample(epoch_ns, readings, points)
+
+    labels = pd.to_datetime(sampled.pop("time")).strftime("%Y-%m-%d %H:%M")
+    # Missing readings are stored as NULL; JSON has no NaN, so send them as null
+    columns = {}
+    for name, values in sampled.items():
+        values = np.round(np.asarray(values, dtype=np.float64), 3)
+        columns[name] = np.where(np.isfinite(values), values, None).tolist()
+    return [
+        {"time": label, **{name: values[i] for name, values in columns.items()}}
+        for i, label in enumerate(labels)
+    ]
 
 
 @app.post("/train/", response_model=TrainResponse)
-async def train_model_endpoint(
-    request: TrainRequest,
-    background_tasks: BackgroundTasks
-):
+async def train_model_endpoint(request: TrainRequest):
     """
-    Train or retrain the ML model
+    Train or retrain the ML model in a separate process
     
     Args:
         request: TrainRequest with training parameters
-        background_tasks: FastAPI background tasks
         
     Returns:
         TrainResponse with training status and metrics
@@ -318,12 +583,11 @@ async def train_model_endpoint(
         POST /train/
         {
             "retrain": true,
-            "n_samples": 5000
+            "n_samples": 5000,
+            "backend": "hist_gbm"
         }
     """
-    global training_status
-
-    if training_status["is_training"]:
+    if trainer.is_training:
         raise HTTPException(
             status_code=409, 
             detail="Training already in progress. Please wait for completion."
@@ -335,57 +599,70 @@ async def train_model_endpoint(
             detail="n_samples must be between 100 and 50,000"
         )
 
-    background_tasks.add_task(
-        train_model_background,
-        request.n_samples,
-        request.retrain
-    )
+    if request.backend is not None and request.backend not in MODEL_BACKENDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"backend must be one of: {', '.join(MODEL_BACKENDS)}"
+        )
+
+    try:
+        statistics = await run_in_threadpool(store.running_statistics)
+        backend = request.backend or (await run_in_threadpool(registry.get)).backend
+        trainer.start(registry.model_dir, request.n_samples, request.backend, statistics.to_dict())
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     
     return TrainResponse(
         status="started",
-        message=f"Model training initiated with {request.n_samples} samples",
+        message=f"Model training initiated with {request.n_samples} samples ({backend} backend)",
         metrics={},
         training_time=0.0
     )
 
 
-def train_model_background(n_samples: int, retrain: bool):
-    """Background task for model training"""
-    global training_status, model
-    
+def activate_trained_model(version: int):
+    """Serve the version the training process published, here and in the other workers"""
+    registry.activate(version)
+
+trainer = TrainingSupervisor(on_model=activate_trained_model, state=app_state)
+
+
+@app.get("/models/")
+def list_model_versions():
+    """Stored model versions, newest first, with their metrics, checksum and feature schema"""
+    return {
+        "active_version": registry.versions.active(),
+        "versions": registry.versions.list(),
+    }
+
+def _switch_model(switch, *args) -> Dict:
     try:
-        training_status["is_training"] = True
-        training_status["progress"] = 0
-        training_status["message"] = "Generating training data..."
-        
-        start_time = time.time()
-
-        print(f"Generating {n_samples} training samples...")
-        X, y = model.generate_synthetic_training_data(n_samples=n_samples)
-        training_status["progress"] = 30
-        training_status["message"] = "Training model..."
-
-        print(f"Training Gradient Boosting model...")
-        model.train(X, y)
-        training_status["progress"] = 80
-        training_status["message"] = "Saving model..."
-  
-        print(f"Saving trained model...")
-        model.save_model("models/maintenance_model.pkl")
-        training_status["progress"] = 100
-        
-        training_time = time.time() - start_time
-        
-        training_status["is_training"] = False
-        training_status["message"] = f"Training completed in {training_time:.2f}s"
-        
-        print(f"Model training completed successfully!")
-        
-    except Exception as e:
-        training_status["is_training"] = False
-        training_status["progress"] = 0
-        training_status["message"] = f"Training failed: {str(e)}"
-        print(f"Training error: {str(e)}")
+        record = switch(*args)
+    except ModelVersionError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "success", "active_version": record["version"], "model": record}
+
+@app.post("/models/{version}/activate")
+async def activate_model_version(version: int):
+    """
+    Serve a stored model version without a restart
+
+    The version's checksum and feature schema are verified, it is loaded,
+    then swapped in; requests already scoring on the old model finish on
+    it. The other workers reload within MODEL_POLL_SECONDS.
+    """
+    if version not in registry.versions.versions():
+        raise HTTPException(status_code=404, detail=f"Model version {version} not found")
+    if trainer.is_training:
+        raise HTTPException(status_code=409, detail="Training in progress. Please wait for completion.")
+    return await run_in_threadpool(_switch_model, registry.activate, version)
+
+@app.post("/models/rollback")
+async def rollback_model_version():
+    """Serve the version that was active before the current one again"""
+    if trainer.is_training:
+        raise HTTPException(status_code=409, detail="Training in progress. Please wait for completion.")
+    return await run_in_threadpool(_switch_model, registry.rollback)
 
 
 @app.get("/train/status/")
@@ -397,11 +674,8 @@ def get_training_status():
         Current training progress and status
     """
     return {
-        "is_training": training_status["is_training"],
-        "progress": training_status["progress"],
-        "message": training_status["message"],
-        "model_loaded": model.is_trained,
-        "model_path": "models/maintenance_model.pkl"
+        **trainer.status(),
+        **registry.status()
     }
 
 # Serve static files for frontend (if deployed together)
@@ -426,7 +700,7 @@ async def serve_static_or_api(full_path: str):
 if __name__ == "__main__":
     import uvicorn
     print("Starting AI Maintenance Predictor API...")
-    print("Note: Assets list starts empty until CSV is uploaded")
-    print(f"Model Status: {'Trained ✓' if model.is_trained else 'Not Trained (using random predictions)'}")
+    print(f"Assets are stored in {store.db_path}")
+    print(f"Model Status: {'Trained ✓' if registry.get().is_trained else 'Not Trained (using random predictions)'}")
     port = int(os.getenv("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
@@ -0,0 +1,116 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one batched call
+
+    Requests wait at most max_wait_ms (or until max_batch_size rows are
+    queued), then the whole batch is scored with one predict_fn call in a
+    worker thread and every caller gets its own row's result back. A caller
+    can pass its own predict function (e.g. the predict of the model it
+    built the row for); rows are only batched with rows for the same one.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        history: int = 1000,
+    ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[np.ndarray, asyncio.Future, float, Callable]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+        self.requests = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self._batch_sizes = deque(maxlen=history)
+        self._queue_latencies = deque(maxlen=history)
+
+    async def submit(self, row: np.ndarray, predict_fn: Optional[Callable[[np.ndarray], np.ndarray]] = None) -> float:
+        """
+        Queue one feature row (shape (n_features,) or (1, n_features)) and await its score
+
+        predict_fn overrides the batcher's one for this row.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((np.asarray(row).reshape(-1), future, time.perf_counter(), predict_fn or self.predict_fn))
+        self.requests += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        batches: Dict[Callable, List[Tuple[np.ndarray, asyncio.Future, float]]] = {}
+        for row, future, queued, predict_fn in pending:
+            batches.setdefault(predict_fn, []).append((row, future, queued))
+        loop = asyncio.get_running_loop()
+        for predict_fn, batch in batches.items():
+            # Hold a reference so the task is not garbage-collected mid-run
+            task = loop.create_task(self._run(predict_fn, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def shutdown(self):
+        """Score any queued rows and wait for every in-flight batch to finish"""
+        if self._pending:
+            self._flush()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self, predict_fn: Callable, batch: List[Tuple[np.ndarray, asyncio.Future, float]]):
+        started = time.perf_counter()
+        self.batches += 1
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        self._batch_sizes.append(len(batch))
+        self._queue_latencies.extend(started - queued for _, _, queued in batch)
+
+        X = np.vstack([row for row, _, _ in batch])
+        try:
+            scores = await asyncio.get_running_loop().run_in_executor(None, predict_fn, X)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), score in zip(batch, scores):
+            if not future.done():
+                future.set_result(float(score))
+
+    def metrics(self) -> Dict:
+        """Batch-size and queue-latency statistics over recent batches"""
+        sizes = np.array(self._batch_sizes) if self._batch_sizes else np.zeros(1)
+        latencies = np.array(self._queue_latencies) * 1000 if self._queue_latencies else np.zeros(1)
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_size": round(float(sizes.mean()), 2),
+            "max_batch_size_seen": self.max_batch_seen,
+            "queue_latency_ms": {
+                "avg": round(float(latencies.mean()), 3),
+                "p50": round(float(np.percentile(latencies, 50)), 3),
+                "p95": round(float(np.percentile(latencies, 95)), 3),
+                "max": round(float(latencies.max()), 3),
+            },
+        }
@@ -1,73 +1,103 @@
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier
 from sklearn.preprocessing import StandardScaler
 import joblib
-from typing import List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import os
 
+from feature_engine import ASSET_WINDOW_COLUMNS, aggregate_asset_windows
+from running_stats import RunningStatistics
+from tree_inference import FlatTreeEnsemble
+
+MODEL_FILENAME = "maintenance_model.pkl"
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+# gbm: GradientBoostingClassifier; hist_gbm: multithreaded, histogram-binned HistGradientBoostingClassifier
+MODEL_BACKENDS = ("gbm", "hist_gbm")
+# sklearn: predict_proba; flat: FlatTreeEnsemble traversal of the fitted trees;
+# auto: flat for batches of up to FLAT_MAX_ROWS rows, where it is several times
+# faster, and predict_proba above that, where sklearn's compiled loop wins
+INFERENCE_MODES = ("auto", "sklearn", "flat")
+FLAT_MAX_ROWS = int(os.getenv("FLAT_MAX_ROWS", 128))
+
 class MaintenancePredictor:
-    def __init__(self):
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        autoload: bool = True,
+        backend: Optional[str] = None,
+        inference: Optional[str] = None
+    ):
         self.model = None
         self.scaler = StandardScaler()
         self.is_trained = False
-        self.model_path = "models/maintenance_model.pkl"
+        self.model_path = model_path or os.path.join(DEFAULT_MODEL_DIR, MODEL_FILENAME)
+        self.backend = backend or os.getenv("MODEL_BACKEND", "gbm")
+        if self.backend not in MODEL_BACKENDS:
+            raise ValueError(f"Unknown model backend: {self.backend}")
+        self.inference = inference or os.getenv("MODEL_INFERENCE", "auto")
+        if self.inference not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode: {self.inference}")
+        self._flat = None
+        # Reference for the fleet-wide features, saved with the model
+        self.statistics = RunningStatistics()
+        # Training metadata stored in the model file (see ModelVersionStore)
+        self.metadata: Dict = {}
 
-        if os.path.exists(self.model_path):
+        if autoload and os.path.exists(self.model_path):
             try:
                 self.load_model(self.model_path)
             except:
                 print("Could not load existing model, will create new one")
         
     def create_model(self):
-        """Create ensemble model"""
-        self.model = GradientBoostingClassifier(
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=5,
-            random_state=42
-        )
+        """Create ensemble model for the configured backend"""
+        if self.backend == "hist_gbm":
+            self.model = HistGradientBoostingClassifier(
+                max_iter=100,
+                learning_rate=0.1,
+                max_depth=5,
+                early_stopping=False,
+                random_state=42
+            )
+        else:
+            self.model = GradientBoostingClassifier(
+                n_estimators=100,
+                learning_rate=0.1,
+                max_depth=5,
+                random_state=42
+            )
+        self._flat = None
     
     def extract_features(self, data: pd.DataFrame) -> np.ndarray:
         """Extract features from sensor data"""
-        features = []
-        
-        features.extend([
-            data['temperature'].mean(),
-            data['temperature'].std(),
-            data['temperature'].max(),
-            data['temperature'].min(),
-            data['vibration'].mean(),
-            data['vibration'].std(),
-            data['vibration'].max(),
-            data['pressure'].mean(),
-            data['pressure'].std(),
-            data['runtime'].max() if 'runtime' in data.columns else 0
-        ])
-        
-        if len(data) > 1:
-            features.extend([
-                data['temperature'].diff().mean(),
-                data['vibration'].diff().mean(),
-                data['pressure'].diff().mean()
-            ])
-        else:
-            features.extend([0, 0, 0])
-   
-        window = min(10, len(data))
-        features.extend([
-            data['temperature'].rolling(window).mean().iloc[-1],
-            data['vibration'].rolling(window).mean().iloc[-1],
-            data['pressure'].rolling(window).mean().iloc[-1]
-        ])
-        
-        return np.array(features)
+        windows = aggregate_asset_windows(data.assign(asset_name='asset'))
+        return windows[ASSET_WINDOW_COLUMNS].to_numpy()[0]
     
-    def train(self, X: np.ndarray, y: np.ndarray):
-        """Train the model"""
+    def extract_asset_features(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Extract window features for every asset_name in one grouped pass"""
+        return aggregate_asset_windows(data)
+    
+    def train(self, X: np.ndarray, y: np.ndarray, progress: Optional[Callable[[int, int], None]] = None):
+        """Train the model (progress(done, total) is called as boosting iterations finish)"""
         self.create_model()
         X_scaled = self.scaler.fit_transform(X)
-        self.model.fit(X_scaled, y)
+        if progress is None:
+            self.model.fit(X_scaled, y)
+        elif self.backend == "hist_gbm":
+            # No monitor hook: grow the ensemble in warm-started steps instead
+            total = self.model.max_iter
+            step = max(total // 20, 1)
+            self.model.set_params(warm_start=True)
+            for done in range(step, total + step, step):
+                self.model.set_params(max_iter=min(done, total))
+                self.model.fit(X_scaled, y)
+                progress(min(done, total), total)
+            self.model.set_params(warm_start=False)
+        else:
+            total = self.model.n_estimators
+            self.model.fit(X_scaled, y, monitor=lambda i, est, _locals: progress(i + 1, total))
         self.is_trained = True
         print(f"Model trained with {len(X)} samples")
     
@@ -77,23 +107,64 @@ class MaintenancePredictor:
             return np.random.random(len(X))
         
         X_scaled = self.scaler.transform(X)
+        if self.inference == "flat" or (self.inference == "auto" and len(X_scaled) <= FLAT_MAX_ROWS):
+            flat = self.flat_model()
+            if flat is not None:
+                return flat.predict_proba(X_scaled)
         predictions = self.model.predict_proba(X_scaled)[:, 1]
         return predictions
     
-    def save_model(self, filepath: str):
-        """Save model to disk"""
+    @property
+    def published_version(self) -> Optional[int]:
+        """Version the model was published as (see ModelVersionStore), None if never published"""
+        return self.metadata.get('version')
+
+    def fleet_aggregates(self) -> Dict[str, float]:
+        """Fleet-wide feature values (2, 3, 6 and 8) from the model's frozen statistics"""
+        return self.statistics.aggregates()
+    
+    def flat_model(self) -> Optional[FlatTreeEnsemble]:
+        """Flattened copy of the fitted ensemble, built on first use; None if it cannot be flattened"""
+        if self._flat is None:
+            try:
+                self._flat = FlatTreeEnsemble.from_model(self.model)
+            except ValueError as e:
+                print(f"⚠ Flat tree inference unavailable, using predict_proba: {e}")
+                self._flat = False
+        return self._flat or None
+    
+    @property
+    def n_iterations(self) -> int:
+        """Number of boosting iterations in the fitted model"""
+        if self.backend == "hist_gbm":
+            return int(self.model.n_iter_)
+        return int(self.model.n_estimators_)
+    
+    def save_model(self, filepath: str, metadata: Optional[Dict] = None):
+        """Save model to disk (written next to filepath, then moved into place with os.replace)"""
         os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        if metadata is not None:
+            self.metadata = dict(metadata)
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
         joblib.dump({
             'model': self.model,
-            'scaler': self.scaler
-        }, filepath)
+            'scaler': self.scaler,
+            'backend': self.backend,
+            'statistics': self.statistics.to_dict(),
+            'metadata': self.metadata
+        }, tmp_path)
+        os.replace(tmp_path, filepath)
         print(f"Model saved to {filepath}")
     
-    def load_model(self, filepath: str):
-        """Load model from disk"""
-        data = joblib.load(filepath)
+    def load_model(self, filepath: str, mmap_mode: Optional[str] = None):
+        """Load model from disk (mmap_mode='r' memory-maps stored numpy arrays)"""
+        data = joblib.load(filepath, mmap_mode=mmap_mode)
         self.model = data['model']
         self.scaler = data['scaler']
+        self.backend = data.get('backend', 'gbm')
+        self.statistics = RunningStatistics.from_dict(data.get('statistics'))
+        self.metadata = data.get('metadata', {})
+        self._flat = None
         self.is_trained = True
         print(f"Model loaded from {filepath}")
     
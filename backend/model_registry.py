@@ -0,0 +1,229 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from app_state import AppState
+from ml_model import MaintenancePredictor, MODEL_FILENAME, DEFAULT_MODEL_DIR
+from model_versions import LEGACY_VERSION, ModelVersionError, ModelVersionStore
+from prediction_cache import CachedPredictor, PredictionCache
+from sharded_scoring import ShardedPredictor, ShardedScorer
+
+
+class ModelRegistry:
+    """
+    Owns the serving MaintenancePredictor
+
+    The model is loaded on first use (or explicitly from the startup
+    lifespan hook) instead of at import time. Paths resolve against
+    MODEL_DIR rather than the working directory, and MODEL_MMAP=1 loads
+    the joblib file with mmap_mode='r' so stored numpy arrays are
+    memory-mapped and shared through the page cache across workers.
+
+    Every load or swap bumps the model version and invalidates the
+    prediction cache that get() serves through. With SCORING_WORKERS > 1,
+    large batches are sharded across the scorer's worker processes.
+
+    Models are served from a ModelVersionStore in model_dir: the active
+    version's artifact, or maintenance_model.pkl from before versioning
+    (adopted as version 0 on first load). activate() and rollback() switch
+    versions by reference: the new model is loaded first, then swapped in,
+    and batches already holding the old one finish with it.
+
+    With a shared AppState, activations (and swap(publish=True)) are
+    announced to the other workers, and watch() reloads the model in each
+    of them as soon as they see the published version change.
+    """
+
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        mmap: Optional[bool] = None,
+        cache: Optional[PredictionCache] = None,
+        scorer: Optional[ShardedScorer] = None,
+        state: Optional[AppState] = None
+    ):
+        self.model_dir = model_dir or os.getenv("MODEL_DIR") or os.getenv("MODEL_PATH") or DEFAULT_MODEL_DIR
+        if mmap is None:
+            mmap = os.getenv("MODEL_MMAP", "0").lower() in ("1", "true", "yes")
+        self.mmap_mode = "r" if mmap else None
+        self.load_time: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+        self.cache = cache or PredictionCache()
+        self.scorer = scorer or ShardedScorer()
+        self.versions = ModelVersionStore(self.model_dir)
+        self.version = 0
+        self.state = state
+        # Published model version (AppState) the serving model was loaded at
+        self.shared_version: Optional[int] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self._predictor: Optional[MaintenancePredictor] = None
+        self._serving = None
+        self._lock = threading.RLock()
+
+    @property
+    def legacy_model_path(self) -> str:
+        return os.path.join(self.model_dir, MODEL_FILENAME)
+
+    @property
+    def model_path(self) -> str:
+        """Artifact of the active version, or the legacy model file before the first one"""
+        active = self.versions.active()
+        return self.versions.artifact_path(active) if active is not None else self.legacy_model_path
+
+    def _adopt_legacy_model(self):
+        """Publish an unversioned maintenance_model.pkl as version 0 so it can be rolled back to"""
+        if self.versions.active() is not None or not os.path.exists(self.legacy_model_path):
+            return
+        try:
+            predictor = MaintenancePredictor(self.legacy_model_path, autoload=False)
+            predictor.load_model(self.legacy_model_path)
+            try:
+                self.versions.publish(predictor, {"source": "legacy"}, version=LEGACY_VERSION)
+            except ModelVersionError:
+                pass  # another worker adopted it first
+            if self.versions.active() is None:
+                self.versions.activate(LEGACY_VERSION)
+        except Exception as e:
+            print(f"Could not adopt {self.legacy_model_path} as a model version: {e}")
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._predictor is not None
+
+    @property
+    def predictor(self) -> Optional[MaintenancePredictor]:
+        """The loaded model without the cache wrapper"""
+        return self._predictor
+
+    def load(self) -> MaintenancePredictor:
+        """Load the model from disk and make it the serving model"""
+        with self._lock:
+            start = time.perf_counter()
+            if self.state is not None:
+                self.shared_version = self.state.model_version()
+            self._adopt_legacy_model()
+            model_path = self.model_path
+            predictor = MaintenancePredictor(model_path, autoload=False)
+            if os.path.exists(model_path):
+                try:
+                    predictor.load_model(model_path, mmap_mode=self.mmap_mode)
+                except Exception as e:
+                    print(f"Could not load model from {model_path}: {e}")
+            self.load_time = time.perf_counter() - start
+            return self._serve(predictor)
+
+    def get(self) -> MaintenancePredictor:
+        """Return the serving model (behind the prediction cache), loading it on first use"""
+        serving = self._serving
+        if serving is None:
+            with self._lock:
+                serving = self._serving or self.load()
+        return serving
+
+    def swap(self, predictor: MaintenancePredictor, publish: bool = False):
+        """
+        Replace the serving model; callers holding the old one finish with it
+
+        With publish, the model file at model_path is announced to the other
+        workers through the AppState.
+        """
+        with self._lock:
+            self._serve(predictor)
+            if publish and self.state is not None:
+                self.shared_version = self.state.publish_model(self.model_path)
+
+    def activate(self, version: int) -> Dict:
+        """
+        Serve a stored model version in this worker and announce it to the others
+
+        Raises:
+            ModelVersionError: Unknown version, failed checksum or other feature schema
+        """
+        with self._lock:
+            self._adopt_legacy_model()
+            record = self.versions.activate(version)
+            try:
+                self._load_published()
+            except Exception:
+                # Point back at the version this worker still serves
+                if self.versions.active() == version:
+                    try:
+                        self.versions.rollback()
+                    except ModelVersionError:
+                        pass
+                raise
+            return record
+
+    def rollback(self) -> Dict:
+        """Serve the version that was active before the current one again"""
+        with self._lock:
+            record = self.versions.rollback()
+            self._load_published()
+            return record
+
+    def _load_published(self):
+        predictor = MaintenancePredictor(self.model_path, autoload=False)
+        predictor.load_model(self.model_path, mmap_mode=self.mmap_mode)
+        self.swap(predictor, publish=True)
+
+    def refresh(self) -> bool:
+        """Reload the model if another worker published a new version; True if reloaded"""
+        if self.state is None or self.state.model_version() == self.shared_version:
+            return False
+        with self._lock:
+            if self.state.model_version() == self.shared_version:
+                return False
+            self.load()
+            print(f"Loaded model version {self.shared_version} published by another worker")
+            return True
+
+    def watch(self, interval: float):
+        """Poll the AppState every interval seconds and reload published models"""
+        if self.state is None or self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def poll():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Could not refresh model: {e}")
+
+        self._watcher = threading.Thread(target=poll, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop_watching.set()
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def _serve(self, predictor: MaintenancePredictor):
+        self.version += 1
+        self.cache.invalidate(self.version)
+        self.scorer.load(predictor)
+        serving = ShardedPredictor(predictor, self.scorer) if self.scorer.enabled else predictor
+        if self.cache.enabled:
+            serving = CachedPredictor(serving, self.cache, self.version)
+        self._predictor = predictor
+        self._serving = serving
+        self.loaded_at = time.time()
+        return serving
+
+    def status(self) -> Dict:
+        return {
+            "model_loaded": self.is_loaded and self._predictor.is_trained,
+            "model_path": self.model_path,
+            "model_load_time": round(self.load_time, 4) if self.load_time is not None else None,
+            "mmap_mode": self.mmap_mode,
+            "model_backend": self._predictor.backend if self.is_loaded else None,
+            "model_version": self.version,
+            "active_model_version": self.versions.active(),
+            "model_metadata": self._predictor.metadata if self.is_loaded else None,
+            "shared_model_version": self.shared_version,
+            "fleet_aggregates": self._predictor.fleet_aggregates() if self.is_loaded else None,
+            "sharded_scoring": self.scorer.status(),
+        }
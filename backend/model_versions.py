@@ -0,0 +1,216 @@
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from feature_engine import FEATURE_COLUMNS
+
+VERSIONS_DIR = "versions"
+ACTIVE_POINTER = "ACTIVE"
+ARTIFACT_FILENAME = "model.pkl"
+METADATA_FILENAME = "metadata.json"
+LOCK_FILENAME = ".lock"
+# Version numbers tried before publish gives up racing other publishers
+PUBLISH_ATTEMPTS = 10
+# Version number given to a model file from before versioning when it is adopted
+LEGACY_VERSION = 0
+
+
+class ModelVersionError(Exception):
+    """Raised for unknown versions, failed checksums and incompatible feature schemas"""
+
+
+def _version_name(version: int) -> str:
+    return f"v{version:04d}"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json(path: str, data: Dict):
+    """Write JSON next to path and move it into place, so readers see old or new"""
+    tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class ModelVersionStore:
+    """
+    Versioned, checksummed model artifacts under model_dir
+
+    Every version is an immutable directory versions/vNNNN holding the
+    joblib file and metadata.json (sha256, size, training metrics, feature
+    schema, timing). A version is staged in a temporary directory and
+    published with one atomic rename, so a half-written model is never
+    visible. The ACTIVE file names the serving version plus the versions
+    active before it, for rollback; it is replaced with os.replace while
+    holding an exclusive flock on versions/.lock, so concurrent activate,
+    rollback and prune calls never lose each other's updates.
+
+    Only the newest MODEL_KEEP_VERSIONS versions are kept (plus the active
+    one and those rollback can still reach).
+    """
+
+    def __init__(self, model_dir: str, keep: Optional[int] = None):
+        self.model_dir = model_dir
+        self.versions_dir = os.path.join(model_dir, VERSIONS_DIR)
+        self.keep = keep if keep is not None else int(os.getenv("MODEL_KEEP_VERSIONS", 10))
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.versions_dir, exist_ok=True)
+        with open(os.path.join(self.versions_dir, LOCK_FILENAME), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _dir(self, version: int) -> str:
+        return os.path.join(self.versions_dir, _version_name(version))
+
+    def artifact_path(self, version: int) -> str:
+        return os.path.join(self._dir(version), ARTIFACT_FILENAME)
+
+    def versions(self) -> List[int]:
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(
+            int(name[1:]) for name in os.listdir(self.versions_dir)
+            if name.startswith("v") and name[1:].isdigit()
+        )
+
+    def metadata(self, version: int) -> Dict:
+        path = os.path.join(self._dir(version), METADATA_FILENAME)
+        if not os.path.exists(path):
+            raise ModelVersionError(f"Unknown model version {version}")
+        with open(path) as f:
+            return json.load(f)
+
+    def _pointer(self) -> Dict:
+        path = os.path.join(self.model_dir, ACTIVE_POINTER)
+        if not os.path.exists(path):
+            return {"version": None, "history": []}
+        with open(path) as f:
+            return json.load(f)
+
+    def active(self) -> Optional[int]:
+        """Serving version, or None before the first activation"""
+        return self._pointer()["version"]
+
+    def list(self) -> List[Dict]:
+        """Metadata of every version, newest first, flagged with active"""
+        active = self.active()
+        return [{**self.metadata(v), "active": v == active} for v in reversed(self.versions())]
+
+    def publish(self, predictor, metadata: Optional[Dict] = None, version: Optional[int] = None) -> Dict:
+        """
+        Save predictor as a new version (not yet active)
+
+        Args:
+            predictor: Trained MaintenancePredictor
+            metadata: Training metrics and other fields to store with it
+            version: Fixed version number (used to adopt the legacy model);
+                by default the next free one
+
+        Returns:
+            The version's metadata
+        """
+        os.makedirs(self.versions_dir, exist_ok=True)
+        staging = os.path.join(self.versions_dir, f".staging-{os.getpid()}-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            artifact = os.path.join(staging, ARTIFACT_FILENAME)
+            for _ in range(PUBLISH_ATTEMPTS):
+                number = version if version is not None else (max(self.versions(), default=0) + 1)
+                record = {
+                    "version": number,
+                    "created_at": datetime.now().isoformat(),
+                    "backend": predictor.backend,
+                    "feature_columns": list(FEATURE_COLUMNS),
+                    "fleet_aggregates": predictor.fleet_aggregates(),
+                    **(metadata or {}),
+                }
+                # The model file carries the same metadata, minus its own checksum
+                predictor.save_model(artifact, record)
+                record.update(sha256=file_sha256(artifact), size_bytes=os.path.getsize(artifact))
+                _write_json(os.path.join(staging, METADATA_FILENAME), record)
+                try:
+                    os.rename(staging, self._dir(number))
+                    return record
+                except OSError as e:
+                    # Only a taken version number is worth retrying
+                    if e.errno not in (errno.EEXIST, errno.ENOTEMPTY):
+                        raise ModelVersionError(f"Could not publish model version {number}: {e}") from e
+                    if version is not None:
+                        raise ModelVersionError(f"Model version {version} already exists") from e
+            raise ModelVersionError(f"Could not publish a model version after {PUBLISH_ATTEMPTS} attempts")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def verify(self, version: int) -> Dict:
+        """Metadata of version after checking its checksum and feature schema"""
+        record = self.metadata(version)
+        path = self.artifact_path(version)
+        if not os.path.exists(path) or file_sha256(path) != record["sha256"]:
+            raise ModelVersionError(f"Model version {version} failed its checksum")
+        if record.get("feature_columns") != list(FEATURE_COLUMNS):
+            raise ModelVersionError(f"Model version {version} was trained on a different feature schema")
+        return record
+
+    def activate(self, version: int) -> Dict:
+        """Make a verified version the serving one; the previous one can be rolled back to"""
+        record = self.verify(version)
+        with self._locked():
+            pointer = self._pointer()
+            history = pointer["history"]
+            if pointer["version"] is not None and pointer["version"] != version:
+                history = history + [pointer["version"]]
+            _write_json(os.path.join(self.model_dir, ACTIVE_POINTER), {
+                "version": version,
+                "history": [v for v in history if v != version],
+                "activated_at": datetime.now().isoformat(),
+            })
+            self._prune()
+        return record
+
+    def rollback(self) -> Dict:
+        """Re-activate the version that was active before the current one"""
+        with self._locked():
+            pointer = self._pointer()
+            history = [v for v in pointer["history"] if v in self.versions()]
+            if not history:
+                raise ModelVersionError("No previous model version to roll back to")
+            record = self.verify(history[-1])
+            _write_json(os.path.join(self.model_dir, ACTIVE_POINTER), {
+                "version": history[-1],
+                "history": history[:-1],
+                "activated_at": datetime.now().isoformat(),
+            })
+        return record
+
+    def prune(self):
+        """Delete versions beyond the newest `keep` that neither serve nor back a rollback"""
+        with self._locked():
+            self._prune()
+
+    def _prune(self):
+        if self.keep <= 0:
+            return
+        pointer = self._pointer()
+        protected = {pointer["version"], *pointer["history"][-self.keep:]}
+        for version in self.versions()[:-self.keep]:
+            if version not in protected:
+                shutil.rmtree(self._dir(version), ignore_errors=True)
@@ -5,10 +5,50 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from datetime import datetime
-from typing import List, Dict
+from functools import lru_cache
+from itertools import islice
+from typing import BinaryIO, List, Dict, Optional, Union
 import io
+import os
+import re
+import threading
+
+# Rows per detail table; each chunk is split across pages on its own, which
+# keeps ReportLab's table layout linear in the fleet size
+DETAIL_CHUNK_ROWS = 500
+
+GENERATED_FORMAT = '%Y-%m-%d %H:%M:%S'
+REPORT_NAME = re.compile(r"report_v(\d+)\.pdf")
+
+DETAIL_COL_WIDTHS = [1.5*inch, 0.8*inch, 0.9*inch, 0.9*inch, 1*inch, 1*inch]
+DETAIL_HEADER = ['Asset', 'Risk', 'Temp (°C)', 'Vib (mm/s)', 'Pressure (PSI)', 'Days to Failure']
+RISK_ROW_COLORS = {
+    'critical': colors.HexColor('#fee2e2'),
+    'warning': colors.HexColor('#fef3c7'),
+}
+
+DETAIL_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#000000')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+])
+
 
 class MaintenanceReportGenerator:
+    """
+    Renders the maintenance PDF report
+
+    Stylesheets are built once per instance; use get_report_generator() to
+    share one instance per process.
+    """
+
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self.title_style = ParagraphStyle(
@@ -27,11 +67,34 @@ class MaintenanceReportGenerator:
             spaceAfter=12,
             spaceBefore=12
         )
-    
+        self.asset_style = ParagraphStyle('AssetStyle', parent=self.styles['Normal'],
+                                          leftIndent=20, spaceAfter=10)
+        self.footer_style = ParagraphStyle('Footer', parent=self.styles['Normal'],
+                                           fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
+
     def generate_report(self, assets: List[Dict], summary: Dict) -> bytes:
         """Generate PDF report from assets data"""
         buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch)
+        self.build_report(assets, summary, buffer)
+        return buffer.getvalue()
+
+    def build_report(
+        self,
+        assets: List[Dict],
+        summary: Dict,
+        output: Union[str, BinaryIO],
+        generated_at: Optional[datetime] = None,
+    ):
+        """
+        Render the report into a file path or binary file object
+
+        Args:
+            assets: Fleet assets
+            summary: FleetStats.as_dict() for the same assets
+            output: Destination path or writable binary file
+            generated_at: Time shown as "Generated:" (default now)
+        """
+        doc = SimpleDocTemplate(output, pagesize=letter, topMargin=0.5*inch)
         story = []
 
         title = Paragraph("AI Maintenance Predictor Report", self.title_style)
@@ -39,7 +102,7 @@ class MaintenanceReportGenerator:
         story.append(Spacer(1, 0.2*inch))
 
         meta_style = self.styles['Normal']
-        date_text = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        date_text = f"Generated: {(generated_at or datetime.now()).strftime(GENERATED_FORMAT)}"
         story.append(Paragraph(date_text, meta_style))
         story.append(Spacer(1, 0.3*inch))
 
@@ -71,67 +134,30 @@ class MaintenanceReportGenerator:
         story.append(summary_table)
         story.append(Spacer(1, 0.4*inch))
 
-        critical_assets = [a for a in assets if a['riskLevel'] == 'critical']
-        if critical_assets:
-            story.append(Paragraph(f"⚠️ Critical Assets Requiring Immediate Attention ({len(critical_assets)})", self.heading_style))
-            for asset in critical_assets[:5]:  # Top 5 critical
+        ranked = sorted(assets, key=lambda x: x['riskScore'], reverse=True)
+
+        if summary['critical']:
+            story.append(Paragraph(f"⚠️ Critical Assets Requiring Immediate Attention ({summary['critical']})", self.heading_style))
+            for asset in _first(ranked, 'critical', 5):  # Top 5 critical
                 story.append(self._create_asset_paragraph(asset, colors.red))
             story.append(Spacer(1, 0.2*inch))
         
-        warning_assets = [a for a in assets if a['riskLevel'] == 'warning']
-        if warning_assets:
-            story.append(Paragraph(f"⚡ Warning Assets ({len(warning_assets)})", self.heading_style))
-            for asset in warning_assets[:5]:  # Top 5 warning
+        if summary['warning']:
+            story.append(Paragraph(f"⚡ Warning Assets ({summary['warning']})", self.heading_style))
+            for asset in _first(ranked, 'warning', 5):  # Top 5 warning
                 story.append(self._create_asset_paragraph(asset, colors.orange))
             story.append(Spacer(1, 0.2*inch))
         
         story.append(PageBreak())
         story.append(Paragraph("Detailed Asset Analysis", self.heading_style))
-        
-        table_data = [['Asset', 'Risk', 'Temp (°C)', 'Vib (mm/s)', 'Pressure (PSI)', 'Days to Failure']]
-        
-        for asset in sorted(assets, key=lambda x: x['riskScore'], reverse=True):
-            row = [
-                asset['name'],
-                f"{asset['riskScore']:.1f}%",
-                f"{asset['temperature']:.1f}",
-                f"{asset['vibration']:.2f}",
-                f"{asset['pressure']:.1f}",
-                str(asset['predictedFailure'])
-            ]
-            table_data.append(row)
-        
-        detail_table = Table(table_data, colWidths=[1.5*inch, 0.8*inch, 0.9*inch, 0.9*inch, 1*inch, 1*inch])
-        detail_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#000000')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-        ]))
-        
-        for idx, asset in enumerate(sorted(assets, key=lambda x: x['riskScore'], reverse=True), start=1):
-            if asset['riskLevel'] == 'critical':
-                detail_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, idx), (-1, idx), colors.HexColor('#fee2e2'))
-                ]))
-            elif asset['riskLevel'] == 'warning':
-                detail_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, idx), (-1, idx), colors.HexColor('#fef3c7'))
-                ]))
-        
-        story.append(detail_table)
+        for start in range(0, len(ranked), DETAIL_CHUNK_ROWS):
+            story.append(self._detail_table(ranked[start:start + DETAIL_CHUNK_ROWS]))
         story.append(Spacer(1, 0.3*inch))
         
         story.append(PageBreak())
         story.append(Paragraph("AI-Powered Recommendations", self.heading_style))
         
-        recommendations = self._generate_recommendations(assets, summary)
+        recommendations = self._generate_recommendations(summary)
         for i, rec in enumerate(recommendations, 1):
             rec_text = f"<b>{i}.</b> {rec}"
             story.append(Paragraph(rec_text, self.styles['Normal']))
@@ -140,13 +166,39 @@ class MaintenanceReportGenerator:
         # Footer
         story.append(Spacer(1, 0.5*inch))
         footer_text = "<i>Generated by AI Maintenance Predictor | Powered by Machine Learning</i>"
-        footer_style = ParagraphStyle('Footer', parent=self.styles['Normal'], 
-                                       fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
-        story.append(Paragraph(footer_text, footer_style))
+        story.append(Paragraph(footer_text, self.footer_style))
         
         doc.build(story)
-        buffer.seek(0)
-        return buffer.getvalue()
+
+    def _detail_table(self, assets: List[Dict]) -> Table:
+        """One chunk of the detail table, header repeated on every page"""
+        table_data = [DETAIL_HEADER]
+        for asset in assets:
+            table_data.append([
+                asset['name'],
+                f"{asset['riskScore']:.1f}%",
+                f"{asset['temperature']:.1f}",
+                f"{asset['vibration']:.2f}",
+                f"{asset['pressure']:.1f}",
+                str(asset['predictedFailure'])
+            ])
+
+        # One BACKGROUND command per run of equally flagged rows (the rows
+        # are sorted by score, so critical and warning rows are contiguous)
+        commands = []
+        run_start, run_level = 1, None
+        for idx, asset in enumerate(assets + [None], start=1):
+            level = asset['riskLevel'] if asset is not None else None
+            if level != run_level:
+                if run_level in RISK_ROW_COLORS:
+                    commands.append(('BACKGROUND', (0, run_start), (-1, idx - 1), RISK_ROW_COLORS[run_level]))
+                run_start, run_level = idx, level
+
+        table = Table(table_data, colWidths=DETAIL_COL_WIDTHS, repeatRows=1)
+        table.setStyle(DETAIL_TABLE_STYLE)
+        if commands:
+            table.setStyle(TableStyle(commands))
+        return table
     
     def _create_asset_paragraph(self, asset: Dict, color) -> Paragraph:
         """Create a formatted paragraph for an asset"""
@@ -157,12 +209,10 @@ class MaintenanceReportGenerator:
         Pressure: {asset['pressure']:.1f} PSI<br/>
         <i>Predicted failure in {asset['predictedFailure']} days</i>
         """
-        style = ParagraphStyle('AssetStyle', parent=self.styles['Normal'], 
-                               leftIndent=20, spaceAfter=10)
-        return Paragraph(text, style)
+        return Paragraph(text, self.asset_style)
     
-    def _generate_recommendations(self, assets: List[Dict], summary: Dict) -> List[str]:
-        """Generate actionable recommendations"""
+    def _generate_recommendations(self, summary: Dict) -> List[str]:
+        """Generate actionable recommendations from FleetStats.as_dict()"""
         recommendations = []
         
         critical_count = summary['critical']
@@ -180,24 +230,22 @@ class MaintenanceReportGenerator:
                 "Plan maintenance within the next 7 days to prevent failures."
             )
         
-        high_temp = [a for a in assets if a['temperature'] > 85]
-        if high_temp:
+        alerts = summary['alerts']
+        if alerts['temperature']:
             recommendations.append(
-                f"<b>Temperature Alert:</b> {len(high_temp)} asset(s) operating above normal temperature. "
+                f"<b>Temperature Alert:</b> {alerts['temperature']} asset(s) operating above normal temperature. "
                 "Check cooling systems and lubrication schedules."
             )
         
-        high_vib = [a for a in assets if a['vibration'] > 2.0]
-        if high_vib:
+        if alerts['vibration']:
             recommendations.append(
-                f"<b>Vibration Alert:</b> {len(high_vib)} asset(s) showing elevated vibration levels. "
+                f"<b>Vibration Alert:</b> {alerts['vibration']} asset(s) showing elevated vibration levels. "
                 "Inspect bearings, alignment, and mounting systems."
             )
         
-        high_runtime = [a for a in assets if a['runtime'] > 4500]
-        if high_runtime:
+        if alerts['runtime']:
             recommendations.append(
-                f"<b>Runtime Review:</b> {len(high_runtime)} asset(s) have exceeded 4500 hours. "
+                f"<b>Runtime Review:</b> {alerts['runtime']} asset(s) have exceeded {summary['alert_thresholds']['runtime']} hours. "
                 "Consider scheduled downtime for comprehensive inspection."
             )
         
@@ -212,4 +260,70 @@ class MaintenanceReportGenerator:
             "Validate readings monthly to maintain prediction accuracy."
         )
         
-        return recommendations
\ No newline at end of file
+        return recommendations
+
+
+def _first(ranked: List[Dict], level: str, n: int) -> List[Dict]:
+    return list(islice((a for a in ranked if a['riskLevel'] == level), n))
+
+
+@lru_cache(maxsize=1)
+def get_report_generator() -> MaintenanceReportGenerator:
+    """Process-wide generator, so stylesheets are built once"""
+    return MaintenanceReportGenerator()
+
+
+def generate_pdf_report(assets: List[Dict], summary: Dict) -> bytes:
+    """Render a report to bytes in one call"""
+    return get_report_generator().generate_report(assets, summary)
+
+
+def write_pdf_report(path: str, assets: List[Dict], summary: Dict, generated_at: Optional[datetime] = None) -> str:
+    """
+    Render a report to path (used from the compute pool)
+
+    The PDF is written next to path and moved into place with os.replace,
+    so concurrent readers never see a partial file. summary is
+    FleetStats.as_dict() for the same assets.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        get_report_generator().build_report(assets, summary, tmp_path, generated_at)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+class ReportCache:
+    """
+    Rendered reports on disk, one file per fleet version
+
+    Reports only depend on the active fleet (their "Generated:" time is the
+    time the fleet version was stored), so a report built for a fleet
+    version is served as-is until the fleet changes. Files live on disk so
+    every worker shares them and responses can be streamed from the file.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, fleet_version: int) -> str:
+        return os.path.join(self.directory, f"report_v{fleet_version}.pdf")
+
+    def get(self, fleet_version: int) -> Optional[str]:
+        """Path of the cached report for this version, or None"""
+        path = self.path(fleet_version)
+        return path if os.path.exists(path) else None
+
+    def prune(self, fleet_version: int):
+        """Delete reports of older fleet versions (open downloads keep their file)"""
+        for name in os.listdir(self.directory):
+            match = REPORT_NAME.fullmatch(name)
+            if match and int(match.group(1)) < fleet_version:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,204 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+def row_keys(X: np.ndarray, decimals: int) -> np.ndarray:
+    """
+    64-bit hash of every feature row after rounding to `decimals` places
+
+    Rounding makes readings that differ only by float noise share a key;
+    adding 0.0 folds -0.0 into 0.0. The float bits of each column are mixed
+    in column by column (FNV-style multiply plus xor-shifts), which is
+    several times faster than hashing rows through pandas.
+    """
+    quantized = np.round(np.asarray(X, dtype=np.float64).reshape(len(X), -1), decimals) + 0.0
+    bits = quantized.view(np.uint64)
+    keys = np.full(len(bits), 0xcbf29ce484222325, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for column in bits.T:
+            keys ^= column
+            keys *= np.uint64(0x100000001b3)
+            keys ^= keys >> np.uint64(29)
+        keys ^= keys >> np.uint64(32)
+        keys *= np.uint64(0xbf58476d1ce4e5b9)
+        keys ^= keys >> np.uint64(29)
+    return keys
+
+
+class PredictionCache:
+    """
+    LRU + TTL cache of risk scores keyed by quantized feature row
+
+    Entries belong to one model version; invalidate(version) drops them all
+    when a new model is swapped in, and writes computed by an older model
+    that finish afterwards are ignored. Whole batches are also remembered
+    by a digest of their row keys, so re-scoring an unchanged fleet costs
+    one hashing pass instead of a lookup per row.
+
+    Configured with PREDICTION_CACHE_SIZE (0 disables the cache),
+    PREDICTION_CACHE_TTL (seconds) and PREDICTION_CACHE_DECIMALS.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        decimals: Optional[int] = None,
+        max_batches: int = 16,
+    ):
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("PREDICTION_CACHE_SIZE", 100_000))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv("PREDICTION_CACHE_TTL", 3600))
+        self.decimals = decimals if decimals is not None else int(os.getenv("PREDICTION_CACHE_DECIMALS", 6))
+        self.max_batches = max_batches
+        self.version = 0
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._batches: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.batch_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def invalidate(self, version: int):
+        """Drop every entry and only accept results from the given model version"""
+        with self._lock:
+            self._entries.clear()
+            self._batches.clear()
+            self.version = version
+            self.invalidations += 1
+
+    def predict(self, X: np.ndarray, predict_fn: Callable[[np.ndarray], np.ndarray], version: int) -> np.ndarray:
+        """
+        Scores for X, calling predict_fn only for rows not in the cache
+
+        Args:
+            X: Feature matrix (n_rows, n_features)
+            predict_fn: Model predict function for the missing rows
+            version: Model version predict_fn belongs to
+
+        Returns:
+            Scores aligned with the rows of X
+        """
+        X = np.asarray(X)
+        if not self.enabled or len(X) == 0:
+            return predict_fn(X)
+
+        key_array = row_keys(X, self.decimals)
+        batch_key = hashlib.blake2b(key_array.tobytes(), digest_size=16).digest() if len(X) > 1 else None
+        now = time.monotonic()
+
+        with self._lock:
+            batch = self._batches.get(batch_key) if batch_key and version == self.version else None
+            if batch is not None and batch[1] >= now:
+                self._batches.move_to_end(batch_key)
+                self.hits += len(X)
+                self.batch_hits += 1
+                return batch[0].copy()
+
+        keys = key_array.tolist()
+        scores = np.empty(len(keys), dtype=np.float64)
+        missing = []
+        with self._lock:
+            if version != self.version:
+                missing = list(range(len(keys)))
+            else:
+                entries = self._entries
+                for i, key in enumerate(keys):
+                    entry = entries.get(key)
+                    if entry is None:
+                        missing.append(i)
+                    elif entry[1] < now:
+                        del entries[key]
+                        self.expirations += 1
+                        missing.append(i)
+                    else:
+                        entries.move_to_end(key)
+                        scores[i] = entry[0]
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        expires = time.monotonic() + self.ttl_seconds
+        if missing:
+            missing = np.array(missing)
+            computed = np.asarray(predict_fn(X[missing]), dtype=np.float64)
+            scores[missing] = computed
+
+        with self._lock:
+            if version != self.version:
+                return scores
+            if len(missing):
+                entries = self._entries
+                entries.update(zip([keys[i] for i in missing.tolist()], ((s, expires) for s in computed.tolist())))
+                overflow = len(entries) - self.max_entries
+                for _ in range(max(overflow, 0)):
+                    entries.popitem(last=False)
+                self.evictions += max(overflow, 0)
+            if batch_key and len(keys) <= self.max_entries:
+                self._batches[batch_key] = (scores.copy(), expires)
+                self._batches.move_to_end(batch_key)
+                while len(self._batches) > self.max_batches:
+                    self._batches.popitem(last=False)
+        return scores
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "model_version": self.version,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "batch_hits": self.batch_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+def _unwrap(predictor):
+    return predictor
+
+
+class CachedPredictor:
+    """
+    MaintenancePredictor whose predict() goes through a PredictionCache
+
+    Every other attribute is the wrapped predictor's. Pickling yields the
+    plain predictor, so process-pool workers score without the (per
+    process) cache.
+    """
+
+    def __init__(self, predictor, cache: PredictionCache, version: int):
+        self.predictor = predictor
+        self.cache = cache
+        self.version = version
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if not self.predictor.is_trained:
+            return self.predictor.predict(X)
+        return self.cache.predict(X, self.predictor.predict, self.version)
+
+    def __getattr__(self, name):
+        if name == "predictor":
+            raise AttributeError(name)
+        return getattr(self.predictor, name)
+
+    def __reduce__(self):
+        return (_unwrap, (self.predictor,))
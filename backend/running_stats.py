@@ -0,0 +1,92 @@
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_engine import DEFAULT_FLEET_AGGREGATES
+
+STAT_COLUMNS = ('temperature', 'vibration', 'pressure', 'runtime')
+
+
+class RunningStatistics:
+    """
+    Mergeable count/mean/M2/max per sensor column
+
+    Chunks are folded in with the parallel form of Welford's algorithm,
+    so the result does not depend on how the data was chunked or sharded.
+    A model carries a frozen copy as its reference for the fleet-wide
+    features; the store keeps a running copy that every upload updates.
+    """
+
+    def __init__(self, columns: Iterable[str] = STAT_COLUMNS, state: Optional[Dict] = None):
+        self.stats = {col: [0, 0.0, 0.0, -np.inf] for col in columns}
+        for col, values in (state or {}).items():
+            self.stats[col] = [int(values[0]), float(values[1]), float(values[2]), float(values[3])]
+
+    def update(self, df: pd.DataFrame):
+        """Fold the non-missing values of every tracked column of df in"""
+        for col in self.stats:
+            if col in df.columns:
+                self.update_values(col, df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    def update_values(self, col: str, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            mean = values.mean()
+            self._combine(col, len(values), mean, ((values - mean) ** 2).sum(), values.max())
+
+    def merge(self, other: "RunningStatistics") -> "RunningStatistics":
+        """Fold another accumulator in (in place) and return self"""
+        for col, (n, mean, m2, max_) in other.stats.items():
+            if n:
+                self.stats.setdefault(col, [0, 0.0, 0.0, -np.inf])
+                self._combine(col, n, mean, m2, max_)
+        return self
+
+    def _combine(self, col: str, n_b: int, mean_b: float, m2_b: float, max_b: float):
+        state = self.stats[col]
+        n_a, mean_a, m2_a, max_a = state
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        state[0] = n
+        state[1] = float(mean_a + delta * n_b / n)
+        state[2] = float(m2_a + m2_b + delta ** 2 * n_a * n_b / n)
+        state[3] = float(max(max_a, max_b))
+
+    def count(self, col: str) -> int:
+        return self.stats[col][0] if col in self.stats else 0
+
+    def mean(self, col: str) -> float:
+        return self.stats[col][1] if self.count(col) else float('nan')
+
+    def std(self, col: str) -> float:
+        n = self.count(col)
+        return float(np.sqrt(self.stats[col][2] / (n - 1))) if n > 1 else float('nan')
+
+    def max(self, col: str) -> float:
+        return self.stats[col][3] if self.count(col) else float('nan')
+
+    def aggregates(self) -> Dict[str, float]:
+        """Fleet aggregates for build_features; defaults for columns never seen"""
+        aggregates = dict(DEFAULT_FLEET_AGGREGATES)
+        if self.count('temperature') > 1:
+            aggregates['temperature_std'] = self.std('temperature')
+        if self.count('temperature'):
+            aggregates['temperature_max'] = self.max('temperature')
+        if self.count('vibration'):
+            aggregates['vibration_max'] = self.max('vibration')
+        if self.count('pressure') > 1:
+            aggregates['pressure_std'] = self.std('pressure')
+        return aggregates
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable state (columns never seen are left out)"""
+        return {col: list(state) for col, state in self.stats.items() if state[0]}
+
+    @classmethod
+    def from_dict(cls, state: Optional[Dict]) -> "RunningStatistics":
+        return cls(state=state)
+
+    def copy(self) -> "RunningStatistics":
+        return RunningStatistics(self.stats, self.to_dict())
@@ -0,0 +1,248 @@
+import math
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+# Fewest rows worth handing to a worker process
+MIN_SHARD_ROWS = 10_000
+
+# Free /dev/shm needed per byte of a batch's shared files (other batches may be in flight)
+SHM_HEADROOM = 2
+
+_worker_model = None
+
+
+def _init_worker(predictor):
+    """Keep one copy of the model per worker; shards run single-threaded side by side"""
+    global _worker_model
+    _worker_model = predictor
+    threadpool_limits(1)
+
+
+def _score_shard(features_path: str, scores_path: str, shape: tuple, start: int, stop: int):
+    """Score rows start:stop of the shared feature matrix into the shared score vector"""
+    X = np.memmap(features_path, dtype=np.float64, mode='r', shape=shape)
+    scores = np.memmap(scores_path, dtype=np.float64, mode='r+', shape=(shape[0],))
+    scores[start:stop] = _worker_model.predict(np.asarray(X[start:stop]))
+    scores.flush()
+
+
+def _shard_dir(nbytes: int) -> str:
+    """
+    tmpfs when it has room for nbytes, so the shared matrices never touch a disk
+
+    /dev/shm is only 64 MB in a default Docker container; writing past its
+    end fails with ENOSPC or SIGBUS, so larger batches go to the temp dir.
+    """
+    directory = os.getenv("SCORING_SHARD_DIR")
+    if directory:
+        return directory
+    if os.path.isdir("/dev/shm") and shutil.disk_usage("/dev/shm").free >= nbytes * SHM_HEADROOM:
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+class ShardedScorer:
+    """
+    Scores large feature matrices on a pool of worker processes
+
+    The matrix is written once to a memory-mapped file in SCORING_SHARD_DIR
+    (default /dev/shm, or the temp dir when /dev/shm is too small) and
+    every worker maps the same pages, reads its contiguous slice and writes
+    its scores into a shared output vector at the same offsets, so nothing
+    but shard bounds is pickled and results come back in input order.
+    Workers hold their own copy of the model, sent once when the pool
+    starts; load() starts a new pool for a new one, and the old pool is
+    shut down once the batches already using it are done.
+
+    Configured with SCORING_WORKERS (0 or 1 disables sharding),
+    SCORING_MIN_ROWS (smaller batches are scored in-process) and
+    SCORING_START_METHOD (default spawn).
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        min_rows: Optional[int] = None,
+        start_method: Optional[str] = None,
+    ):
+        self.workers = workers if workers is not None else int(os.getenv("SCORING_WORKERS", 0))
+        self.min_rows = min_rows if min_rows is not None else int(os.getenv("SCORING_MIN_ROWS", 100_000))
+        # spawn: forking a multi-threaded server process is unsafe
+        self._context = mp.get_context(start_method or os.getenv("SCORING_START_METHOD", "spawn"))
+        self._predictor = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Batches in flight per pool; replaced pools wait here until theirs finish
+        self._in_flight: Dict[ProcessPoolExecutor, int] = {}
+        self._lock = threading.Lock()
+        self.sharded_calls = 0
+        self.sharded_rows = 0
+        self.last_seconds: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1
+
+    def load(self, predictor):
+        """
+        Serve predictor from now on
+
+        Batches already scoring on the old pool finish on it (and on the old
+        model); a new pool is started on the next sharded call.
+        """
+        with self._lock:
+            self._predictor = predictor
+            self._retire_executor()
+
+    def should_shard(self, predictor, n_rows: int) -> bool:
+        """True if X of n_rows rows for predictor (the loaded one) should be sharded"""
+        return self.enabled and predictor is self._predictor and n_rows >= self.min_rows
+
+    def _checkout(self, predictor=None) -> Optional[ProcessPoolExecutor]:
+        """
+        The pool serving predictor (default: the loaded one), held until _checkin
+
+        None if predictor is no longer the loaded model.
+        """
+        with self._lock:
+            if predictor is not None and predictor is not self._predictor:
+                return None
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=self._context,
+                    initializer=_init_worker, initargs=(self._predictor,),
+                )
+                self._in_flight[self._executor] = 0
+            self._in_flight[self._executor] += 1
+            return self._executor
+
+    def _checkin(self, executor: ProcessPoolExecutor):
+        with self._lock:
+            if executor not in self._in_flight:
+                return  # shut down meanwhile
+            self._in_flight[executor] -= 1
+            if executor is not self._executor and not self._in_flight[executor]:
+                del self._in_flight[executor]
+                executor.shutdown(wait=False)
+
+    def predict(self, X: np.ndarray, predictor=None) -> np.ndarray:
+        """
+        Scores for X, computed shard by shard across the worker processes
+
+        Args:
+            X: Feature matrix (n_rows, n_features)
+            predictor: The model the caller expects to be scored by; if
+                load() replaced it meanwhile, X is scored in-process with it
+
+        Returns:
+            Scores aligned with the rows of X
+        """
+        executor = self._checkout(predictor)
+        if executor is None:
+            return predictor.predict(X)
+        try:
+            return self._predict_sharded(executor, X)
+        finally:
+            self._checkin(executor)
+
+    def _predict_sharded(self, executor: ProcessPoolExecutor, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        n_rows = len(X)
+        n_shards = max(min(self.workers, math.ceil(n_rows / MIN_SHARD_ROWS)), 1)
+        bounds = np.linspace(0, n_rows, n_shards + 1).astype(int).tolist()
+
+        start_time = time.perf_counter()
+        shard_dir = _shard_dir(X.nbytes + n_rows * np.dtype(np.float64).itemsize)
+        stem = os.path.join(shard_dir, f"scoring-{os.getpid()}-{uuid.uuid4().hex}")
+        features_path, scores_path = f"{stem}.features", f"{stem}.scores"
+        try:
+            features = np.memmap(features_path, dtype=np.float64, mode='w+', shape=X.shape)
+            features[:] = X
+            features.flush()
+            del features
+            np.memmap(scores_path, dtype=np.float64, mode='w+', shape=(n_rows,)).flush()
+
+            futures = [
+                executor.submit(_score_shard, features_path, scores_path, X.shape, start, stop)
+                for start, stop in zip(bounds, bounds[1:]) if stop > start
+            ]
+            for future in futures:
+                future.result()
+            scores = np.array(np.memmap(scores_path, dtype=np.float64, mode='r', shape=(n_rows,)))
+        finally:
+            for path in (features_path, scores_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        with self._lock:
+            self.last_seconds = time.perf_counter() - start_time
+            self.sharded_calls += 1
+            self.sharded_rows += n_rows
+        return scores
+
+    def status(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "min_rows": self.min_rows,
+            "pool_running": self._executor is not None,
+            "sharded_calls": self.sharded_calls,
+            "sharded_rows": self.sharded_rows,
+            "last_seconds": round(self.last_seconds, 4) if self.last_seconds is not None else None,
+        }
+
+    def _retire_executor(self):
+        """Stop handing out the current pool; it shuts down when its last batch checks in"""
+        executor, self._executor = self._executor, None
+        if executor is not None and not self._in_flight.get(executor):
+            self._in_flight.pop(executor, None)
+            executor.shutdown(wait=False)
+
+    def shutdown(self):
+        with self._lock:
+            for executor in [self._executor, *self._in_flight]:
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._in_flight.clear()
+
+
+def _unwrap(predictor):
+    return predictor
+
+
+class ShardedPredictor:
+    """
+    MaintenancePredictor whose predict() shards large batches over a ShardedScorer
+
+    Batches below the scorer's min_rows (and every batch of an untrained
+    model) are scored in-process. Every other attribute is the wrapped
+    predictor's; pickling yields the plain predictor, so compute-pool
+    processes never try to start pools of their own.
+    """
+
+    def __init__(self, predictor, scorer: ShardedScorer):
+        self.predictor = predictor
+        self.scorer = scorer
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if self.predictor.is_trained and self.scorer.should_shard(self.predictor, len(X)):
+            return self.scorer.predict(X, self.predictor)
+        return self.predictor.predict(X)
+
+    def __getattr__(self, name):
+        if name == "predictor":
+            raise AttributeError(name)
+        return getattr(self.predictor, name)
+
+    def __reduce__(self):
+        return (_unwrap, (self.predictor,))
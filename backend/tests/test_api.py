@@ -2,8 +2,16 @@ import pytest
 from fastapi.testclient import TestClient
 import sys
 import os
+import tempfile
+import shutil
+import json
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("ASSET_DB_PATH", os.path.join(tempfile.mkdtemp(), "test.db"))
+if "MODEL_DIR" not in os.environ:
+    # Serve a copy of the shipped model so versioning never writes into models/
+    os.environ["MODEL_DIR"] = tempfile.mkdtemp()
+    shutil.copy(os.path.join(os.path.dirname(__file__), '..', 'models', 'maintenance_model.pkl'), os.environ["MODEL_DIR"])
 
 from main import app
 
@@ -68,4 +76,206 @@ def test_predict_single():
     result = response.json()
     assert "riskScore" in result
     assert "riskLevel" in result
-    assert "predictedFailure" in result
\ No newline at end of file
+    assert "predictedFailure" in result
+
+def test_filter_and_sort_assets():
+    """Test risk-level filtering and riskScore sorting on /assets/"""
+    with open(os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_sensors.csv'), 'rb') as f:
+        response = client.post("/upload/", files={"file": ("sample.csv", f, "text/csv")})
+    assert response.status_code == 200
+
+    assets = client.get("/assets/", params={"sort": "riskScore"}).json()
+    scores = [a["riskScore"] for a in assets]
+    assert scores == sorted(scores, reverse=True)
+
+    critical = client.get("/assets/", params={"risk_level": "critical"}).json()
+    assert all(a["riskLevel"] == "critical" for a in critical)
+
+    response = client.get("/assets/", params={"risk_level": "unknown"})
+    assert response.status_code == 400
+
+def test_paginate_assets():
+    """Test cursor pagination with field projection"""
+    first = client.get("/assets/", params={"limit": 4, "sort": "riskScore", "fields": "name,riskScore"}).json()
+    assert len(first["items"]) == 4
+    assert set(first["items"][0]) == {"id", "name", "riskScore"}
+
+    second = client.get("/assets/", params={"limit": 4, "sort": "riskScore", "cursor": first["next_cursor"]}).json()
+    ids = [a["id"] for a in first["items"] + second["items"]]
+    assert len(ids) == len(set(ids)) == first["total"]
+
+def test_asset_detail_serves_stored_readings():
+    """Test historicalData comes from the uploaded readings"""
+    asset = client.get("/assets/", params={"name": "Pump-A101"}).json()[0]
+    history = client.get(f"/assets/{asset['id']}", params={"points": 24}).json()["historicalData"]
+
+    assert [point["temperature"] for point in history] == [78.5, 79.2, 80.1]
+    assert history[0]["time"] == "2024-12-01 08:00"
+
+def test_asset_detail_with_missing_readings():
+    """Test an unparseable sensor value does not break the detail view"""
+    csv_content = """asset_name,timestamp,temperature,vibration,pressure,runtime
+P1,2024-12-01 08:00:00,75.5,1.2,95.0,3200
+P1,2024-12-01 09:00:00,bad,1.3,96.0,3201
+P1,2024-12-01 10:00:00,76.0,1.1,,3202"""
+    response = client.post("/upload/", files={"file": ("gaps.csv", csv_content, "text/csv")})
+    assert response.status_code == 200
+    asset = response.json()["assets"][0]
+
+    response = client.get(f"/assets/{asset['id']}")
+    assert response.status_code == 200
+    history = response.json()["historicalData"]
+    assert len(history) == 3
+    assert all(point["temperature"] is not None and point["pressure"] is not None for point in history)
+
+def test_upload_without_a_sensor_column():
+    """Test a CSV lacking a sensor column still uploads and shows its history"""
+    csv_content = """asset_name,timestamp,temperature,vibration,runtime
+P2,2024-12-01 08:00:00,75.5,1.2,3200
+P2,2024-12-01 09:00:00,76.5,1.3,3201"""
+    response = client.post("/upload/", files={"file": ("nopressure.csv", csv_content, "text/csv")})
+    assert response.status_code == 200
+    asset = response.json()["assets"][0]
+    assert asset["pressure"] == 0.0
+
+    history = client.get(f"/assets/{asset['id']}").json()["historicalData"]
+    assert [point["pressure"] for point in history] == [None, None]
+
+def test_predict_batch_ndjson():
+    """Test NDJSON batch scoring streams one result per line"""
+    body = b'{"id": 1, "temperature": 80}\n{"id": 2, "temperature": 95, "vibration": 2.5}\n'
+    response = client.post("/predict/batch/", content=body, headers={"content-type": "application/x-ndjson"})
+    assert response.status_code == 200
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [1, 2]
+    assert all("riskScore" in line for line in lines)
+
+def test_upload_async_job():
+    """Test async uploads return a job that can be polled and streamed"""
+    with open(os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_sensors.csv'), 'rb') as f:
+        response = client.post("/upload/", params={"async_job": True}, files={"file": ("sample.csv", f, "text/csv")})
+    assert response.status_code == 200
+    job_id = response.json()["job_id"]
+
+    job = client.get(f"/upload/jobs/{job_id}").json()
+    assert job["status"] == "completed"
+    assert job["progress"] == 100
+    assert job["summary"]["total_assets"] == len(client.get("/assets/").json())
+
+    events = client.get(f"/upload/jobs/{job_id}/events")
+    assert events.headers["content-type"].startswith("text/event-stream")
+    assert json.loads(events.text.split("data: ")[-1])["status"] == "completed"
+
+    assert client.get("/upload/jobs/unknown").status_code == 404
+
+def test_stale_upload_job_ends_event_stream(monkeypatch):
+    """Test the event stream of a job whose worker died ends with a failure"""
+    from main import upload_jobs
+    job_id = upload_jobs.create("lost.csv", upload_id=None)
+    upload_jobs.update(job_id, status="running", stage="parse")
+    monkeypatch.setattr(upload_jobs, "stale_seconds", 0)
+
+    events = client.get(f"/upload/jobs/{job_id}/events").text.strip().split("\n\n")
+    assert json.loads(events[-1][len("data: "):])["status"] == "failed"
+
+def test_upload_delta():
+    """Test a delta re-upload of the same file leaves the fleet untouched"""
+    path = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_sensors.csv')
+    with open(path, 'rb') as f:
+        client.post("/upload/", files={"file": ("sample.csv", f, "text/csv")})
+    before = client.get("/assets/").json()
+
+    with open(path, 'rb') as f:
+        response = client.post("/upload/", params={"delta": True}, files={"file": ("sample.csv", f, "text/csv")})
+    assert response.status_code == 200
+    delta = response.json()["summary"]["delta"]
+    assert delta["changed_assets"] == delta["new_assets"] == 0
+    assert delta["unchanged_assets"] == len(before)
+    assert "processing_memory" in response.json()["summary"]
+    assert client.get("/assets/").json() == before
+
+def test_delta_after_model_change_rescores_fleet():
+    """Test a delta upload re-scores every asset once another model version serves"""
+    from main import registry
+    from ml_model import MaintenancePredictor
+    path = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_sensors.csv')
+    with open(path, 'rb') as f:
+        client.post("/upload/", files={"file": ("sample.csv", f, "text/csv")})
+    before = client.get("/assets/").json()
+
+    model = MaintenancePredictor(autoload=False)
+    model.train(*model.generate_synthetic_training_data(n_samples=200))
+    version = registry.versions.publish(model)["version"]
+    previous = registry.predictor
+    registry.activate(version)
+    try:
+        with open(path, 'rb') as f:
+            summary = client.post(
+                "/upload/", params={"delta": True}, files={"file": ("sample.csv", f, "text/csv")}
+            ).json()["summary"]
+        assert "delta" not in summary
+        assert summary["total_assets"] == len(before)
+
+        with open(path, 'rb') as f:
+            summary = client.post(
+                "/upload/", params={"delta": True}, files={"file": ("sample.csv", f, "text/csv")}
+            ).json()["summary"]
+        assert summary["delta"]["unchanged_assets"] == len(before)
+    finally:
+        registry.swap(previous)
+
+def test_fleet_stats():
+    """Test the fleet statistics endpoint agrees with the upload summary"""
+    path = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_sensors.csv')
+    with open(path, 'rb') as f:
+        summary = client.post("/upload/", files={"file": ("sample.csv", f, "text/csv")}).json()["summary"]
+
+    response = client.get("/fleet/stats/")
+    assert response.status_code == 200
+    stats = response.json()
+    for key in ("total_assets", "healthy", "warning", "critical", "avg_risk_score"):
+        assert stats[key] == summary[key]
+    assert summary["processing_memory"]["parse"] > 0
+    assert set(stats["alerts"]) == {"temperature", "vibration", "runtime"}
+
+def test_export_report_cached():
+    """Test repeated exports of an unchanged fleet reuse the rendered report"""
+    path = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_sensors.csv')
+    with open(path, 'rb') as f:
+        client.post("/upload/", files={"file": ("sample.csv", f, "text/csv")})
+
+    first = client.get("/export-report/")
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "application/pdf"
+    assert first.content.startswith(b"%PDF")
+    assert client.get("/export-report/").content == first.content
+
+def test_export_fleet_csv():
+    """Test the fleet and its readings stream as CSV"""
+    path = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_sensors.csv')
+    with open(path, 'rb') as f:
+        assets = client.post("/upload/", files={"file": ("sample.csv", f, "text/csv")}).json()["assets"]
+
+    response = client.get("/export/assets/")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0].startswith("id,name,riskLevel,riskScore")
+    assert len(lines) == len(assets) + 1
+
+    readings = client.get("/export/readings/", params={"format": "csv"})
+    assert readings.text.splitlines()[0] == "asset_id,asset_name,timestamp,temperature,vibration,pressure,runtime"
+
+    assert client.get("/export/assets/", params={"format": "xml"}).status_code == 400
+    assert client.get("/export/uploads/").status_code == 404
+
+def test_model_versions_endpoints():
+    """Test model versions are listed and unknown versions cannot be activated"""
+    response = client.get("/models/")
+    assert response.status_code == 200
+    listing = response.json()
+    assert [v["version"] for v in listing["versions"] if v["active"]] == (
+        [listing["active_version"]] if listing["active_version"] is not None else []
+    )
+    assert client.post("/models/99999/activate").status_code == 404
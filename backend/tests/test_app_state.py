@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_state import AppState, MemoryAppState, SqliteAppState
+from ml_model import MaintenancePredictor
+from model_registry import ModelRegistry
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "assets.db")
+
+@pytest.fixture(params=["memory", "sqlite"])
+def state(request, db_path):
+    return MemoryAppState() if request.param == "memory" else SqliteAppState(db_path)
+
+def test_app_state_is_abstract():
+    """Test a backend missing part of the interface cannot be instantiated"""
+    class Partial(AppState):
+        def training_status(self):
+            return {}
+
+    with pytest.raises(TypeError):
+        AppState()
+    with pytest.raises(TypeError):
+        Partial()
+
+def test_only_one_training_claim(state):
+    """Test a live training claim blocks others until it finishes"""
+    assert state.claim_training("worker-1", message="Starting")
+    assert not state.claim_training("worker-2")
+
+    state.update_training(progress=50, estimators_done=50, n_estimators=100)
+    status = state.training_status()
+    assert status["is_training"] and status["progress"] == 50
+    assert "owner" not in status
+
+    state.update_training(is_training=False, progress=100)
+    assert state.claim_training("worker-2")
+
+def test_stale_claim_can_be_taken_over(state, monkeypatch):
+    """Test a job no longer updated (its worker died) does not block training forever"""
+    assert state.claim_training("worker-1")
+    monkeypatch.setenv("TRAINING_STALE_SECONDS", "-1")
+    assert state.claim_training("worker-2")
+
+def test_state_is_shared_between_workers(db_path):
+    """Test two SqliteAppState instances (two workers) see each other's writes"""
+    first, second = SqliteAppState(db_path), SqliteAppState(db_path)
+    assert first.claim_training("worker-1")
+    assert second.training_status()["is_training"]
+    assert not second.claim_training("worker-2")
+
+    assert first.model_version() == 0
+    assert second.publish_model("/models/model.pkl") == 1
+    assert first.model_version() == 1
+
+def test_registry_reloads_published_model(tmp_path, db_path):
+    """Test a worker picks up a model another worker trained and published"""
+    model_dir = str(tmp_path)
+    serving = ModelRegistry(model_dir, state=SqliteAppState(db_path))
+    training = ModelRegistry(model_dir, state=SqliteAppState(db_path))
+    assert not serving.get().is_trained
+    assert not serving.refresh()
+
+    model = MaintenancePredictor(autoload=False)
+    X, y = model.generate_synthetic_training_data(n_samples=200)
+    model.train(X, y)
+    model.save_model(training.model_path)
+    training.swap(model, publish=True)
+
+    assert serving.refresh()
+    assert serving.get().is_trained
+    assert serving.status()["shared_model_version"] == 1
+    assert np.allclose(serving.get().predict(X[:5]), model.predict(X[:5]))
+    assert not serving.refresh()
@@ -0,0 +1,142 @@
+import pytest
+import pandas as pd
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from asset_store import AssetStore
+
+def make_asset(name, risk_level='healthy', risk_score=10.0):
+    return {
+        "id": 1,
+        "name": name,
+        "riskLevel": risk_level,
+        "riskScore": risk_score,
+        "temperature": 75.0,
+        "vibration": 1.0,
+        "pressure": 95.0,
+        "runtime": 3000,
+        "lastMaintenance": "2024-10-15",
+        "predictedFailure": 27
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    return AssetStore(str(tmp_path / "assets.db"))
+
+def test_replace_fleet_assigns_ids(store):
+    """Test stored assets get unique ids and become the active fleet"""
+    upload_id = store.begin_upload("first.csv")
+    stored = store.replace_fleet(upload_id, [make_asset("Pump"), make_asset("Motor", "critical", 90.0)])
+
+    assert [a['id'] for a in stored] == [1, 2]
+    assert store.active_assets() == stored
+    assert store.get_asset(2)['riskLevel'] == 'critical'
+
+def test_new_upload_keeps_history(store):
+    """Test a new upload replaces the fleet but keeps old assets by id"""
+    first = store.replace_fleet(store.begin_upload("first.csv"), [make_asset("Pump")])
+    second = store.replace_fleet(store.begin_upload("second.csv"), [make_asset("Fan")])
+
+    assert [a['name'] for a in store.active_assets()] == ["Fan"]
+    assert second[0]['id'] != first[0]['id']
+    assert store.get_asset(first[0]['id'])['name'] == "Pump"
+
+def test_clear_fleet(store):
+    """Test clearing deactivates the fleet"""
+    store.replace_fleet(store.begin_upload("first.csv"), [make_asset("Pump"), make_asset("Fan")])
+
+    assert store.clear_fleet() == 2
+    assert store.count_active() == 0
+
+def test_fleet_updated_at_tracks_the_version(store):
+    """Test each fleet version records when it was stored"""
+    assert store.fleet_updated_at(store.fleet_version()) is None
+    store.replace_fleet(store.begin_upload("first.csv"), [make_asset("Pump")])
+    version = store.fleet_version()
+    stored_at = store.fleet_updated_at(version)
+
+    assert stored_at is not None
+    assert store.fleet_updated_at(version) == stored_at
+    store.clear_fleet()
+    assert store.fleet_updated_at(version) is None
+    assert store.fleet_updated_at(version + 1) >= stored_at
+
+def test_fleet_survives_reopen(store):
+    """Test assets persist across store instances (restarts, other workers)"""
+    store.replace_fleet(store.begin_upload("first.csv"), [make_asset("Pump")])
+
+    reopened = AssetStore(store.db_path)
+    assert [a['name'] for a in reopened.active_assets()] == ["Pump"]
+
+def test_append_readings(store):
+    """Test processed readings are persisted per upload"""
+    upload_id = store.begin_upload("first.csv")
+    store.append_readings(upload_id, pd.DataFrame({
+        'asset_name': ['Pump', 'Pump'],
+        'timestamp': pd.to_datetime(['2024-12-01 08:00:00', '2024-12-01 09:00:00']),
+        'temperature': [75.0, 76.0],
+        'vibration': [1.0, 1.1],
+        'pressure': [95.0, 96.0],
+        'runtime': [3000, 3001]
+    }))
+
+    with store._connection() as conn:
+        rows = conn.execute("SELECT * FROM readings WHERE upload_id = ?", (upload_id,)).fetchall()
+    assert len(rows) == 2
+    assert rows[0]['timestamp'] == '2024-12-01 08:00:00'
+
+def test_merge_fleet_replaces_only_changed_assets(store):
+    """Test a delta merge retires changed assets and keeps the rest with their ids"""
+    aggregates = {"temperature_std": 9.0}
+    first = store.replace_fleet(
+        store.begin_upload("full.csv"), [make_asset("Pump"), make_asset("Fan")],
+        fingerprints={"Pump": "a:1", "Fan": "b:1"}, aggregates=aggregates, model_version=3
+    )
+    assert store.fleet_snapshot() == ({"Pump": "a:1", "Fan": "b:1"}, aggregates, 3)
+    version = store.fleet_version()
+
+    merged = store.merge_fleet(
+        store.begin_upload("delta.csv"), [make_asset("Fan", "critical", 90.0), make_asset("Motor")],
+        fingerprints={"Fan": "c:2", "Motor": "d:1"}
+    )
+    active = {a['name']: a for a in store.active_assets()}
+
+    assert set(active) == {"Pump", "Fan", "Motor"}
+    assert active["Pump"]['id'] == first[0]['id']
+    assert active["Fan"]['id'] == merged[0]['id'] != first[1]['id']
+    assert active["Fan"]['riskLevel'] == 'critical'
+    assert store.fleet_version() == version + 1
+    assert store.fleet_snapshot() == ({"Pump": "a:1", "Fan": "c:2", "Motor": "d:1"}, aggregates, 3)
+
+    store.clear_fleet()
+    assert store.fleet_snapshot() == ({}, None, None)
+
+def test_iter_fleet_reads_one_snapshot(store):
+    """Test fleet batches come from the fleet active when iteration started"""
+    store.replace_fleet(store.begin_upload("first.csv"), [make_asset(f"Pump {i}") for i in range(5)])
+    batches = store.iter_fleet(chunk_rows=2)
+    first = next(batches)
+    store.replace_fleet(store.begin_upload("second.csv"), [make_asset("Fan")])
+
+    rows = first + [row for batch in batches for row in batch]
+    assert len(first) == 2
+    assert [row[1] for row in rows] == [f"Pump {i}" for i in range(5)]
+    assert [row[1] for batch in store.iter_fleet() for row in batch] == ["Fan"]
+
+def test_merge_statistics_accumulates(store):
+    """Test upload statistics are folded into the running statistics"""
+    from running_stats import RunningStatistics
+    first, second = RunningStatistics(), RunningStatistics()
+    first.update(pd.DataFrame({'temperature': [70.0, 80.0]}))
+    second.update(pd.DataFrame({'temperature': [90.0], 'pressure': [95.0]}))
+
+    assert store.running_statistics().to_dict() == {}
+    store.merge_statistics(first)
+    store.merge_statistics(second)
+
+    stats = store.running_statistics()
+    assert stats.count('temperature') == 3
+    assert stats.mean('temperature') == pytest.approx(80.0)
+    assert stats.max('pressure') == 95.0
@@ -0,0 +1,53 @@
+import pytest
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ml_model import MaintenancePredictor
+from batch_scoring import iter_ndjson, parse_json_array, score_records
+
+@pytest.fixture(scope="module")
+def trained_model():
+    model = MaintenancePredictor(autoload=False)
+    X, y = model.generate_synthetic_training_data(n_samples=200)
+    model.train(X, y)
+    return model
+
+def test_iter_ndjson_handles_split_lines():
+    """Test records split across body chunks are reassembled"""
+    async def chunks():
+        for part in [b'{"temperature": 8', b'0}\n{"temp', b'erature": 90}\nbad\n', b'{"runtime": 1}']:
+            yield part
+
+    async def collect():
+        return [item async for item in iter_ndjson(chunks())]
+
+    items = asyncio.run(collect())
+    assert [index for index, _ in items] == [0, 1, 2, 3]
+    assert items[0][1] == {"temperature": 80}
+    assert isinstance(items[2][1], ValueError)
+    assert items[3][1] == {"runtime": 1}
+
+def test_score_records_matches_single_predictions(trained_model):
+    """Test chunk scoring keeps order and matches per-row scoring"""
+    items = parse_json_array(b'[{"id": "a", "temperature": 95, "vibration": 2.4}, 3, {"temperature": 70}]')
+    results = score_records(trained_model, items)
+
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["id"] == "a"
+    assert "error" in results[1]
+    single = score_records(trained_model, [items[2]])[0]
+    assert results[2]["riskScore"] == single["riskScore"]
+
+def test_score_records_isolates_bad_values(trained_model):
+    """Test one unparseable value only fails its own row"""
+    results = score_records(trained_model, [(0, {"temperature": "hot"}), (1, {"temperature": 75})])
+    assert "error" in results[0]
+    assert "riskScore" in results[1]
+
+def test_parse_json_array_rejects_objects():
+    """Test the JSON body must be an array"""
+    with pytest.raises(ValueError):
+        parse_json_array(b'{"temperature": 80}')
@@ -0,0 +1,87 @@
+import pytest
+import asyncio
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from compute_pool import ComputePool, PoolBusyError, spill_to_disk
+
+def test_runs_off_the_event_loop():
+    """Test jobs run in a worker thread and return their result"""
+    pool = ComputePool(kind="thread", max_workers=2)
+
+    async def run():
+        return await pool.run(lambda: threading.current_thread().name)
+
+    name = asyncio.run(run())
+    assert name != threading.current_thread().name
+    assert pool.status()["completed"] == 1
+    pool.shutdown()
+
+def test_limits_concurrent_jobs():
+    """Test no more than max_concurrent jobs run at once"""
+    pool = ComputePool(kind="thread", max_workers=4, max_concurrent=2)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def job():
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+
+    async def run():
+        await asyncio.gather(*(pool.run(job) for _ in range(6)))
+
+    asyncio.run(run())
+    assert max(peak) == 2
+    pool.shutdown()
+
+def test_rejects_when_queue_is_full():
+    """Test jobs beyond max_concurrent + max_queued raise PoolBusyError"""
+    pool = ComputePool(kind="thread", max_workers=1, max_concurrent=1, max_queued=1)
+
+    async def run():
+        tasks = [asyncio.ensure_future(pool.run(time.sleep, 0.1)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(PoolBusyError):
+            await pool.run(time.sleep, 0)
+        # queue=True jobs wait instead of being rejected
+        await pool.run(time.sleep, 0, queue=True)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert pool.status()["rejected"] == 1
+    assert pool.status()["completed"] == 3
+    pool.shutdown()
+
+def test_process_pool():
+    """Test picklable jobs run in a worker process"""
+    pool = ComputePool(kind="process", max_workers=1)
+
+    async def run():
+        return await pool.run(os.getpid)
+
+    assert asyncio.run(run()) != os.getpid()
+    pool.shutdown()
+
+def test_invalid_kind():
+    """Test unknown pool kinds are rejected"""
+    with pytest.raises(ValueError):
+        ComputePool(kind="fiber")
+
+def test_spill_to_disk():
+    """Test uploads are copied to a readable temporary file"""
+    path = spill_to_disk(io.BytesIO(b"a,b\n1,2\n"))
+    try:
+        with open(path, 'rb') as f:
+            assert f.read() == b"a,b\n1,2\n"
+    finally:
+        os.remove(path)
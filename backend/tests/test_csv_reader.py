@@ -0,0 +1,53 @@
+import pytest
+import io
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from csv_reader import CsvSchema, read_csv_chunks
+from data_processor import DataProcessor
+
+CSV = (
+    "Asset_Name ,timestamp,Temperature,vibration,pressure,runtime,notes\n"
+    "Pump,2024-12-01 08:00:00,78.5,1.2,95.3,3200,\"free text, ignored\"\n"
+    "Pump,2024-12-01 09:00:00,79.2,1.3,96.1,3201,ok\n"
+    "Fan,2024-12-01 08:00:00,70.0,0.9,90.0,1200,ok\n"
+)
+
+def read_all(text, chunk_rows=2, **kwargs):
+    schema = CsvSchema.from_processor(DataProcessor())
+    return list(read_csv_chunks(io.BytesIO(text.encode()), chunk_rows, schema, **kwargs))
+
+def test_schema_reads_expected_columns_only():
+    """Test unused columns are skipped and numeric columns use declared dtypes"""
+    chunks = read_all(CSV)
+    assert [len(c) for c in chunks] == [2, 1]
+    assert list(chunks[0].columns) == ["Asset_Name ", "timestamp", "Temperature", "vibration", "pressure", "runtime"]
+    assert str(chunks[0]["runtime"].dtype) == "float64"
+    assert chunks[0]["Temperature"].tolist() == [78.5, 79.2]
+
+def test_bad_value_falls_back_to_inference():
+    """Test a value that does not fit its dtype restarts parsing without losing or repeating rows"""
+    chunks = read_all(CSV.replace("70.0,0.9", "ERR,0.9"))
+    rows = [row for chunk in chunks for row in chunk["Asset_Name "]]
+    assert rows == ["Pump", "Pump", "Fan"]
+    assert chunks[-1]["Temperature"].tolist() == ["ERR"]
+
+def test_file_without_expected_columns_is_read_whole():
+    """Test files with none of the expected columns keep every column"""
+    chunks = read_all("a,b\n1,2\n")
+    assert list(chunks[0].columns) == ["a", "b"]
+
+def test_engine_validation():
+    """Test unknown engines are rejected"""
+    with pytest.raises(ValueError):
+        read_all(CSV, engine="fast")
+
+def test_pyarrow_engine_matches_c_parser():
+    """Test the pyarrow engine yields the same rows as the C parser"""
+    pytest.importorskip("pyarrow")
+    c_rows = sum(len(c) for c in read_all(CSV, engine="c"))
+    arrow = read_all(CSV, engine="pyarrow")
+    assert sum(len(c) for c in arrow) == c_rows
+    assert "notes" not in arrow[0].columns
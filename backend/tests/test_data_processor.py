@@ -5,7 +5,7 @@ import os
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from data_processor import DataProcessor
+from data_processor import DataProcessor, StageMemory, DEFAULT_FILL_VALUES
 
 def test_process_sensor_data():
     """Test data processing"""
@@ -51,4 +51,84 @@ def test_extract_features():
     
     features = processor.extract_features(data)
     assert isinstance(features, list)
-    assert len(features) > 0
\ No newline at end of file
+    assert len(features) > 0
+
+def test_convert_data_types_falls_back_for_other_formats():
+    """Test timestamps in another layout are still parsed"""
+    processor = DataProcessor()
+    df = pd.DataFrame({'timestamp': ['2024-12-01 08:00:00', '2024-12-01T09:30:00', 'not a date']})
+
+    converted = processor.convert_data_types(df)
+    assert converted['timestamp'].dt.hour.tolist()[:2] == [8, 9]
+    assert pd.isna(converted['timestamp'].iloc[2])
+
+def make_readings():
+    return pd.DataFrame({
+        'Asset_Name': ['Test-1', 'Test-2'],
+        'timestamp': ['2024-12-01 08:00:00', '2024-12-01 09:00:00'],
+        'temperature': [75.5, 80.0],
+        'vibration': [1.2, 2.5],
+        'pressure': [95.3, 96.0],
+        'runtime': [3200.0, 100.0],
+        'last_maintenance': ['2024-10-15', '2024-11-01']
+    })
+
+def test_lean_mode_builds_only_consumed_columns():
+    """Test lean mode skips derived columns no consumer reads"""
+    lean = DataProcessor(mode='lean').process_sensor_data(make_readings())
+    full = DataProcessor(mode='full').process_sensor_data(make_readings())
+
+    assert 'asset_name' in lean.columns
+    assert not {'temp_anomaly', 'vibration_severity', 'days_since_maintenance'} & set(lean.columns)
+    assert {'temp_anomaly', 'vibration_severity', 'days_since_maintenance'} <= set(full.columns)
+    assert pd.api.types.is_datetime64_any_dtype(lean['last_maintenance'])
+
+    only_features = DataProcessor(mode='lean', consumers=['features']).process_sensor_data(make_readings())
+    assert not pd.api.types.is_datetime64_any_dtype(only_features['last_maintenance'])
+
+def test_float32_mode_and_stage_memory():
+    """Test float32 mode downcasts sensors and stage sizes are recorded"""
+    memory = StageMemory()
+    processed = DataProcessor(float32=True).process_sensor_data(make_readings(), memory)
+
+    assert processed['temperature'].dtype == 'float32'
+    assert DataProcessor(float32=True).column_dtypes['runtime'] == 'float32'
+    assert set(memory.as_dict()) == {'parse', 'clean', 'derive'}
+    assert all(size > 0 for size in memory.as_dict().values())
+
+def test_invalid_mode_and_consumer():
+    """Test unknown modes and consumers are rejected"""
+    with pytest.raises(ValueError):
+        DataProcessor(mode='fast')
+    with pytest.raises(ValueError):
+        DataProcessor(consumers=['dashboard'])
+
+def test_temp_anomaly_uses_reference_statistics():
+    """Test temp_anomaly is scored against the given statistics, not the chunk"""
+    from running_stats import RunningStatistics
+    statistics = RunningStatistics()
+    statistics.update(pd.DataFrame({'temperature': [70.0, 80.0, 90.0]}))
+    processor = DataProcessor(mode='full')
+
+    whole = processor.process_sensor_data(make_readings(), statistics=statistics)
+    single = processor.process_sensor_data(make_readings().iloc[1:].copy(), statistics=statistics)
+
+    assert whole['temp_anomaly'].tolist() == pytest.approx([0.45, 0.0])
+    assert single['temp_anomaly'].tolist() == whole['temp_anomaly'].tolist()[1:]
+
+def test_missing_values_filled_from_statistics():
+    """Test empty and unparseable readings get the statistics' mean, not the chunk's"""
+    from running_stats import RunningStatistics
+    statistics = RunningStatistics()
+    statistics.update(pd.DataFrame({'temperature': [70.0, 80.0], 'runtime': [1000.0, 3000.0]}))
+    df = pd.DataFrame({
+        'temperature': ['75.5', 'bad', None],
+        'vibration': [1.2, None, 9.0],
+        'runtime': [4000.0, None, 5000.0],
+    })
+
+    processed = DataProcessor().process_sensor_data(df, statistics=statistics)
+
+    assert processed['temperature'].tolist() == [75.5, 75.0, 75.0]
+    assert processed['runtime'].tolist() == [4000.0, 2000.0, 5000.0]
+    assert processed['vibration'].tolist() == [1.2, DEFAULT_FILL_VALUES['vibration'], 9.0]
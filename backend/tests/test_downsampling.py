@@ -0,0 +1,63 @@
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from downsampling import bucket_downsample, lttb_indices, lttb_downsample
+
+def test_bucket_downsample_aggregates():
+    """Test buckets report mean/min/max and respect the point budget"""
+    times = np.arange(1000, dtype=np.int64)
+    values = np.arange(1000, dtype=np.float64)
+
+    result = bucket_downsample(times, {"temperature": values}, 10)
+    assert len(result["time"]) <= 10
+    assert result["temperature_min"][0] == 0
+    assert result["temperature_max"][-1] == 999
+    assert np.all(result["temperature_min"] <= result["temperature"])
+    assert np.all(result["temperature"] <= result["temperature_max"])
+
+def test_bucket_downsample_small_series_unchanged():
+    """Test series shorter than the budget are returned as-is"""
+    times = np.array([1, 2, 3], dtype=np.int64)
+    result = bucket_downsample(times, {"pressure": np.array([1.0, 2.0, 3.0])}, 24)
+    assert list(result["pressure"]) == [1.0, 2.0, 3.0]
+
+def test_lttb_keeps_endpoints_and_spikes():
+    """Test LTTB keeps first/last points and a single spike"""
+    x = np.arange(500, dtype=np.float64)
+    y = np.zeros(500)
+    y[250] = 100.0
+
+    indices = lttb_indices(x, y, 20)
+    assert len(indices) == 20
+    assert indices[0] == 0 and indices[-1] == 499
+    assert 250 in indices
+    assert np.all(np.diff(indices) > 0)
+
+def test_lttb_downsample_aligns_series():
+    """Test all series are sampled at the same points"""
+    times = np.arange(100, dtype=np.int64)
+    series = {"temperature": np.sin(times / 5.0), "vibration": times * 2.0}
+
+    result = lttb_downsample(times, series, 10, by="temperature")
+    assert np.array_equal(result["vibration"], result["time"] * 2.0)
+
+def test_missing_values_are_skipped():
+    """Test NaN readings are left out of buckets and of the LTTB selection"""
+    times = np.arange(100, dtype=np.int64)
+    values = np.arange(100, dtype=np.float64)
+    values[[0, 5, 50]] = np.nan
+    values[10:20] = np.nan
+
+    result = bucket_downsample(times, {"temperature": values}, 10)
+    assert result["temperature"][0] == pytest.approx(np.mean([1, 2, 3, 4, 6, 7, 8, 9]))
+    assert result["temperature_min"][0] == 1 and result["temperature_max"][0] == 9
+    assert np.isnan(result["temperature"][1]) and np.isnan(result["temperature_max"][1])
+    assert np.isfinite(result["temperature"][2:]).all()
+
+    sampled = lttb_downsample(times, {"temperature": values}, 8, by="temperature")
+    assert np.isfinite(sampled["temperature"]).all()
+    assert sampled["time"][0] == 1
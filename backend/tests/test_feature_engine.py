@@ -0,0 +1,79 @@
+import pytest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from feature_engine import (
+    FEATURE_COLUMNS,
+    DEFAULT_FLEET_AGGREGATES,
+    build_feature_matrix,
+    build_feature_row,
+    AssetWindowState,
+    aggregate_asset_windows,
+)
+
+def test_feature_matrix_shape_and_dtype():
+    """Test the matrix has one 16-column float row per reading"""
+    df = pd.DataFrame({
+        'temperature': [75.0, 90.0, 60.0],
+        'vibration': [1.0, 2.2, 0.8],
+        'pressure': [95.0, 110.0, 90.0],
+        'runtime': [1000, 4500, 3000]
+    })
+
+    X = build_feature_matrix(df)
+    assert X.shape == (3, len(FEATURE_COLUMNS))
+    assert X.dtype == np.float64
+
+def test_feature_matrix_matches_row_layout():
+    """Test the vectorized matrix matches the hand-written per-row layout"""
+    df = pd.DataFrame({
+        'temperature': [75.0, 90.0],
+        'vibration': [1.0, 2.2],
+        'pressure': [95.0, 110.0],
+        'runtime': [1000, 4500]
+    })
+
+    X = build_feature_matrix(df)
+    expected = [
+        90.0, 90.0 ** 2, df['temperature'].std(), 90.0,
+        2.2, 2.2 ** 2, 2.2,
+        110.0, df['pressure'].std(), 4500,
+        abs(90.0 - 75) / 10, abs(2.2 - 1.0) / 0.3, abs(110.0 - 95) / 5,
+        90.0 * 2.2, 4500 / 6000, 1
+    ]
+    assert np.allclose(X[1], expected)
+
+def test_feature_row_uses_default_aggregates():
+    """Test single readings fall back to the training reference values"""
+    X = build_feature_row({'temperature': 80.0, 'vibration': 1.5, 'pressure': 100.0, 'runtime': 3000})
+    assert X.shape == (1, 16)
+    assert X[0, 2] == DEFAULT_FLEET_AGGREGATES['temperature_std']
+    assert X[0, 3] == DEFAULT_FLEET_AGGREGATES['temperature_max']
+    assert X[0, 15] == 0
+
+def test_asset_windows_merge_matches_single_pass():
+    """Test window states built per chunk merge to the single-pass result"""
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        'asset_name': rng.choice(['Pump', 'Motor', 'Fan'], 40),
+        'timestamp': pd.date_range('2024-12-01', periods=40, freq='h'),
+        'temperature': rng.normal(75, 10, 40),
+        'vibration': rng.normal(1.0, 0.3, 40),
+        'pressure': rng.normal(95, 5, 40),
+        'runtime': rng.integers(100, 6000, 40)
+    }).sample(frac=1, random_state=0)
+
+    expected = aggregate_asset_windows(df)
+    state = AssetWindowState.from_frame(df.iloc[:13])
+    state = state.merge(AssetWindowState.from_frame(df.iloc[13:29], row_offset=13))
+    state = state.merge(AssetWindowState.from_frame(df.iloc[29:], row_offset=29))
+    merged = state.finalize()
+
+    assert list(merged.index) == list(expected.index)
+    assert np.allclose(merged.drop(columns='timestamp').to_numpy(dtype=float),
+                       expected.drop(columns='timestamp').to_numpy(dtype=float))
+    assert merged['readings'].sum() == 40
@@ -0,0 +1,67 @@
+import pytest
+import csv
+import io
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from asset_store import ASSET_FIELDS, READING_EXPORT_COLUMNS
+from fleet_export import (
+    ASSET_EXPORT_TYPES, READING_EXPORT_TYPES, ExportFormatUnavailable, _ChunkSink, check_format, stream_export
+)
+
+BATCHES = [
+    [(1, "Pump", "healthy", 12.5, 70.0, 1.1, 95.0, 3000, "2024-10-15", 30, 3)],
+    [(2, "Fan", "critical", 91.0, 88.0, 2.4, 101.0, 5000, "2024-09-01", 2, None)],
+]
+
+def test_export_columns_match_store():
+    """Test export schemas follow the column order of the store's row batches"""
+    assert list(ASSET_EXPORT_TYPES) == list(ASSET_FIELDS)
+    assert list(READING_EXPORT_TYPES) == READING_EXPORT_COLUMNS
+
+def test_csv_export_streams_batches():
+    """Test CSV export yields one chunk per batch after the header"""
+    chunks = list(stream_export(iter(BATCHES), "assets", "csv"))
+    assert len(chunks) == 2
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == list(ASSET_FIELDS)
+    assert rows[1][:4] == ["1", "Pump", "healthy", "12.5"]
+    assert rows[2][-1] == ""
+
+def test_check_format():
+    """Test unknown formats are rejected and Arrow formats need pyarrow"""
+    check_format("csv")
+    with pytest.raises(ValueError):
+        check_format("xml")
+    try:
+        import pyarrow
+    except ImportError:
+        with pytest.raises(ExportFormatUnavailable):
+            check_format("parquet")
+
+def test_chunk_sink_tracks_position():
+    """Test the sink keeps counting bytes across drains"""
+    sink = _ChunkSink()
+    sink.write(b"abc")
+    assert sink.drain() == b"abc"
+    sink.write(memoryview(b"de"))
+    assert sink.tell() == 5
+    assert sink.drain() == b"de"
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_arrow_exports_round_trip(fmt):
+    """Test Arrow IPC and Parquet exports read back with typed columns"""
+    pa = pytest.importorskip("pyarrow")
+    data = b"".join(stream_export(iter(BATCHES), "assets", fmt))
+    if fmt == "arrow":
+        table = pa.ipc.open_stream(data).read_all()
+    else:
+        import pyarrow.parquet as pq
+        table = pq.read_table(pa.BufferReader(data))
+        assert pq.ParquetFile(pa.BufferReader(data)).num_row_groups == 2
+    assert table.column("name").to_pylist() == ["Pump", "Fan"]
+    assert table.column("readings").to_pylist() == [3, None]
+    assert table.schema.field("riskScore").type == pa.float64()
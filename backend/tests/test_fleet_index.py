@@ -0,0 +1,70 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fleet_index import FleetIndex, FleetIndexCache, sort_key, paginate, project
+
+ASSETS = [
+    {"id": 1, "name": "Pump", "riskLevel": "healthy", "riskScore": 20.0},
+    {"id": 2, "name": "Motor", "riskLevel": "critical", "riskScore": 91.0},
+    {"id": 3, "name": "Fan", "riskLevel": "warning", "riskScore": 55.0},
+    {"id": 4, "name": "Pump", "riskLevel": "critical", "riskScore": 75.0},
+]
+
+def test_lookup_by_id():
+    """Test id lookups use the index"""
+    index = FleetIndex(ASSETS)
+    assert index.get(3)['name'] == "Fan"
+    assert index.get(99) is None
+    assert len(index) == 4
+
+def test_query_by_risk_and_score():
+    """Test risk-level filters and riskScore ordering"""
+    index = FleetIndex(ASSETS)
+
+    assert [a['id'] for a in index.query(sort="riskScore")] == [2, 4, 3, 1]
+    assert [a['id'] for a in index.query(sort="riskScore", descending=False)] == [1, 3, 4, 2]
+    assert [a['id'] for a in index.query(["critical"])] == [2, 4]
+    assert [a['id'] for a in index.query(["warning", "critical"], sort="riskScore")] == [2, 4, 3]
+    assert [a['id'] for a in index.query(["healthy", "warning"])] == [1, 3]
+
+def test_query_by_name():
+    """Test the name index"""
+    index = FleetIndex(ASSETS)
+    assert [a['id'] for a in index.query(name="Pump", sort="riskScore")] == [4, 1]
+    assert [a['id'] for a in index.query(["healthy"], name="Pump")] == [1]
+
+def test_cache_rebuilds_on_version_change():
+    """Test the cache picks up fleet changes made elsewhere"""
+    state = {"version": 1, "assets": ASSETS[:2]}
+    cache = FleetIndexCache(lambda: state["assets"], lambda: state["version"])
+
+    assert len(cache.current()) == 2
+    state.update(version=2, assets=ASSETS)
+    assert len(cache.current()) == 4
+
+@pytest.mark.parametrize("sort,descending", [(None, True), ("riskScore", True), ("riskScore", False)])
+def test_paginate_walks_every_asset_once(sort, descending):
+    """Test following next_cursor returns the full ordering exactly once"""
+    index = FleetIndex(ASSETS)
+    expected = index.query(sort=sort, descending=descending)
+    key = sort_key(sort, descending)
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = paginate(expected, key, 3, cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert seen == expected
+
+def test_paginate_rejects_bad_cursor():
+    """Test malformed cursors raise ValueError"""
+    with pytest.raises(ValueError):
+        paginate(ASSETS, sort_key(None), 2, "not-a-cursor")
+
+def test_project_fields():
+    """Test field projection keeps id"""
+    assert project(ASSETS[:1], ["riskScore"]) == [{"id": 1, "riskScore": 20.0}]
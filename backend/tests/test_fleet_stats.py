@@ -0,0 +1,50 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fleet_stats import FleetStats
+from fleet_index import FleetIndex
+
+def make_asset(asset_id, level, score, temperature=70.0, vibration=1.0, runtime=1000):
+    return {
+        "id": asset_id, "name": f"Asset {asset_id}", "riskLevel": level, "riskScore": score,
+        "temperature": temperature, "vibration": vibration, "pressure": 100.0,
+        "runtime": runtime, "lastMaintenance": "2024-01-01", "predictedFailure": 30,
+    }
+
+ASSETS = [
+    make_asset(1, "healthy", 10.0),
+    make_asset(2, "warning", 50.0, temperature=90.0),
+    make_asset(3, "critical", 90.0, temperature=95.0, vibration=2.5, runtime=5000),
+    make_asset(4, "healthy", 20.0),
+]
+
+def test_summary_counts_and_mean():
+    """Test the summary matches the per-asset counts and mean"""
+    summary = FleetStats(ASSETS).summary()
+    assert summary == {
+        "total_assets": 4, "healthy": 2, "warning": 1, "critical": 1, "avg_risk_score": 42.5,
+    }
+
+def test_alerts_and_percentiles():
+    """Test threshold tallies, maxima and risk percentiles"""
+    stats = FleetStats(ASSETS).as_dict()
+    assert stats["alerts"] == {"temperature": 2, "vibration": 1, "runtime": 1}
+    assert stats["maxima"]["temperature"] == 95.0
+    assert stats["means"]["vibration"] == pytest.approx(1.38, abs=0.01)
+    assert stats["risk_score_percentiles"]["p50"] == 35.0
+
+def test_empty_fleet():
+    """Test an empty fleet gives zeroed statistics"""
+    stats = FleetStats([]).as_dict()
+    assert stats["total_assets"] == 0
+    assert stats["avg_risk_score"] == 0.0
+    assert stats["alerts"] == {"temperature": 0, "vibration": 0, "runtime": 0}
+
+def test_cached_per_fleet_index():
+    """Test the statistics are computed once per index version"""
+    index = FleetIndex(ASSETS, version=3)
+    assert index.stats is index.stats
+    assert FleetIndex(ASSETS, version=4).stats is not index.stats
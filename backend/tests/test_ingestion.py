@@ -0,0 +1,164 @@
+import pytest
+import numpy as np
+import pandas as pd
+import io
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_processor import DataProcessor
+from ml_model import MaintenancePredictor
+from ingestion import ingest_csv_stream, ingest_csv_delta, FleetSnapshot
+
+@pytest.fixture(scope="module")
+def trained_model():
+    model = MaintenancePredictor()
+    X, y = model.generate_synthetic_training_data(n_samples=200)
+    model.train(X, y)
+    return model
+
+def make_csv(n_rows: int, n_assets: int = None) -> io.BytesIO:
+    rng = np.random.default_rng(0)
+    n_assets = n_assets or n_rows
+    df = pd.DataFrame({
+        'asset_name': [f'Asset-{i % n_assets}' for i in range(n_rows)],
+        'timestamp': pd.date_range('2024-12-01', periods=n_rows, freq='h'),
+        'temperature': rng.normal(75, 10, n_rows),
+        'vibration': rng.normal(1.0, 0.3, n_rows),
+        'pressure': rng.normal(95, 5, n_rows),
+        'runtime': rng.integers(100, 6000, n_rows),
+        'last_maintenance': '2024-10-15'
+    })
+    return io.BytesIO(df.to_csv(index=False).encode('utf-8'))
+
+@pytest.mark.parametrize("per_asset", [True, False])
+def test_chunked_matches_single_pass(trained_model, per_asset):
+    """Test chunk size does not change scores, ids or summary"""
+    processor = DataProcessor()
+
+    single_assets, single_summary = ingest_csv_stream(
+        make_csv(50), processor, trained_model, chunk_rows=1000, per_asset=per_asset
+    )
+    chunked_assets, chunked_summary = ingest_csv_stream(
+        make_csv(50), processor, trained_model, chunk_rows=7, per_asset=per_asset
+    )
+
+    assert [a['id'] for a in chunked_assets] == list(range(1, 51))
+    assert [a['riskScore'] for a in chunked_assets] == [a['riskScore'] for a in single_assets]
+    assert chunked_summary == single_summary
+    assert chunked_summary['total_assets'] == 50
+
+@pytest.mark.parametrize("per_asset", [True, False])
+def test_missing_and_invalid_readings_ignore_chunking(trained_model, per_asset):
+    """Test filled empty and non-numeric cells score the same for any chunk size"""
+    df = pd.read_csv(make_csv(40, n_assets=4))
+    df['temperature'] = df['temperature'].astype(object)
+    df.loc[[3, 17, 18], 'temperature'] = None
+    df.loc[[9, 30], 'temperature'] = 'bad'
+    df.loc[[5, 22], 'pressure'] = None
+    data = df.to_csv(index=False).encode('utf-8')
+
+    runs = [
+        ingest_csv_stream(io.BytesIO(data), DataProcessor(), trained_model, chunk_rows=chunk_rows, per_asset=per_asset)
+        for chunk_rows in (5, 1000)
+    ]
+
+    (chunked, chunked_summary), (single, single_summary) = runs
+    assert [a['riskScore'] for a in chunked] == [a['riskScore'] for a in single]
+    assert [a['temperature'] for a in chunked] == [a['temperature'] for a in single]
+    assert chunked_summary == single_summary
+
+def test_per_asset_groups_readings(trained_model):
+    """Test repeated asset_name readings collapse into one asset each"""
+    assets, summary = ingest_csv_stream(make_csv(60, n_assets=4), DataProcessor(), trained_model, chunk_rows=11)
+
+    assert summary['total_assets'] == 4
+    assert [a['name'] for a in assets] == ['Asset-0', 'Asset-1', 'Asset-2', 'Asset-3']
+    assert all(a['readings'] == 15 for a in assets)
+
+def test_header_only_csv_is_empty(trained_model):
+    """Test a CSV without data rows is reported as empty"""
+    source = io.BytesIO(b"asset_name,timestamp,temperature,vibration,pressure,runtime,last_maintenance\n")
+
+    with pytest.raises(pd.errors.EmptyDataError):
+        ingest_csv_stream(source, DataProcessor(), trained_model)
+
+@pytest.mark.parametrize("per_asset", [True, False])
+def test_progress_stages_in_order(trained_model, per_asset):
+    """Test on_progress reports parse, process, feature and predict in order"""
+    calls = []
+    ingest_csv_stream(
+        make_csv(40, n_assets=4), DataProcessor(), trained_model, chunk_rows=9,
+        per_asset=per_asset, on_progress=lambda stage, fraction: calls.append((stage, fraction))
+    )
+
+    stages = list(dict.fromkeys(stage for stage, _ in calls))
+    assert stages == ['parse', 'process', 'feature', 'predict']
+    assert all(0.0 <= fraction <= 1.0 for _, fraction in calls)
+    assert calls[-1] == ('predict', 1.0)
+
+def test_fingerprints_ignore_chunking_and_row_order():
+    """Test asset fingerprints depend only on each asset's rows"""
+    df = pd.read_csv(make_csv(40, n_assets=4))
+    whole, chunked = FleetSnapshot(), FleetSnapshot()
+    whole.update(df)
+    for start in range(0, 40, 7):
+        chunked.update(df.iloc[::-1].iloc[start:start + 7])
+
+    assert whole.fingerprints() == chunked.fingerprints()
+    assert len(whole.fingerprints()) == 4
+
+def test_delta_rescores_only_changed_assets(trained_model):
+    """Test a delta ingest only processes and scores new or changed assets"""
+    processor = DataProcessor()
+    snapshot = FleetSnapshot()
+    full, _ = ingest_csv_stream(make_csv(60, n_assets=6), processor, trained_model, chunk_rows=13, snapshot=snapshot)
+    known = snapshot.fingerprints()
+
+    df = pd.read_csv(make_csv(60, n_assets=6))
+    df.loc[df['asset_name'] == 'Asset-2', 'temperature'] += 30
+    source = io.BytesIO(df.to_csv(index=False).encode('utf-8'))
+    processed = []
+
+    assets, fingerprints, counts = ingest_csv_delta(
+        source, processor, trained_model, known, snapshot.aggregates, chunk_rows=13,
+        on_chunk=processed.append
+    )
+
+    assert [a['name'] for a in assets] == ['Asset-2']
+    assert set(fingerprints) == {'Asset-2'} and fingerprints['Asset-2'] != known['Asset-2']
+    assert counts == {"new_assets": 0, "changed_assets": 1, "unchanged_assets": 5}
+    assert set(pd.concat(processed)['asset_name']) == {'Asset-2'}
+
+    unchanged, _, counts = ingest_csv_delta(
+        make_csv(60, n_assets=6), processor, trained_model, known, snapshot.aggregates
+    )
+    assert unchanged == [] and counts["unchanged_assets"] == 6
+
+@pytest.mark.parametrize("per_asset", [True, False])
+def test_scores_do_not_depend_on_the_rest_of_the_upload(trained_model, per_asset):
+    """Test an asset scores the same whether uploaded alone or with the whole fleet"""
+    processor = DataProcessor()
+    df = pd.read_csv(make_csv(60, n_assets=6))
+    whole, _ = ingest_csv_stream(make_csv(60, n_assets=6), processor, trained_model, per_asset=per_asset)
+
+    shard = df[df['asset_name'].isin(['Asset-1', 'Asset-4'])]
+    part, _ = ingest_csv_stream(
+        io.BytesIO(shard.to_csv(index=False).encode('utf-8')), processor, trained_model,
+        chunk_rows=3, per_asset=per_asset
+    )
+
+    if per_asset:
+        scores = {a['name']: a['riskScore'] for a in whole}
+        assert {a['name']: a['riskScore'] for a in part} == {name: scores[name] for name in ('Asset-1', 'Asset-4')}
+    else:
+        assert [a['riskScore'] for a in part] == [whole[i]['riskScore'] for i in shard.index]
+
+def test_snapshot_collects_upload_statistics(trained_model):
+    """Test the snapshot carries the upload's statistics and the model's aggregates"""
+    snapshot = FleetSnapshot()
+    ingest_csv_stream(make_csv(40, n_assets=4), DataProcessor(), trained_model, chunk_rows=9, snapshot=snapshot)
+
+    assert snapshot.statistics.count('temperature') == 40
+    assert snapshot.aggregates == trained_model.fleet_aggregates()
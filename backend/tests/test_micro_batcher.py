@@ -0,0 +1,98 @@
+import pytest
+import asyncio
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from micro_batcher import MicroBatcher
+
+def test_concurrent_requests_share_a_batch():
+    """Test concurrent submits are scored in one call and routed back in order"""
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        return X[:, 0] / 100
+
+    batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=20)
+
+    async def run():
+        rows = [np.array([[float(i), 0.0]]) for i in range(5)]
+        return await asyncio.gather(*(batcher.submit(row) for row in rows))
+
+    results = asyncio.run(run())
+    assert results == [0.0, 0.01, 0.02, 0.03, 0.04]
+    assert calls == [5]
+    assert batcher.metrics()["batches"] == 1
+    assert batcher.metrics()["avg_batch_size"] == 5
+
+def test_full_batch_flushes_without_waiting():
+    """Test reaching max_batch_size flushes immediately"""
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        return np.zeros(len(X))
+
+    batcher = MicroBatcher(predict, max_batch_size=3, max_wait_ms=10000)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(np.zeros(2)) for _ in range(6))), timeout=5
+        )
+
+    asyncio.run(run())
+    assert calls == [3, 3]
+
+def test_errors_reach_every_caller():
+    """Test a failing batch raises in each waiting request"""
+    def predict(X):
+        raise RuntimeError("model failed")
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait_ms=1)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(np.zeros(2)) for _ in range(2)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+def test_rows_are_scored_by_their_own_model():
+    """Test rows submitted with different predict functions never share a batch"""
+    calls = []
+
+    def old(X):
+        calls.append(("old", len(X)))
+        return np.zeros(len(X))
+
+    def new(X):
+        calls.append(("new", len(X)))
+        return np.ones(len(X))
+
+    batcher = MicroBatcher(old, max_batch_size=8, max_wait_ms=20)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.submit(np.zeros(2)), batcher.submit(np.zeros(2), new), batcher.submit(np.zeros(2), old)
+        )
+
+    assert asyncio.run(run()) == [0.0, 1.0, 0.0]
+    assert sorted(calls) == [("new", 1), ("old", 2)]
+
+def test_shutdown_waits_for_in_flight_batches():
+    """Test shutdown scores queued rows and drains running batches"""
+    def predict(X):
+        return np.full(len(X), 0.5)
+
+    batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=10000)
+
+    async def run():
+        pending = asyncio.ensure_future(batcher.submit(np.zeros(2)))
+        await asyncio.sleep(0)
+        await batcher.shutdown()
+        assert not batcher._tasks
+        return await pending
+
+    assert asyncio.run(run()) == 0.5
@@ -1,7 +1,9 @@
 import pytest
 import numpy as np
+import pandas as pd
 import sys
 import os
+import tempfile
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
@@ -42,4 +44,57 @@ def test_synthetic_data_generation():
     
     assert X.shape == (500, 16)
     assert y.shape == (500,)
-    assert set(np.unique(y)) == {0, 1}
\ No newline at end of file
+    assert set(np.unique(y)) == {0, 1}
+
+def test_extract_features():
+    """Test window feature extraction for one asset"""
+    model = MaintenancePredictor()
+    data = pd.DataFrame({
+        'timestamp': pd.date_range('2024-12-01', periods=3, freq='h'),
+        'temperature': [78.5, 79.2, 80.1],
+        'vibration': [1.2, 1.3, 1.4],
+        'pressure': [95.3, 96.1, 97.2],
+        'runtime': [3200, 3201, 3202]
+    })
+
+    features = model.extract_features(data)
+    assert features.shape == (16,)
+    assert features[0] == pytest.approx(data['temperature'].mean())
+    assert features[1] == pytest.approx(data['temperature'].std())
+    assert features[9] == 3202
+    assert features[10] == pytest.approx(data['temperature'].diff().mean())
+
+@pytest.mark.parametrize("backend", ["gbm", "hist_gbm"])
+def test_backends_report_progress(backend):
+    """Test every backend trains, reports per-iteration progress and round-trips through save/load"""
+    predictor = MaintenancePredictor(autoload=False, backend=backend)
+    X, y = predictor.generate_synthetic_training_data(n_samples=300)
+    steps = []
+    predictor.train(X, y, progress=lambda done, total: steps.append((done, total)))
+
+    assert steps[-1] == (100, 100)
+    assert predictor.n_iterations == 100
+
+    path = os.path.join(tempfile.mkdtemp(), "model.pkl")
+    predictor.save_model(path)
+    loaded = MaintenancePredictor(path)
+    assert loaded.backend == backend
+    assert np.allclose(loaded.predict(X[:20]), predictor.predict(X[:20]))
+
+def test_unknown_backend():
+    """Test unknown backends are rejected"""
+    with pytest.raises(ValueError):
+        MaintenancePredictor(autoload=False, backend="xgboost")
+
+def test_statistics_saved_with_model():
+    """Test the model's reference statistics are saved and loaded with it"""
+    predictor = MaintenancePredictor(autoload=False)
+    X, y = predictor.generate_synthetic_training_data(n_samples=100)
+    predictor.train(X, y)
+    predictor.statistics.update(pd.DataFrame({'temperature': [70.0, 95.0], 'vibration': [1.0, 3.0]}))
+
+    path = os.path.join(tempfile.mkdtemp(), "model.pkl")
+    predictor.save_model(path)
+    loaded = MaintenancePredictor(path)
+    assert loaded.fleet_aggregates() == predictor.fleet_aggregates()
+    assert loaded.fleet_aggregates()['vibration_max'] == 3.0
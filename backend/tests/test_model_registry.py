@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ml_model import MaintenancePredictor
+from model_registry import ModelRegistry
+
+@pytest.fixture
+def model_dir(tmp_path):
+    model = MaintenancePredictor(autoload=False)
+    X, y = model.generate_synthetic_training_data(n_samples=200)
+    model.train(X, y)
+    model.save_model(str(tmp_path / "maintenance_model.pkl"))
+    return str(tmp_path)
+
+def test_registry_loads_lazily(model_dir):
+    """Test nothing is loaded until the model is first used"""
+    registry = ModelRegistry(model_dir)
+    assert not registry.is_loaded
+    assert registry.status()["model_load_time"] is None
+
+    assert registry.get().is_trained
+    assert registry.is_loaded
+    assert registry.status()["model_load_time"] >= 0
+    assert registry.get() is registry.get()
+
+def test_registry_mmap_load(model_dir):
+    """Test memory-mapped loading gives the same predictions"""
+    X = np.random.randn(10, 16)
+    plain = ModelRegistry(model_dir, mmap=False).get()
+    mapped = ModelRegistry(model_dir, mmap=True).get()
+    assert np.allclose(plain.predict(X), mapped.predict(X))
+
+def test_registry_missing_model(tmp_path):
+    """Test a missing model file yields an untrained predictor"""
+    registry = ModelRegistry(str(tmp_path))
+    assert registry.model_path == os.path.join(str(tmp_path), "maintenance_model.pkl")
+    assert not registry.get().is_trained
+
+def test_registry_swap(model_dir):
+    """Test swapping replaces the serving model by reference"""
+    registry = ModelRegistry(model_dir)
+    old = registry.get()
+    new = MaintenancePredictor(autoload=False)
+    registry.swap(new)
+    assert registry.predictor is new and registry.get() is not old
@@ -0,0 +1,159 @@
+import pytest
+import numpy as np
+import errno
+import fcntl
+import json
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app_state import MemoryAppState
+from ml_model import MaintenancePredictor
+from model_registry import ModelRegistry
+import model_versions
+from model_versions import ModelVersionError, ModelVersionStore
+
+def train(seed: int) -> MaintenancePredictor:
+    model = MaintenancePredictor(autoload=False)
+    X, y = model.generate_synthetic_training_data(n_samples=200)
+    model.train(X[::-1] if seed else X, y[::-1] if seed else y)
+    model.model.set_params(random_state=seed)
+    return model
+
+@pytest.fixture(scope="module")
+def models():
+    return train(0), train(1)
+
+def test_publish_writes_checksummed_versions(tmp_path, models):
+    """Test each publish adds an immutable version with metadata and a checksum"""
+    versions = ModelVersionStore(str(tmp_path))
+    first = versions.publish(models[0], {"metrics": {"n_samples": 200}})
+    second = versions.publish(models[1])
+
+    assert [first["version"], second["version"]] == [1, 2]
+    assert versions.versions() == [1, 2]
+    assert versions.active() is None
+    assert versions.verify(1)["metrics"] == {"n_samples": 200}
+    assert len(first["sha256"]) == 64 and first["size_bytes"] > 0
+    assert MaintenancePredictor(versions.artifact_path(1)).metadata["version"] == 1
+    assert not [name for name in os.listdir(tmp_path / "versions") if name.startswith(".staging")]
+
+def test_activate_and_rollback(tmp_path, models):
+    """Test the ACTIVE pointer moves forward on activate and back on rollback"""
+    versions = ModelVersionStore(str(tmp_path))
+    versions.publish(models[0])
+    versions.publish(models[1])
+
+    versions.activate(1)
+    versions.activate(2)
+    assert versions.active() == 2
+    assert [v["active"] for v in versions.list()] == [True, False]
+
+    assert versions.rollback()["version"] == 1
+    assert versions.active() == 1
+    with pytest.raises(ModelVersionError):
+        versions.rollback()
+
+def test_corrupted_or_incompatible_versions_are_refused(tmp_path, models):
+    """Test activation checks the checksum and the feature schema"""
+    versions = ModelVersionStore(str(tmp_path))
+    versions.publish(models[0])
+    versions.publish(models[1])
+    with open(versions.artifact_path(1), "ab") as f:
+        f.write(b"corrupt")
+    with pytest.raises(ModelVersionError):
+        versions.activate(1)
+
+    metadata_path = os.path.join(os.path.dirname(versions.artifact_path(2)), "metadata.json")
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+    metadata["feature_columns"] = metadata["feature_columns"][:-1]
+    with open(metadata_path, "w") as f:
+        json.dump(metadata, f)
+    with pytest.raises(ModelVersionError):
+        versions.activate(2)
+    with pytest.raises(ModelVersionError):
+        versions.activate(7)
+    assert versions.active() is None
+
+def test_prune_keeps_active_and_rollback_targets(tmp_path, models):
+    """Test old versions are deleted unless serving or reachable by rollback"""
+    versions = ModelVersionStore(str(tmp_path), keep=2)
+    for _ in range(4):
+        versions.publish(models[0])
+    versions.activate(1)
+    versions.activate(4)
+
+    assert versions.versions() == [1, 3, 4]
+
+def test_publish_fails_fast_on_non_collision_errors(tmp_path, models, monkeypatch):
+    """Test only a taken version number is retried and staging is always cleaned up"""
+    versions = ModelVersionStore(str(tmp_path))
+    attempts = []
+
+    def failing_rename(errno_code):
+        def rename(src, dst):
+            attempts.append(dst)
+            raise OSError(errno_code, os.strerror(errno_code))
+        return rename
+
+    monkeypatch.setattr(model_versions.os, "rename", failing_rename(errno.EACCES))
+    with pytest.raises(ModelVersionError, match="Could not publish"):
+        versions.publish(models[0])
+    assert len(attempts) == 1
+
+    monkeypatch.setattr(model_versions.os, "rename", failing_rename(errno.EEXIST))
+    with pytest.raises(ModelVersionError, match="attempts"):
+        versions.publish(models[0])
+    assert len(attempts) == 1 + model_versions.PUBLISH_ATTEMPTS
+    assert not [name for name in os.listdir(tmp_path / "versions") if name.startswith(".staging")]
+
+def test_pointer_updates_wait_for_the_lock(tmp_path, models):
+    """Test activate blocks while another holder has the versions lock"""
+    versions = ModelVersionStore(str(tmp_path))
+    versions.publish(models[0])
+    done = threading.Event()
+    worker = threading.Thread(target=lambda: (versions.activate(1), done.set()))
+
+    with open(tmp_path / "versions" / model_versions.LOCK_FILENAME, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        worker.start()
+        assert not done.wait(0.2)
+        assert versions.active() is None
+        fcntl.flock(lock, fcntl.LOCK_UN)
+    worker.join(5)
+
+    assert done.is_set() and versions.active() == 1
+
+def test_registry_hot_swaps_versions(tmp_path, models):
+    """Test activate serves the new version by reference and old holders keep theirs"""
+    registry = ModelRegistry(str(tmp_path), state=MemoryAppState())
+    for model in models:
+        registry.versions.publish(model)
+    X = np.random.default_rng(0).normal(size=(20, 16))
+
+    registry.activate(1)
+    old = registry.predictor
+    registry.activate(2)
+
+    assert registry.predictor is not old
+    assert np.allclose(registry.get().predict(X), models[1].predict(X))
+    assert np.allclose(old.predict(X), models[0].predict(X))
+    assert registry.status()["active_model_version"] == 2
+    assert registry.state.model_version() == 2
+
+    registry.rollback()
+    assert np.allclose(registry.get().predict(X), models[0].predict(X))
+    assert registry.status()["model_metadata"]["version"] == 1
+
+def test_registry_adopts_legacy_model(tmp_path, models):
+    """Test an unversioned maintenance_model.pkl becomes version 0"""
+    models[0].save_model(str(tmp_path / "maintenance_model.pkl"))
+    registry = ModelRegistry(str(tmp_path))
+
+    assert registry.get().is_trained
+    assert registry.versions.active() == 0
+    assert registry.model_path == registry.versions.artifact_path(0)
+    assert registry.versions.metadata(0)["source"] == "legacy"
@@ -0,0 +1,76 @@
+import pytest
+import sys
+import os
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fleet_stats import FleetStats
+import pdf_generator
+from pdf_generator import (
+    DETAIL_CHUNK_ROWS, ReportCache, generate_pdf_report, get_report_generator, write_pdf_report
+)
+
+def make_assets(n):
+    assets = []
+    for i in range(n):
+        score = 100.0 * i / n
+        level = "critical" if score > 70 else "warning" if score > 40 else "healthy"
+        assets.append({
+            "id": i, "name": f"Asset {i}", "riskLevel": level, "riskScore": score,
+            "temperature": 80.0, "vibration": 1.5, "pressure": 100.0, "runtime": 4000,
+            "lastMaintenance": "2024-01-01", "predictedFailure": 30,
+        })
+    return assets
+
+def test_generate_report_bytes():
+    """Test a report renders to a PDF document"""
+    assets = make_assets(20)
+    pdf = generate_pdf_report(assets, FleetStats(assets).as_dict())
+    assert pdf.startswith(b"%PDF")
+
+def test_detail_table_batches_row_styles():
+    """Test risk backgrounds are one command per run of rows, not one per row"""
+    assets = sorted(make_assets(100), key=lambda a: a['riskScore'], reverse=True)
+    table = get_report_generator()._detail_table(assets)
+    backgrounds = [cmd for cmd in table._bkgrndcmds if cmd[0] == 'BACKGROUND' and cmd[1] != (0, 0)]
+    assert len(backgrounds) == 2
+    assert table.repeatRows == 1
+
+def test_write_report_in_chunks():
+    """Test large fleets are written to disk with the detail table split into chunks"""
+    assets = make_assets(DETAIL_CHUNK_ROWS + 10)
+    path = os.path.join(tempfile.mkdtemp(), "report.pdf")
+    assert write_pdf_report(path, assets, FleetStats(assets).as_dict()) == path
+    with open(path, 'rb') as f:
+        assert f.read(4) == b"%PDF"
+    assert os.listdir(os.path.dirname(path)) == ["report.pdf"]
+
+def test_report_cache_prunes_older_versions():
+    """Test the cache finds reports by fleet version and prunes older ones"""
+    cache = ReportCache(tempfile.mkdtemp())
+    for version in (1, 2, 3):
+        open(cache.path(version), 'wb').close()
+    assert cache.get(4) is None
+
+    cache.prune(2)
+    assert cache.get(1) is None
+    assert cache.get(2) == cache.path(2)
+    assert cache.get(3) == cache.path(3)
+
+def test_report_shows_given_generated_time(monkeypatch):
+    """Test the "Generated:" line shows the time passed in rather than now"""
+    texts = []
+    paragraph = pdf_generator.Paragraph
+
+    def recording_paragraph(text, *args, **kwargs):
+        texts.append(text)
+        return paragraph(text, *args, **kwargs)
+
+    monkeypatch.setattr(pdf_generator, "Paragraph", recording_paragraph)
+    assets = make_assets(3)
+    path = os.path.join(tempfile.mkdtemp(), "report.pdf")
+    write_pdf_report(path, assets, FleetStats(assets).as_dict(), datetime(2024, 12, 1, 8, 30, 45))
+
+    assert "Generated: 2024-12-01 08:30:45" in texts
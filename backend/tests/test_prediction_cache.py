@@ -0,0 +1,83 @@
+import pytest
+import numpy as np
+import pickle
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ml_model import MaintenancePredictor
+from prediction_cache import PredictionCache, CachedPredictor, row_keys
+
+class CountingModel:
+    def __init__(self):
+        self.rows = 0
+
+    def __call__(self, X):
+        self.rows += len(X)
+        return X[:, 0] / 100
+
+def test_repeated_rows_are_served_from_cache():
+    """Test only unseen rows reach the model and results keep row order"""
+    cache = PredictionCache(max_entries=100, ttl_seconds=60)
+    model = CountingModel()
+    X = np.array([[10.0, 1.0], [20.0, 2.0], [30.0, 3.0]])
+
+    assert np.allclose(cache.predict(X, model, version=0), [0.1, 0.2, 0.3])
+    assert np.allclose(cache.predict(X[::-1], model, version=0), [0.3, 0.2, 0.1])
+    assert np.allclose(cache.predict(np.array([[40.0, 4.0], [10.0, 1.0]]), model, version=0), [0.4, 0.1])
+
+    assert model.rows == 4
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (4, 4, 4)
+
+    assert np.allclose(cache.predict(X, model, version=0), [0.1, 0.2, 0.3])
+    assert cache.stats()["batch_hits"] == 1
+    assert model.rows == 4
+
+def test_quantized_keys():
+    """Test float noise below the quantization step maps to the same key"""
+    X = np.array([[1.0, -0.0], [1.0 + 1e-9, 0.0], [1.001, 0.0]])
+    keys = row_keys(X, decimals=6)
+    assert keys[0] == keys[1] != keys[2]
+
+def test_lru_eviction_and_ttl():
+    """Test least recently used entries are evicted and expired entries recomputed"""
+    cache = PredictionCache(max_entries=2, ttl_seconds=60)
+    model = CountingModel()
+    cache.predict(np.array([[1.0], [2.0]]), model, version=0)
+    cache.predict(np.array([[1.0]]), model, version=0)
+    cache.predict(np.array([[3.0]]), model, version=0)
+    assert cache.stats()["evictions"] == 1
+
+    cache.predict(np.array([[2.0], [1.0]]), model, version=0)
+    assert model.rows == 4
+
+    expired = PredictionCache(max_entries=10, ttl_seconds=-1)
+    expired.predict(np.array([[1.0]]), model, version=0)
+    expired.predict(np.array([[1.0]]), model, version=0)
+    assert expired.stats()["expirations"] == 1
+
+def test_invalidate_on_new_model_version():
+    """Test a new version drops entries and ignores late writes from the old model"""
+    cache = PredictionCache(max_entries=10, ttl_seconds=60)
+    model = CountingModel()
+    cache.predict(np.array([[1.0]]), model, version=0)
+
+    cache.invalidate(1)
+    assert cache.stats()["entries"] == 0
+    cache.predict(np.array([[2.0]]), model, version=0)
+    assert cache.stats()["entries"] == 0
+    cache.predict(np.array([[2.0]]), model, version=1)
+    assert cache.stats()["entries"] == 1
+
+def test_cached_predictor_pickles_to_plain_model():
+    """Test the wrapper delegates attributes and pickles without its cache"""
+    predictor = MaintenancePredictor(autoload=False)
+    X, y = predictor.generate_synthetic_training_data(n_samples=200)
+    predictor.train(X, y)
+    cached = CachedPredictor(predictor, PredictionCache(max_entries=10), version=0)
+
+    assert cached.is_trained and cached.backend == predictor.backend
+    assert np.allclose(cached.predict(X[:5]), predictor.predict(X[:5]))
+    assert isinstance(pickle.loads(pickle.dumps(cached)), MaintenancePredictor)
@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+import pandas as pd
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from running_stats import RunningStatistics
+from feature_engine import DEFAULT_FLEET_AGGREGATES, compute_fleet_aggregates
+
+def make_frame(n_rows: int = 100) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        'temperature': rng.normal(75, 10, n_rows),
+        'vibration': rng.normal(1.0, 0.3, n_rows),
+        'pressure': rng.normal(95, 5, n_rows),
+    })
+
+def test_chunked_updates_match_whole_frame():
+    """Test any chunking gives the aggregates of a single pass over the data"""
+    df = make_frame()
+    whole = RunningStatistics()
+    whole.update(df)
+    for size in (1, 7, 33):
+        chunked = RunningStatistics()
+        for start in range(0, len(df), size):
+            chunked.update(df.iloc[start:start + size])
+        assert chunked.aggregates() == pytest.approx(whole.aggregates())
+
+    assert whole.aggregates() == pytest.approx(compute_fleet_aggregates(df))
+
+def test_merge_shards():
+    """Test merging per-shard statistics equals updating with every shard"""
+    df = make_frame()
+    shards = [RunningStatistics() for _ in range(3)]
+    for i, shard in enumerate(shards):
+        shard.update(df.iloc[i::3])
+    merged = RunningStatistics()
+    for shard in shards:
+        merged.merge(shard)
+
+    whole = RunningStatistics()
+    whole.update(df)
+    assert merged.count('temperature') == 100
+    assert merged.mean('pressure') == pytest.approx(whole.mean('pressure'))
+    assert merged.std('vibration') == pytest.approx(whole.std('vibration'))
+    assert merged.max('temperature') == whole.max('temperature')
+
+def test_missing_values_and_defaults():
+    """Test NaNs are skipped and unseen columns fall back to the defaults"""
+    stats = RunningStatistics()
+    stats.update(pd.DataFrame({'temperature': [70.0, np.nan, 90.0]}))
+
+    assert stats.count('temperature') == 2
+    aggregates = stats.aggregates()
+    assert aggregates['temperature_max'] == 90.0
+    assert aggregates['vibration_max'] == DEFAULT_FLEET_AGGREGATES['vibration_max']
+    assert aggregates['pressure_std'] == DEFAULT_FLEET_AGGREGATES['pressure_std']
+    assert RunningStatistics().aggregates() == DEFAULT_FLEET_AGGREGATES
+
+def test_round_trip_through_json():
+    """Test the state survives JSON serialization unchanged"""
+    stats = RunningStatistics()
+    stats.update(make_frame())
+    restored = RunningStatistics.from_dict(json.loads(json.dumps(stats.to_dict())))
+
+    assert restored.aggregates() == stats.aggregates()
+    assert restored.stats == stats.stats
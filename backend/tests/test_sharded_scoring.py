@@ -0,0 +1,85 @@
+import pytest
+import numpy as np
+import pickle
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ml_model import MaintenancePredictor
+from sharded_scoring import ShardedPredictor, ShardedScorer
+
+@pytest.fixture(scope="module")
+def trained_model():
+    model = MaintenancePredictor(autoload=False)
+    X, y = model.generate_synthetic_training_data(n_samples=200)
+    model.train(X, y)
+    return model
+
+@pytest.fixture
+def scorer(trained_model, tmp_path, monkeypatch):
+    monkeypatch.setenv("SCORING_SHARD_DIR", str(tmp_path))
+    scorer = ShardedScorer(workers=2, min_rows=1000)
+    scorer.load(trained_model)
+    yield scorer
+    scorer.shutdown()
+
+def test_sharded_scores_match_in_process(trained_model, scorer, tmp_path):
+    """Test shards scored in worker processes come back complete and in order"""
+    X = np.random.default_rng(0).normal(size=(25_000, 16))
+
+    scores = scorer.predict(X)
+
+    assert np.array_equal(scores, trained_model.predict(X))
+    assert scorer.status()["sharded_calls"] == 1
+    assert os.listdir(tmp_path) == []
+
+def test_predictor_shards_only_large_batches(trained_model, scorer):
+    """Test small batches and other models stay in-process"""
+    predictor = ShardedPredictor(trained_model, scorer)
+    predictor.predict(np.zeros((10, 16)))
+    assert scorer.status()["sharded_calls"] == 0
+
+    predictor.predict(np.zeros((2000, 16)))
+    assert scorer.status()["sharded_calls"] == 1
+
+    other = MaintenancePredictor(autoload=False)
+    other.model, other.scaler, other.is_trained = trained_model.model, trained_model.scaler, True
+    ShardedPredictor(other, scorer).predict(np.zeros((2000, 16)))
+    assert scorer.status()["sharded_calls"] == 1
+
+def test_sharded_predictor_pickles_to_plain_model(trained_model, scorer):
+    """Test pickling drops the scorer (no process pools inside pool workers)"""
+    restored = pickle.loads(pickle.dumps(ShardedPredictor(trained_model, scorer)))
+    assert isinstance(restored, MaintenancePredictor)
+    assert ShardedScorer(workers=1).enabled is False
+
+def test_batch_in_flight_survives_model_swap(trained_model, scorer):
+    """Test a batch that took its pool before load() finishes on the old model"""
+    X = np.random.default_rng(1).normal(size=(2000, 16))
+    other = MaintenancePredictor(autoload=False)
+    other.train(*other.generate_synthetic_training_data(n_samples=100))
+
+    executor = scorer._checkout(trained_model)
+    scorer.load(other)
+    try:
+        scores = scorer._predict_sharded(executor, X)
+    finally:
+        scorer._checkin(executor)
+
+    assert np.array_equal(scores, trained_model.predict(X))
+    assert executor._shutdown_thread
+    # Callers still holding the old model score in-process with it
+    assert np.array_equal(scorer.predict(X, trained_model), trained_model.predict(X))
+    assert np.array_equal(scorer.predict(X, other), other.predict(X))
+
+def test_large_batches_skip_small_shm(monkeypatch, tmp_path):
+    """Test shared files go to the temp dir when /dev/shm lacks room"""
+    import sharded_scoring
+    monkeypatch.delenv("SCORING_SHARD_DIR", raising=False)
+    monkeypatch.setattr(sharded_scoring.tempfile, "gettempdir", lambda: str(tmp_path))
+    monkeypatch.setattr(sharded_scoring, "SHM_HEADROOM", 1)
+
+    assert sharded_scoring._shard_dir(1 << 62) == str(tmp_path)
+    if os.path.isdir("/dev/shm"):
+        assert sharded_scoring._shard_dir(1) == "/dev/shm"
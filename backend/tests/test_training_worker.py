@@ -0,0 +1,61 @@
+import pytest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ml_model import MaintenancePredictor
+from model_versions import ModelVersionStore
+from training_worker import TrainingSupervisor
+
+def test_trains_in_child_process():
+    """Test training reports per-estimator progress and hands over the published version"""
+    model_dir = tempfile.mkdtemp()
+    loaded = []
+    trainer = TrainingSupervisor(on_model=loaded.append)
+
+    trainer.start(model_dir, n_samples=200)
+    with pytest.raises(RuntimeError):
+        trainer.start(model_dir, n_samples=200)
+    trainer.wait(timeout=120)
+
+    status = trainer.status()
+    assert status["is_training"] is False
+    assert status["progress"] == 100
+    assert status["estimators_done"] == status["n_estimators"] == 100
+    assert status["metrics"]["n_samples"] == 200
+    assert loaded == [1] and status["metrics"]["model_version"] == 1
+    versions = ModelVersionStore(model_dir)
+    assert versions.verify(1)["metrics"]["n_samples"] == 200
+    assert MaintenancePredictor(versions.artifact_path(1)).is_trained
+    assert os.listdir(os.path.join(model_dir, "versions")) == ["v0001"]
+
+def test_failed_training_is_reported():
+    """Test errors in the child process end up in the status message"""
+    trainer = TrainingSupervisor(on_model=lambda version: None)
+    not_a_dir = tempfile.NamedTemporaryFile(delete=False).name
+
+    trainer.start(os.path.join(not_a_dir, "models"), n_samples=100)
+    trainer.wait(timeout=120)
+
+    status = trainer.status()
+    assert status["is_training"] is False
+    assert status["message"].startswith("Training failed")
+
+def test_shared_state_blocks_second_worker(tmp_path):
+    """Test a supervisor in another worker sees the running job and cannot start one"""
+    from app_state import SqliteAppState
+    db_path = str(tmp_path / "assets.db")
+    model_dir = str(tmp_path / "models")
+    first = TrainingSupervisor(on_model=lambda version: None, state=SqliteAppState(db_path))
+    second = TrainingSupervisor(on_model=lambda version: None, state=SqliteAppState(db_path))
+
+    first.start(model_dir, n_samples=200)
+    assert second.is_training
+    with pytest.raises(RuntimeError):
+        second.start(model_dir, n_samples=200)
+    first.wait(timeout=120)
+
+    assert second.status()["progress"] == 100
+    assert not second.is_training
@@ -0,0 +1,80 @@
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ml_model import MaintenancePredictor
+from tree_inference import FlatTreeEnsemble
+
+@pytest.fixture(scope="module", params=["gbm", "hist_gbm"])
+def predictor(request):
+    predictor = MaintenancePredictor(autoload=False, backend=request.param, inference="sklearn")
+    X, y = predictor.generate_synthetic_training_data(n_samples=500)
+    if request.param == "hist_gbm":
+        X[::9, 2] = np.nan
+    predictor.train(X, y)
+    return predictor
+
+def test_flat_matches_predict_proba(predictor):
+    """Test the flattened ensemble scores exactly like sklearn"""
+    X, _ = predictor.generate_synthetic_training_data(n_samples=1000)
+    if predictor.backend == "hist_gbm":
+        X[::7, 2] = np.nan
+    X_scaled = predictor.scaler.transform(X)
+
+    expected = predictor.model.predict_proba(X_scaled)[:, 1]
+    flat = FlatTreeEnsemble.from_model(predictor.model)
+    assert flat.n_trees == 100
+    assert np.allclose(flat.predict_proba(X_scaled), expected, rtol=0, atol=1e-12)
+    assert np.allclose(flat.predict_proba(X_scaled[:1]), expected[:1], rtol=0, atol=1e-12)
+
+def test_inference_modes_agree(predictor):
+    """Test auto and flat inference give the same scores as sklearn inference"""
+    X, _ = predictor.generate_synthetic_training_data(n_samples=300)
+    expected = predictor.predict(X)
+    for mode in ("auto", "flat"):
+        predictor.inference = mode
+        assert np.allclose(predictor.predict(X), expected, rtol=0, atol=1e-12)
+        assert np.allclose(predictor.predict(X[:3]), expected[:3], rtol=0, atol=1e-12)
+    predictor.inference = "sklearn"
+
+def test_flat_validates_input_like_sklearn(predictor):
+    """Test small batches are rejected by flat inference whenever sklearn rejects them"""
+    X, _ = predictor.generate_synthetic_training_data(n_samples=5)
+    X[0, 2] = np.nan
+    for mode in ("sklearn", "auto"):
+        predictor.inference = mode
+        if predictor.backend == "gbm":
+            with pytest.raises(ValueError):
+                predictor.predict(X)
+        else:
+            assert np.isfinite(predictor.predict(X)).all()
+    predictor.inference = "sklearn"
+
+    flat = predictor.flat_model()
+    with pytest.raises(ValueError):
+        flat.predict_proba(np.zeros((2, 15)))
+    with pytest.raises(ValueError):
+        flat.predict_proba(np.full((2, 16), np.inf))
+
+@pytest.mark.parametrize("breakage", ["internals", "wrong_scores"])
+def test_unflattenable_models_fall_back_to_sklearn(predictor, monkeypatch, breakage):
+    """Test a model that cannot be flattened, or flattens wrongly, is scored with predict_proba"""
+    import copy
+    X, _ = predictor.generate_synthetic_training_data(n_samples=50)
+    expected = predictor.model.predict_proba(predictor.scaler.transform(X))[:, 1]
+
+    if breakage == "internals":
+        def missing(cls, model):
+            raise AttributeError("'Model' object has no attribute '_predictors'")
+        monkeypatch.setattr(FlatTreeEnsemble, "from_gradient_boosting", classmethod(missing))
+        monkeypatch.setattr(FlatTreeEnsemble, "from_hist_gradient_boosting", classmethod(missing))
+    else:
+        monkeypatch.setattr(FlatTreeEnsemble, "decision_function", lambda self, X, chunk_rows=256: np.zeros(len(X)))
+    broken = copy.copy(predictor)
+    broken.inference, broken._flat = "flat", None
+
+    assert broken.flat_model() is None
+    assert np.array_equal(broken.predict(X), expected)
@@ -0,0 +1,54 @@
+import pytest
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from upload_jobs import UploadJobs, JobProgress, STALE_ERROR
+
+@pytest.fixture
+def jobs():
+    return UploadJobs(os.path.join(tempfile.mkdtemp(), "jobs.db"))
+
+def test_job_lifecycle(jobs):
+    """Test jobs start queued and keep their summary once completed"""
+    job_id = jobs.create("fleet.csv", upload_id=3)
+    assert jobs.get(job_id)["status"] == "queued"
+
+    jobs.update(job_id, status="completed", progress=100, summary={"total_assets": 2})
+    job = jobs.get(job_id)
+    assert job["job_id"] == job_id
+    assert job["upload_id"] == 3
+    assert job["summary"] == {"total_assets": 2}
+    assert jobs.get("missing") is None
+
+def test_progress_maps_stages_to_percent(jobs):
+    """Test stage fractions map onto the overall percentage and are throttled"""
+    job_id = jobs.create("fleet.csv", upload_id=1)
+    progress = JobProgress(jobs.db_path, job_id, min_interval=60)
+
+    progress("parse", 0.5)
+    assert jobs.get(job_id)["progress"] == 30
+    progress("parse", 0.9)
+    assert jobs.get(job_id)["progress"] == 30
+    progress("predict", 0.0)
+    job = jobs.get(job_id)
+    assert (job["status"], job["stage"], job["progress"]) == ("running", "predict", 75)
+
+def test_stale_jobs_fail_and_finished_jobs_are_pruned(jobs):
+    """Test abandoned jobs are marked failed and old finished jobs are deleted"""
+    running = jobs.create("fleet.csv", upload_id=1)
+    jobs.update(running, status="running", stage="parse")
+    assert jobs.get(running)["status"] == "running"
+
+    stale = UploadJobs(jobs.db_path, stale_seconds=0, retention_seconds=0)
+    job = stale.get(running)
+    assert job["status"] == "failed" and job["error"] == STALE_ERROR
+
+    done = jobs.create("other.csv", upload_id=2)
+    jobs.update(done, status="completed", progress=100)
+    queued = jobs.create("queued.csv", upload_id=3)
+    assert jobs.prune() == 0
+    assert stale.prune() == 2
+    assert stale.get(done) is None and jobs.get(queued)["status"] == "queued"
@@ -3,14 +3,18 @@
 Train a real predictive maintenance model using actual patterns
 """
 
-from ml_model import MaintenancePredictor
+from ml_model import MaintenancePredictor, MODEL_BACKENDS
+from model_registry import ModelRegistry
+from app_state import SqliteAppState
+from feature_engine import build_features, build_feature_row
+from running_stats import RunningStatistics
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 
 def generate_realistic_training_data(n_samples=5000):
-    """Generate realistic sensor data with failure patterns"""
+    """Generate realistic sensor data with failure patterns, plus its running statistics"""
     np.random.seed(42)
     
     normal_temp = np.random.normal(75, 10, n_samples)
@@ -32,47 +36,24 @@ def generate_realistic_training_data(n_samples=5000):
     noise_idx = np.random.choice(n_samples, size=int(n_samples * 0.05))
     failures[noise_idx] = 1 - failures[noise_idx]
 
-    features = []
-    for i in range(n_samples):
-        temp_anomaly = abs(normal_temp[i] - 75) / 10
-        vib_anomaly = abs(normal_vib[i] - 1.0) / 0.3
-        pressure_anomaly = abs(normal_pressure[i] - 95) / 5
+    statistics = RunningStatistics()
+    statistics.update_values('temperature', normal_temp)
+    statistics.update_values('vibration', normal_vib)
+    statistics.update_values('pressure', normal_pressure)
+    statistics.update_values('runtime', runtime)
 
-        temp_vib_interaction = normal_temp[i] * normal_vib[i]
-        runtime_normalized = runtime[i] / 6000
-        
-        feature_row = [
-            normal_temp[i],      
-            normal_temp[i]**2,
-            normal_temp.std(),
-            85,           
-            normal_vib[i],    
-            normal_vib[i]**2,
-            2.5,               
-            normal_pressure[i],
-            normal_pressure.std(),
-            runtime[i],        
-            temp_anomaly,    
-            vib_anomaly,        
-            pressure_anomaly,   
-            temp_vib_interaction, 
-            runtime_normalized,
-            int(runtime[i] > 4000)
-        ]
-        features.append(feature_row)
-    
-    X = np.array(features)
+    X = build_features(normal_temp, normal_vib, normal_pressure, runtime, statistics.aggregates())
     y = failures
     
-    return X, y
+    return X, y, statistics
 
-def main():
+def main(backend=None):
     print("=" * 60)
     print("Training Real Predictive Maintenance Model")
     print("=" * 60)
 
     print("\nGenerating realistic training data...")
-    X, y = generate_realistic_training_data(n_samples=5000)
+    X, y, statistics = generate_realistic_training_data(n_samples=5000)
     
     print(f"Generated {len(X)} samples")
     print(f"   - Normal operations: {(y == 0).sum()}")
@@ -86,9 +67,10 @@ def main():
     print(f"\nTraining set: {len(X_train)} samples")
     print(f"Test set: {len(X_test)} samples")
 
-    print("\n🔧 Training Gradient Boosting model...")
-    model = MaintenancePredictor()
+    model = MaintenancePredictor(autoload=False, backend=backend)
+    print(f"\n🔧 Training Gradient Boosting model ({model.backend} backend)...")
     model.train(X_train, y_train)
+    model.statistics = statistics
 
     print("\nEvaluating model performance...")
     y_pred = (model.predict(X_test) > 0.5).astype(int)
@@ -113,7 +95,19 @@ def main():
     print(f"   Recall:    {recall:.2%}")
     
     print("\nSaving trained model...")
-    model.save_model("models/maintenance_model.pkl")
+    # Running API workers reload the model when they see the new version
+    registry = ModelRegistry(state=SqliteAppState())
+    record = registry.versions.publish(model, {
+        "source": "train_real_model",
+        "metrics": {
+            "n_samples": len(X_train),
+            "accuracy": round(float(accuracy), 4),
+            "precision": round(float(precision), 4),
+            "recall": round(float(recall), 4),
+        },
+    })
+    registry.activate(record["version"])
+    model_path = registry.model_path
     
     print("\nTesting predictions on sample data:")
     test_samples = [
@@ -123,12 +117,12 @@ def main():
     ]
     
     for sample in test_samples:
-        features = np.array([[
-            sample['temp'], sample['temp']**2, 10, 85,
-            sample['vib'], sample['vib']**2, 2.5,
-            sample['pressure'], 5, sample['runtime'],
-            0, 0, 0, 0, sample['runtime']/6000, int(sample['runtime'] > 4000)
-        ]])
+        features = build_feature_row({
+            'temperature': sample['temp'],
+            'vibration': sample['vib'],
+            'pressure': sample['pressure'],
+            'runtime': sample['runtime'],
+        }, model.fleet_aggregates())
         
         risk = model.predict(features)[0]
         print(f"\n   {sample['desc']}:")
@@ -138,8 +132,11 @@ def main():
     print("\n" + "=" * 60)
     print("Model training complete!")
     print("=" * 60)
-    print(f"\nModel saved to: models/maintenance_model.pkl")
+    print(f"\nModel saved to: {model_path}")
     print("Your API will now use this trained model for predictions!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", choices=MODEL_BACKENDS, default=None)
+    main(parser.parse_args().backend)
\ No newline at end of file
@@ -0,0 +1,160 @@
+import multiprocessing as mp
+import os
+import queue
+import socket
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Optional
+
+from app_state import AppState, MemoryAppState
+from ml_model import MaintenancePredictor
+from model_versions import ModelVersionStore
+from running_stats import RunningStatistics
+
+# Share of the overall progress before and after the boosting iterations
+DATA_PROGRESS = 10
+SAVE_PROGRESS = 95
+
+
+def run_training(
+    model_dir: str, n_samples: int, events, backend: Optional[str] = None, statistics: Optional[Dict] = None
+):
+    """
+    Train a model and publish it as a new version; runs in a separate process
+
+    Reports ("stage", message, progress), ("estimator", done, total), then
+    ("done", metrics) or ("error", message) on the events queue. The model
+    is published to the ModelVersionStore in model_dir (staged, then
+    renamed into place) but not activated; metrics["model_version"] names
+    it. statistics (a RunningStatistics.to_dict() state) is frozen into
+    the saved model as the reference for its fleet-wide features.
+    """
+    try:
+        start = time.time()
+        events.put(("stage", "Generating training data...", 0))
+        model = MaintenancePredictor(autoload=False, backend=backend)
+        X, y = model.generate_synthetic_training_data(n_samples=n_samples)
+
+        events.put(("stage", "Training model...", DATA_PROGRESS))
+        model.train(X, y, progress=lambda done, total: events.put(("estimator", done, total)))
+        model.statistics = RunningStatistics.from_dict(statistics)
+
+        events.put(("stage", "Saving model...", SAVE_PROGRESS))
+        metrics = {
+            "n_samples": len(X),
+            "backend": model.backend,
+            "n_estimators": model.n_iterations,
+            "training_time": round(time.time() - start, 2),
+        }
+        record = ModelVersionStore(model_dir).publish(model, {"source": "train", "metrics": metrics})
+
+        events.put(("done", {**metrics, "model_version": record["version"]}))
+    except Exception as e:
+        traceback.print_exc()
+        events.put(("error", str(e)))
+
+
+class TrainingSupervisor:
+    """
+    Runs training in a child process and tracks its progress
+
+    Progress is per boosting iteration, fed back over a multiprocessing
+    queue to a listener thread. Status lives in an AppState, so with a
+    shared one (SqliteAppState) every API worker reports the same job and
+    only one of them can train at a time. When the child finishes,
+    on_model(version) is called with the newly published model version
+    (e.g. to activate it).
+    """
+
+    def __init__(
+        self,
+        on_model: Callable[[int], None],
+        start_method: Optional[str] = None,
+        state: Optional[AppState] = None,
+    ):
+        self.on_model = on_model
+        self.state = state or MemoryAppState()
+        # spawn: forking a multi-threaded server process is unsafe
+        self._context = mp.get_context(start_method or os.getenv("TRAINING_START_METHOD", "spawn"))
+        self._owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._listener: Optional[threading.Thread] = None
+
+    def _update(self, **fields):
+        self.state.update_training(**fields)
+
+    def status(self) -> Dict:
+        return self.state.training_status()
+
+    @property
+    def is_training(self) -> bool:
+        return self.status()["is_training"]
+
+    def start(
+        self, model_dir: str, n_samples: int, backend: Optional[str] = None, statistics: Optional[Dict] = None
+    ):
+        """Start training a new version in model_dir in a new process; raises RuntimeError if one is running"""
+        if not self.state.claim_training(self._owner, message="Starting training process..."):
+            raise RuntimeError("Training already in progress")
+
+        events = self._context.Queue()
+        process = self._context.Process(
+            target=run_training, args=(model_dir, n_samples, events, backend, statistics), daemon=True
+        )
+        try:
+            process.start()
+        except Exception as e:
+            self._finish_failed(f"Could not start training process: {e}")
+            raise
+        self._listener = threading.Thread(
+            target=self._listen, args=(process, events), daemon=True
+        )
+        self._listener.start()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until the current training run (if any) has finished"""
+        if self._listener is not None:
+            self._listener.join(timeout)
+
+    def _listen(self, process, events):
+        while True:
+            try:
+                event = events.get(timeout=1.0)
+            except queue.Empty:
+                if not process.is_alive():
+                    self._finish_failed(f"Training process exited with code {process.exitcode}")
+                    break
+                continue
+
+            kind = event[0]
+            if kind == "stage":
+                self._update(message=event[1], progress=event[2])
+            elif kind == "estimator":
+                done, total = event[1], event[2]
+                self._update(
+                    estimators_done=done, n_estimators=total,
+                    progress=int(DATA_PROGRESS + (SAVE_PROGRESS - DATA_PROGRESS) * done / total),
+                    message=f"Training model... ({done}/{total} estimators)",
+                )
+            elif kind == "done":
+                metrics = event[1]
+                try:
+                    self.on_model(metrics["model_version"])
+                except Exception as e:
+                    self._finish_failed(f"Could not load trained model: {e}")
+                    break
+                self._update(
+                    is_training=False, progress=100, metrics=metrics,
+                    message=f"Training completed in {metrics['training_time']:.2f}s",
+                )
+                print("Model training completed successfully!")
+                break
+            elif kind == "error":
+                self._finish_failed(event[1])
+                break
+
+        process.join(timeout=5)
+
+    def _finish_failed(self, error: str):
+        print(f"Training error: {error}")
+        self._update(is_training=False, progress=0, message=f"Training failed: {error}")
@@ -0,0 +1,203 @@
+import numpy as np
+
+# Rows scored per traversal step; bounds the (rows x trees) node-index matrix
+DEFAULT_CHUNK_ROWS = 256
+
+# Rows checked against predict_proba after flattening
+PROBE_ROWS = 64
+
+
+class FlatTreeEnsemble:
+    """
+    A fitted binary boosting ensemble flattened into plain numpy arrays
+
+    All trees are concatenated into one node table and traversed together,
+    one depth level per step, for a whole chunk of rows at once. This
+    avoids the per-tree Python and validation overhead of predict_proba,
+    which dominates on small batches, and keeps no reference to sklearn
+    objects.
+
+    Nodes follow sklearn's rule: go left when x <= threshold. Leaves have
+    feature -1 and point to themselves, so finished rows stay in place.
+    Inputs are validated like sklearn does for the source model: the
+    feature count must match, infinity is rejected, and NaN only passes
+    for models that learnt a direction for missing values.
+
+    from_model() raises ValueError when the model cannot be flattened
+    (including sklearn internals it does not recognize) or the flattened
+    copy disagrees with predict_proba; callers then use predict_proba.
+    """
+
+    def __init__(
+        self, feature, threshold, left, right, value, missing_left, roots, depth, baseline, float32,
+        n_features, allow_nan,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.missing_left = missing_left
+        self.roots = roots
+        self.depth = depth
+        self.baseline = baseline
+        self.float32 = float32
+        self.n_features = n_features
+        self.allow_nan = allow_nan
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        self.children = np.column_stack([left, right]).ravel()
+        # Only trees with a learnt missing-value direction need the NaN check
+        self.has_missing = bool((missing_left & (threshold != np.inf)).any())
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @classmethod
+    def _from_nodes(cls, model, trees, float32: bool, allow_nan: bool) -> "FlatTreeEnsemble":
+        """
+        trees: list of (feature, threshold, left, right, value, missing_left) with leaves at feature -1
+
+        The baseline (initial raw score) is recovered through the public
+        decision_function: its value at one point minus the trees' sum there.
+        """
+        features, thresholds, lefts, rights, values, missing = [], [], [], [], [], []
+        roots = []
+        offset = 0
+        depth = 0
+        for feature, threshold, left, right, value, missing_left in trees:
+            n = len(feature)
+            node_ids = np.arange(n)
+            is_leaf = feature < 0
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, feature))
+            thresholds.append(np.where(is_leaf, np.inf, threshold))
+            lefts.append(np.where(is_leaf, node_ids, left) + offset)
+            rights.append(np.where(is_leaf, node_ids, right) + offset)
+            values.append(np.where(is_leaf, value, 0.0))
+            missing.append(missing_left | is_leaf)
+            depth = max(depth, _tree_depth(left, right, is_leaf))
+            offset += n
+
+        flat = cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values).astype(np.float64),
+            missing_left=np.concatenate(missing).astype(bool),
+            roots=np.array(roots, dtype=np.intp),
+            depth=depth,
+            baseline=0.0,
+            float32=float32,
+            n_features=int(model.n_features_in_),
+            allow_nan=allow_nan,
+        )
+        origin = np.zeros((1, flat.n_features))
+        flat.baseline = float(np.ravel(model.decision_function(origin))[0] - flat.decision_function(origin)[0])
+        return flat
+
+    @classmethod
+    def from_gradient_boosting(cls, model) -> "FlatTreeEnsemble":
+        """Flatten a fitted binary GradientBoostingClassifier"""
+        if model.n_classes_ != 2:
+            raise ValueError("Only binary classifiers can be flattened")
+        scale = model.learning_rate
+        trees = []
+        for estimator in model.estimators_[:, 0]:
+            tree = estimator.tree_
+            trees.append((
+                tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                tree.value[:, 0, 0] * scale, np.zeros(tree.node_count, dtype=bool),
+            ))
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return cls._from_nodes(model, trees, float32=True, allow_nan=False)
+
+    @classmethod
+    def from_hist_gradient_boosting(cls, model) -> "FlatTreeEnsemble":
+        """
+        Flatten a fitted binary HistGradientBoostingClassifier (numeric features only)
+
+        Reads the private _predictors node arrays (there is no public tree
+        API); a layout this code does not know raises ValueError.
+        """
+        if model.n_trees_per_iteration_ != 1:
+            raise ValueError("Only binary classifiers can be flattened")
+        trees = []
+        for (predictor,) in getattr(model, "_predictors", None) or ():
+            nodes = predictor.nodes
+            if nodes['is_categorical'].any():
+                raise ValueError("Categorical splits are not supported")
+            is_leaf = nodes['is_leaf'].astype(bool)
+            trees.append((
+                np.where(is_leaf, -1, nodes['feature_idx']).astype(np.intp),
+                nodes['num_threshold'], nodes['left'], nodes['right'],
+                nodes['value'], nodes['missing_go_to_left'].astype(bool),
+            ))
+        if not trees:
+            raise ValueError("Unrecognized HistGradientBoostingClassifier internals")
+        return cls._from_nodes(model, trees, float32=False, allow_nan=True)
+
+    @classmethod
+    def from_model(cls, model) -> "FlatTreeEnsemble":
+        """Flatten model and check it against predict_proba on random rows"""
+        try:
+            if type(model).__name__.startswith("Hist"):
+                flat = cls.from_hist_gradient_boosting(model)
+            else:
+                flat = cls.from_gradient_boosting(model)
+        except (AttributeError, KeyError, IndexError, TypeError, ValueError) as e:
+            raise ValueError(f"Cannot flatten {type(model).__name__}: {e}") from e
+
+        probe = np.random.default_rng(0).normal(size=(PROBE_ROWS, flat.n_features))
+        if not np.allclose(flat.predict_proba(probe), model.predict_proba(probe)[:, 1], rtol=0, atol=1e-9):
+            raise ValueError(f"Flattened {type(model).__name__} disagrees with predict_proba")
+        return flat
+
+    def _validate(self, X: np.ndarray):
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[-1] if X.ndim else 0} features, but the model expects {self.n_features}")
+        if np.isinf(X).any():
+            raise ValueError("Input X contains infinity")
+        if not self.allow_nan and np.isnan(X).any():
+            raise ValueError("Input X contains NaN")
+
+    def decision_function(self, X: np.ndarray, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+        """Raw (log-odds) scores for every row of X"""
+        X = np.asarray(X, dtype=np.float64)
+        self._validate(X)
+        if self.float32:
+            X = X.astype(np.float32)
+        raw = np.empty(len(X), dtype=np.float64)
+        n_features = X.shape[1]
+        for start in range(0, len(X), chunk_rows):
+            chunk = np.ascontiguousarray(X[start:start + chunk_rows]).ravel()
+            n_rows = len(chunk) // n_features if n_features else 0
+            row_base = (np.arange(n_rows, dtype=np.intp) * n_features)[:, None]
+            nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+            for _ in range(self.depth):
+                x = chunk.take(row_base + self.feature.take(nodes))
+                go_right = ~(x <= self.threshold.take(nodes))
+                if self.has_missing:
+                    missing = np.isnan(x)
+                    go_right[missing] = ~self.missing_left.take(nodes[missing])
+                nodes = self.children.take(2 * nodes + go_right)
+            raw[start:start + n_rows] = self.baseline + self.value.take(nodes).sum(axis=1)
+        return raw
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Probability of the positive class (same as predict_proba(X)[:, 1])"""
+        with np.errstate(over='ignore'):
+            return 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray, is_leaf: np.ndarray) -> int:
+    """Depth of a tree given as child arrays rooted at node 0"""
+    depth = 0
+    level = np.array([0])
+    while True:
+        level = level[~is_leaf[level]]
+        if len(level) == 0:
+            return depth
+        level = np.concatenate([left[level], right[level]])
+        depth += 1
@@ -0,0 +1,169 @@
+import json
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from asset_store import DEFAULT_DB_PATH
+
+# Stage -> (start, end) of the overall progress percentage
+STAGES = {
+    "parse": (0, 60),
+    "process": (60, 65),
+    "feature": (65, 75),
+    "predict": (75, 90),
+    "persist": (90, 100),
+}
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS upload_jobs (
+    id TEXT PRIMARY KEY,
+    upload_id INTEGER,
+    filename TEXT,
+    status TEXT NOT NULL,
+    stage TEXT,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT,
+    summary TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_upload_jobs_created ON upload_jobs(created_at);
+CREATE INDEX IF NOT EXISTS idx_upload_jobs_updated ON upload_jobs(status, updated_at);
+"""
+
+STALE_ERROR = "The upload stopped reporting progress; its worker probably exited"
+
+
+class UploadJobs:
+    """
+    Progress records for background uploads
+
+    Kept in the asset database rather than in memory, so a job started by
+    one worker (or run in a worker process) can be polled through any other.
+
+    A queued or running job not updated for UPLOAD_JOB_STALE_SECONDS
+    (default 900) belongs to a worker that died; it is marked failed when
+    next read. Finished jobs are deleted UPLOAD_JOB_RETENTION_SECONDS
+    (default one day) after their last update, whenever a job is created.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        stale_seconds: Optional[float] = None,
+        retention_seconds: Optional[float] = None,
+    ):
+        self.db_path = db_path or os.getenv("ASSET_DB_PATH", DEFAULT_DB_PATH)
+        self.stale_seconds = (
+            stale_seconds if stale_seconds is not None else float(os.getenv("UPLOAD_JOB_STALE_SECONDS", 900))
+        )
+        self.retention_seconds = (
+            retention_seconds if retention_seconds is not None
+            else float(os.getenv("UPLOAD_JOB_RETENTION_SECONDS", 86400))
+        )
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, filename: str, upload_id: int) -> str:
+        """Register a queued job and return its id (pruning old finished jobs first)"""
+        self.prune()
+        job_id = uuid.uuid4().hex
+        now = datetime.now().isoformat()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO upload_jobs (id, upload_id, filename, status, message, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', 'Waiting for a free worker', ?, ?)",
+                (job_id, upload_id, filename, now, now),
+            )
+        return job_id
+
+    def update(self, job_id: str, **fields):
+        """Update status, stage, progress, message, summary (dict) or error"""
+        if "summary" in fields and fields["summary"] is not None:
+            fields["summary"] = json.dumps(fields["summary"])
+        fields["updated_at"] = datetime.now().isoformat()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connection() as conn:
+            conn.execute(f"UPDATE upload_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    @staticmethod
+    def _before(seconds: float) -> str:
+        return (datetime.now() - timedelta(seconds=seconds)).isoformat()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """The job, marked failed first if it has gone stale"""
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE upload_jobs SET status = 'failed', message = 'Upload failed', error = ?, updated_at = ? "
+                "WHERE id = ? AND status NOT IN (?, ?) AND updated_at < ?",
+                (STALE_ERROR, datetime.now().isoformat(), job_id, *TERMINAL_STATUSES, self._before(self.stale_seconds)),
+            )
+            row = conn.execute("SELECT * FROM upload_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job = {"job_id": job.pop("id"), **job}
+        job["summary"] = json.loads(job["summary"]) if job["summary"] else None
+        return job
+
+    def prune(self) -> int:
+        """Delete finished jobs older than the retention period; returns how many"""
+        with self._connection() as conn:
+            return conn.execute(
+                "DELETE FROM upload_jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (*TERMINAL_STATUSES, self._before(self.retention_seconds)),
+            ).rowcount
+
+
+class JobProgress:
+    """
+    Progress callback for ingest_csv_stream that writes to an UploadJobs record
+
+    Picklable (it only holds the db path and job id), so it also works
+    from a process pool. Writes are throttled to one per min_interval
+    seconds unless the stage changes.
+    """
+
+    def __init__(self, db_path: str, job_id: str, min_interval: float = 0.25):
+        self.db_path = db_path
+        self.job_id = job_id
+        self.min_interval = min_interval
+        self._stage = None
+        self._last_write = 0.0
+        self._jobs = None
+
+    def __call__(self, stage: str, fraction: float = 0.0, message: Optional[str] = None):
+        now = time.monotonic()
+        if stage == self._stage and now - self._last_write < self.min_interval:
+            return
+        self._stage = stage
+        self._last_write = now
+
+        start, end = STAGES[stage]
+        fraction = min(max(fraction, 0.0), 1.0)
+        if self._jobs is None:
+            self._jobs = UploadJobs(self.db_path)
+        self._jobs.update(
+            self.job_id,
+            status="running",
+            stage=stage,
+            progress=round(start + (end - start) * fraction, 1),
+            message=message or f"{stage.capitalize()} ({fraction:.0%})",
+        )
@@ -35,6 +35,20 @@ interface HistoricalDataPoint {
   pressure: number;
 }
 
+interface UploadJob {
+  job_id: string;
+  status: "queued" | "running" | "completed" | "failed";
+  stage: string | null;
+  progress: number;
+  summary: {
+    total_assets: number;
+    healthy: number;
+    warning: number;
+    critical: number;
+  } | null;
+  error: string | null;
+}
+
 interface UploadSummary {
   total: number;
   healthy: number;
@@ -54,6 +68,7 @@ const MaintenanceDashboard: React.FC = () => {
     null
   );
   const [uploadProgress, setUploadProgress] = useState<number>(0);
+  const [uploadStage, setUploadStage] = useState<string | undefined>();
   const [progressDialogOpen, setProgressDialogOpen] = useState<boolean>(false);
   const [exportingPDF, setExportingPDF] = useState(false);
 
@@ -127,6 +142,25 @@ const MaintenanceDashboard: React.FC = () => {
     }
   };
 
+  // Follow a background upload job over server-sent events
+  const waitForUploadJob = (eventsUrl: string): Promise<UploadJob> =>
+    new Promise((resolve, reject) => {
+      const source = new EventSource(`${API_URL}${eventsUrl}`);
+      source.onmessage = (event: MessageEvent) => {
+        const job: UploadJob = JSON.parse(event.data);
+        setUploadStage(job.stage || undefined);
+        setUploadProgress(Math.round(job.progress));
+        if (job.status === "completed" || job.status === "failed") {
+          source.close();
+          resolve(job);
+        }
+      };
+      source.onerror = () => {
+        source.close();
+        reject(new Error("Lost connection while processing the upload"));
+      };
+    });
+
   const handleFileUpload = async (
     e: React.ChangeEvent<HTMLInputElement>
   ): Promise<void> => {
@@ -134,6 +168,8 @@ const MaintenanceDashboard: React.FC = () => {
     if (!file) return;
 
     setUploading(true);
+    setUploadProgress(0);
+    setUploadStage(undefined);
     setProgressDialogOpen(true);
     setError(null);
 
@@ -142,6 +178,7 @@ const MaintenanceDashboard: React.FC = () => {
 
     try {
       const { data } = await axios.post(`${API_URL}/upload/`, formData, {
+        params: { async_job: true },
         headers: { "Content-Type": "multipart/form-data" },
         onUploadProgress: (progressEvent: AxiosProgressEvent) => {
           if (progressEvent.total) {
@@ -153,13 +190,18 @@ const MaintenanceDashboard: React.FC = () => {
         },
       });
 
-      setAssets(data.assets);
+      const job = await waitForUploadJob(data.events_url);
+      if (job.status === "failed" || !job.summary) {
+        throw new Error(job.error || "Upload failed");
+      }
+
+      await fetchAssets();
 
       const summary: UploadSummary = {
-        total: data.assets.length,
-        healthy: data.summary.healthy,
-        warning: data.summary.warning,
-        critical: data.summary.critical,
+        total: job.summary.total_assets,
+        healthy: job.summary.healthy,
+        warning: job.summary.warning,
+        critical: job.summary.critical,
       };
 
       setUploadSummary(summary);
@@ -169,9 +211,11 @@ const MaintenanceDashboard: React.FC = () => {
       const axiosErr = err as AxiosError<{ detail?: string }>;
       const msg = axiosErr.response?.data?.detail || axiosErr.message;
       setError(msg);
+      setProgressDialogOpen(false);
       alert(`Upload failed: ${msg}`);
     } finally {
       setUploading(false);
+      setUploadStage(undefined);
       e.target.value = "";
     }
   };
@@ -297,6 +341,7 @@ const MaintenanceDashboard: React.FC = () => {
       <UploadProgressDialog
         open={progressDialogOpen}
         progress={uploadProgress}
+        stage={uploadStage}
       />
       <UploadSummaryDialog
         open={dialogOpen}
@@ -10,17 +10,21 @@ import { Progress } from "@/components/ui/progress";
 interface UploadProgressDialogProps {
   open: boolean;
   progress: number;
+  stage?: string;
 }
 
 const UploadProgressDialog: React.FC<UploadProgressDialogProps> = ({
   open,
   progress,
+  stage,
 }) => {
   return (
     <Dialog open={open}>
       <DialogContent className="max-w-sm">
         <DialogHeader>
-          <DialogTitle className="font-semibold">Uploading CSV...</DialogTitle>
+          <DialogTitle className="font-semibold">
+            {stage ? `Processing CSV: ${stage}...` : "Uploading CSV..."}
+          </DialogTitle>
         </DialogHeader>
 
         <div className="space-y-3 mt-2">